@@ -0,0 +1,14 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that allows to execute Artella Updater from command line (python -m artella.plugins.updater)
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import sys
+
+from artella.plugins.updater import cli
+
+sys.exit(cli.main())
@@ -0,0 +1,796 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains the asyncio based network client of Artella Updater.
+
+A single asyncio loop runs all the requests, so many concurrent metadata checks do not need a thread each. The loop
+runs either in a dedicated background thread (default) or in Qt main thread, stepped by a Qt timer
+(ARTELLA_UPDATER_ASYNC_LOOP=qt). AsyncRunner calls coroutine callbacks in Qt main thread in both cases.
+
+Requests take a slot of the shared request scheduler (see artella.plugins.updater.scheduler) before connecting, so
+they are prioritized and capped together with the synchronous ones. Their priority is interactive by default, because
+the asyncio client is used by the updater UI. Cancellation tokens are checked while requests wait for their turn and
+between the chunks of their responses.
+
+This module requires Python 3, so it must be imported guarding ImportError and SyntaxError. The client does not
+support proxies: use is_available to check whether it can be used or not.
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import os
+import ssl
+import timeit
+import asyncio
+import logging
+import weakref
+import functools
+import threading
+from urllib.parse import urlparse, urljoin
+from urllib.request import getproxies, url2pathname
+
+from artella.core import qtutils
+from artella.plugins.updater import utils, tracing, metrics, ratelimit, scheduler, cancellation
+
+if qtutils.QT_AVAILABLE:
+    from artella.externals.Qt import QtCore
+
+logger = logging.getLogger('artella')
+
+ASYNC_LOOP_ENV = 'ARTELLA_UPDATER_ASYNC_LOOP'
+ASYNC_LOOP_MODES = ('thread', 'qt')
+MAX_CONNECTIONS = 32                # Maximum number of simultaneous connections of a client
+REQUEST_TIMEOUT = 30.0              # Seconds
+MAX_REDIRECTS = 5
+QT_STEP_INTERVAL = 10               # Milliseconds between asyncio loop steps when the loop runs in Qt main thread
+WAIT_INTERVAL = 0.01                # Seconds between checks while a request waits for its scheduler slot
+REDIRECT_STATUS_CODES = (301, 302, 303, 307, 308)
+USER_AGENT = 'artella-plugins-updater'
+
+_CLIENT = None
+_BACKGROUND_LOOP = None
+_LOCK = threading.Lock()
+
+
+class AsyncHTTPError(Exception):
+    """
+    Exception raised when a server answers a request with an error status
+    """
+
+    def __init__(self, url, code, headers=None):
+        super(AsyncHTTPError, self).__init__('HTTP Error {}: {}'.format(code, url))
+
+        self.url = url
+        self.code = code
+        self.headers = headers or dict()
+
+
+class AsyncResponse(object):
+    """
+    HTTP response whose body is read asynchronously
+    """
+
+    def __init__(self, url, status, headers, reader, writer, timeout=REQUEST_TIMEOUT):
+        super(AsyncResponse, self).__init__()
+
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.wire_bytes = 0
+        self._reader = reader
+        self._writer = writer
+        self._timeout = timeout
+        self._chunked = headers.get('transfer-encoding', '').strip().lower() == 'chunked'
+        content_length = headers.get('content-length', None)
+        self._remaining = int(content_length) if content_length and not self._chunked else None
+        self._chunk_remaining = 0
+        self._decompressor = utils.create_decompressor(headers.get('content-encoding', ''))
+        self._eof = False
+
+    async def read_chunk(self, size=utils.DOWNLOAD_CHUNK_SIZE):
+        """
+        Reads next chunk of response body
+
+        :param int size: maximum number of bytes to read from the connection
+        :return: body data. Empty if the whole body was already read.
+        :rtype: bytes
+        """
+
+        while not self._eof:
+            raw_data = await asyncio.wait_for(self._read_raw(size), self._timeout)
+            if not raw_data:
+                self._eof = True
+                self.close()
+                return self._decompressor.flush() if self._decompressor else b''
+            self.wire_bytes += len(raw_data)
+            data = self._decompressor.decompress(raw_data) if self._decompressor else raw_data
+            if data:
+                return data
+
+        return b''
+
+    async def read(self, cancel_token=None):
+        """
+        Reads the whole response body
+
+        :param CancellationToken cancel_token: optional token checked between the chunks of the body
+        :return: body data
+        :rtype: bytes
+        :raises CancelledError: if the read is cancelled. Response is closed
+        """
+
+        chunks = list()
+        while True:
+            if cancel_token is not None and cancel_token.is_cancelled():
+                self.close()
+                cancel_token.raise_if_cancelled()
+            chunk = await self.read_chunk()
+            if not chunk:
+                break
+            chunks.append(chunk)
+
+        return b''.join(chunks)
+
+    def close(self):
+        """
+        Closes response connection
+        """
+
+        self._writer.close()
+
+    async def _read_raw(self, size):
+        if self._chunked:
+            if not self._chunk_remaining:
+                size_line = await self._reader.readline()
+                chunk_size = int(size_line.split(b';')[0].strip() or b'0', 16)
+                if not chunk_size:
+                    while (await self._reader.readline()).strip():
+                        pass
+                    return b''
+                self._chunk_remaining = chunk_size
+            data = await self._reader.read(min(size, self._chunk_remaining))
+            if not data:
+                raise ConnectionError('Connection closed while reading response: {}'.format(self.url))
+            self._chunk_remaining -= len(data)
+            if not self._chunk_remaining:
+                await self._reader.readexactly(2)
+            return data
+
+        if self._remaining is not None:
+            if not self._remaining:
+                return b''
+            data = await self._reader.read(min(size, self._remaining))
+            if not data:
+                raise ConnectionError('Connection closed while reading response: {}'.format(self.url))
+            self._remaining -= len(data)
+            return data
+
+        return await self._reader.read(size)
+
+
+class _AsyncRequestSlot(object):
+    """
+    Asynchronous context that holds a request slot of the shared scheduler while it is active. The slot is waited for
+    without blocking the loop
+    """
+
+    def __init__(self, request_priority=scheduler.INTERACTIVE, cancel_token=None):
+        super(_AsyncRequestSlot, self).__init__()
+
+        self._priority = request_priority
+        self._cancel_token = cancel_token
+        self._scheduler = scheduler.get_scheduler()
+
+    async def __aenter__(self):
+        start_time = timeit.default_timer()
+        entry = self._scheduler.enqueue(self._priority)
+        try:
+            while not self._scheduler.try_acquire(entry):
+                cancellation.raise_if_cancelled(self._cancel_token)
+                await asyncio.sleep(WAIT_INTERVAL)
+        except BaseException:
+            self._scheduler.dequeue(entry)
+            raise
+        metrics.observe(
+            'scheduler_wait_seconds', timeit.default_timer() - start_time,
+            priority=scheduler.PRIORITY_NAMES[self._priority])
+
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self._scheduler.release(self._priority)
+
+        return False
+
+
+async def _wait(seconds, cancel_token=None):
+    """
+    Waits the given time checking the given cancellation token
+    """
+
+    end_time = timeit.default_timer() + seconds
+    while True:
+        cancellation.raise_if_cancelled(cancel_token)
+        remaining_time = end_time - timeit.default_timer()
+        if remaining_time <= 0:
+            break
+        await asyncio.sleep(min(remaining_time, WAIT_INTERVAL) if cancel_token is not None else remaining_time)
+
+
+class AsyncHTTPClient(object):
+    """
+    asyncio HTTP client used to retrieve updater metadata and package files. Requests share the rate limits and the
+    request scheduler of the synchronous requests (see artella.plugins.updater.ratelimit and
+    artella.plugins.updater.scheduler)
+    """
+
+    def __init__(self, max_connections=MAX_CONNECTIONS, timeout=REQUEST_TIMEOUT):
+        super(AsyncHTTPClient, self).__init__()
+
+        self._max_connections = max_connections
+        self._timeout = timeout
+        self._semaphores = weakref.WeakKeyDictionary()
+        self._ssl_context = None
+
+    async def open(self, url, compressed=False, cancel_token=None):
+        """
+        Opens the given HTTP URL. Throttled requests (HTTP 429 and 503) are retried and redirections are followed.
+        Must be called while holding a request slot (see fetch)
+
+        :param str url: URL to open
+        :param bool compressed: whether or not compressed responses are requested
+        :param CancellationToken cancel_token: optional token used to cancel the request while it waits for its turn
+        :return: response
+        :rtype: AsyncResponse
+        :raises CancelledError: if the request is cancelled
+        """
+
+        host = urlparse(url).hostname
+        bucket = ratelimit.get_bucket(host)
+        for retry in range(utils.THROTTLE_RETRIES + 1):
+            if bucket:
+                wait_time = bucket.reserve()
+                if wait_time > 0:
+                    await _wait(wait_time, cancel_token)
+            cancellation.raise_if_cancelled(cancel_token)
+            try:
+                rsp = await self._open(url, compressed)
+            except AsyncHTTPError as exc:
+                if not bucket or exc.code not in ratelimit.THROTTLE_STATUS_CODES or retry >= utils.THROTTLE_RETRIES:
+                    raise
+                bucket.slow_down(ratelimit.parse_retry_after(exc.headers.get('retry-after', None)))
+                metrics.increment('retries_total', operation='throttled', host=host)
+                logger.warning('Request throttled by {} (HTTP {}). Retrying at {:.2f} requests per second ...'.format(
+                    host, exc.code, bucket.rate))
+                continue
+            if bucket:
+                bucket.recover()
+            return rsp
+
+    async def fetch(self, url, compressed=False, cancel_token=None, request_priority=scheduler.INTERACTIVE):
+        """
+        Returns the contents of the given URL. The request waits for a slot of the shared request scheduler
+
+        :param str url: URL to retrieve
+        :param bool compressed: whether or not compressed responses are requested. Should only be used for metadata
+        :param CancellationToken cancel_token: optional cancellation token
+        :param int request_priority: scheduler priority of the request (INTERACTIVE or BACKGROUND)
+        :return: URL contents
+        :rtype: bytes
+        :raises CancelledError: if the request is cancelled
+        """
+
+        cancellation.raise_if_cancelled(cancel_token)
+        if urlparse(url).scheme == 'file':
+            return await asyncio.get_event_loop().run_in_executor(None, _read_file, url)
+
+        async with self._get_semaphore(), _AsyncRequestSlot(request_priority, cancel_token=cancel_token):
+            rsp = await self.open(url, compressed=compressed, cancel_token=cancel_token)
+            try:
+                return await rsp.read(cancel_token=cancel_token)
+            finally:
+                rsp.close()
+
+    async def download(self, url, file_path, digests=None, cancel_token=None, request_priority=scheduler.INTERACTIVE):
+        """
+        Downloads the given URL streaming its contents into the given file. The request waits for a slot of the shared
+        request scheduler. If digests are given, file contents are hashed while they are written and the file is
+        rejected (and removed) if any digest does not match, as artella.plugins.updater.utils.download_package_from_pypi
+        does.
+
+        :param str url: URL of the file to download
+        :param str file_path: path where downloaded file will be stored
+        :param dict digests: optional PyPI release digests ({'sha256': ..., 'blake2b_256': ...})
+        :param CancellationToken cancel_token: optional token checked between downloaded chunks
+        :param int request_priority: scheduler priority of the request (INTERACTIVE or BACKGROUND)
+        :return: True if the file was downloaded (and verified) successfully; False otherwise.
+        :rtype: bool
+        :raises CancelledError: if the download is cancelled. Partially downloaded file is removed
+        """
+
+        hashers = utils.get_digest_hashers(digests)
+        hash_times = [0.0]
+        try:
+            cancellation.raise_if_cancelled(cancel_token)
+            with tracing.span('download', url=url) as download_span:
+                if urlparse(url).scheme == 'file':
+                    data_size = await asyncio.get_event_loop().run_in_executor(
+                        None, _copy_file, url, file_path, hashers, hash_times, cancel_token)
+                else:
+                    async with self._get_semaphore(), _AsyncRequestSlot(request_priority, cancel_token=cancel_token):
+                        rsp = await self.open(url, cancel_token=cancel_token)
+                        try:
+                            data_size = await _write_response(rsp, file_path, hashers, hash_times, cancel_token)
+                        finally:
+                            rsp.close()
+                download_span.set(bytes=data_size)
+        except (cancellation.CancelledError, asyncio.CancelledError):
+            logger.info('Download cancelled: {}'.format(url))
+            utils.remove_file(file_path)
+            raise
+        except Exception as exc:
+            logger.warning('Error while downloading file: {} | {}'.format(url, exc))
+            utils.remove_file(file_path)
+            return False
+
+        if not data_size:
+            logger.warning('No data found in downloaded file: {}'.format(url))
+            utils.remove_file(file_path)
+            return False
+
+        return utils.verify_digests(url, file_path, hashers, digests, hash_time=hash_times[0])
+
+    async def get_pypi_info(self, plugin_id, cancel_token=None, request_priority=scheduler.INTERACTIVE):
+        """
+        Returns PyPI information of the given plugin (see artella.plugins.updater.utils.get_pypi_info)
+
+        :param str plugin_id: ID of the plugin (for example, artella-plugins-updater)
+        :param CancellationToken cancel_token: optional cancellation token
+        :param int request_priority: scheduler priority of the request (INTERACTIVE or BACKGROUND)
+        :return: PyPI information of the plugin. Empty if the information could not be retrieved.
+        :rtype: dict
+        :raises CancelledError: if the request is cancelled
+        """
+
+        pypi_url = utils.get_pypi_url(plugin_id)
+        try:
+            with tracing.span('metadata', plugin_id=plugin_id) as metadata_span:
+                plugin_pypi_rsp = await self.fetch(
+                    pypi_url, compressed=True, cancel_token=cancel_token, request_priority=request_priority)
+                metadata_span.set(bytes=len(plugin_pypi_rsp or b''))
+        except cancellation.CancelledError:
+            raise
+        except Exception as exc:
+            logger.error('Failed to retrieve Plugin {} PyPI information ({}): "{}"'.format(plugin_id, pypi_url, exc))
+            return dict()
+
+        return utils.parse_pypi_info(plugin_pypi_rsp)
+
+    async def get_plugins_pypi_info(self, plugin_ids, cancel_token=None, request_priority=scheduler.INTERACTIVE):
+        """
+        Returns PyPI information of the given plugins. All the requests are done concurrently, as far as the request
+        scheduler allows. Interactive fetches count as interactive work until they finish, so background requests
+        are capped during the whole fetch and not only while its requests hold a slot
+
+        :param list(str) plugin_ids: IDs of the plugins to retrieve information of
+        :param CancellationToken cancel_token: optional cancellation token
+        :param int request_priority: scheduler priority of the requests (INTERACTIVE or BACKGROUND)
+        :return: dictionary with plugin IDs as keys and PyPI information as values
+        :rtype: dict
+        :raises CancelledError: if the requests are cancelled
+        """
+
+        plugin_ids = list(plugin_ids)
+        request_scheduler = scheduler.get_scheduler()
+        if request_priority == scheduler.INTERACTIVE:
+            request_scheduler.begin_interactive_work()
+        try:
+            plugins_pypi_info = await asyncio.gather(*[self.get_pypi_info(
+                plugin_id, cancel_token=cancel_token, request_priority=request_priority) for plugin_id in plugin_ids])
+        finally:
+            if request_priority == scheduler.INTERACTIVE:
+                request_scheduler.end_interactive_work()
+
+        return dict((plugin_id, pypi_info or dict()) for plugin_id, pypi_info in zip(plugin_ids, plugins_pypi_info))
+
+    def _get_semaphore(self):
+        loop = asyncio.get_event_loop()
+        semaphore = self._semaphores.get(loop, None)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self._max_connections)
+
+        return semaphore
+
+    def _get_ssl_context(self):
+        if self._ssl_context is None:
+            # Synchronous requests disable certificate verification globally once it fails (see
+            # artella.plugins.updater.utils.get_latest_stable_artella_dcc_plugin_info)
+            if ssl._create_default_https_context is ssl._create_unverified_context:
+                self._ssl_context = ssl._create_unverified_context()
+            else:
+                self._ssl_context = ssl.create_default_context()
+
+        return self._ssl_context
+
+    async def _open_connection(self, host, port, is_tls):
+        if not is_tls:
+            return await asyncio.wait_for(asyncio.open_connection(host, port), self._timeout)
+
+        ssl_context = self._get_ssl_context()
+        try:
+            return await asyncio.wait_for(
+                asyncio.open_connection(host, port, ssl=ssl_context, server_hostname=host), self._timeout)
+        except (ssl.SSLError, ssl.CertificateError) as exc:
+            if ssl_context.verify_mode == ssl.CERT_NONE:
+                raise
+            # To avoid [SSL: CERTIFICATE_VERIFY_FAILED] errors, as synchronous requests do
+            logger.warning('SSL error while connecting to {}. Retrying without certificate verification: {}'.format(
+                host, exc))
+            metrics.increment('retries_total', operation='ssl', host=host)
+            self._ssl_context = ssl._create_unverified_context()
+
+        return await asyncio.wait_for(
+            asyncio.open_connection(host, port, ssl=self._ssl_context, server_hostname=host), self._timeout)
+
+    async def _open(self, url, compressed):
+        for _ in range(MAX_REDIRECTS + 1):
+            parsed_url = urlparse(url)
+            if parsed_url.scheme not in ('http', 'https'):
+                raise ValueError('Unsupported URL scheme: {}'.format(url))
+            is_tls = parsed_url.scheme == 'https'
+            request_path = parsed_url.path or '/'
+            if parsed_url.query:
+                request_path += '?{}'.format(parsed_url.query)
+            request_lines = [
+                'GET {} HTTP/1.1'.format(request_path),
+                'Host: {}'.format(parsed_url.netloc),
+                'User-Agent: {}'.format(USER_AGENT),
+                'Accept: */*',
+                'Connection: close']
+            if compressed:
+                request_lines.append('Accept-Encoding: {}'.format(', '.join(utils.get_accepted_encodings())))
+
+            with tracing.span('ttfb', url=url) as ttfb_span:
+                reader, writer = await self._open_connection(
+                    parsed_url.hostname, parsed_url.port or (443 if is_tls else 80), is_tls)
+                try:
+                    writer.write('{}\r\n\r\n'.format('\r\n'.join(request_lines)).encode('latin-1'))
+                    status, headers = await asyncio.wait_for(_read_response_head(reader), self._timeout)
+                except BaseException:
+                    writer.close()
+                    raise
+                ttfb_span.set(status=status)
+
+            if status in REDIRECT_STATUS_CODES and headers.get('location', None):
+                writer.close()
+                url = urljoin(url, headers['location'])
+                continue
+            if status != 200:
+                writer.close()
+                raise AsyncHTTPError(url, status, headers)
+
+            return AsyncResponse(url, status, headers, reader, writer, timeout=self._timeout)
+
+        raise AsyncHTTPError(url, status, headers)
+
+
+async def _read_response_head(reader):
+    status_line = await reader.readline()
+    status_tokens = status_line.split()
+    if len(status_tokens) < 2 or not status_tokens[0].startswith(b'HTTP/'):
+        raise ConnectionError('Invalid HTTP response status line: {}'.format(status_line))
+
+    headers = dict()
+    while True:
+        header_line = await reader.readline()
+        if not header_line.strip():
+            break
+        header_name, _, header_value = header_line.decode('latin-1').partition(':')
+        headers[header_name.strip().lower()] = header_value.strip()
+
+    return int(status_tokens[1]), headers
+
+
+async def _write_response(rsp, file_path, hashers, hash_times, cancel_token=None):
+    """
+    Writes the body of the given response into the given file, feeding the given hashers with it
+    """
+
+    data_size = 0
+    with open(file_path, 'wb') as fh:
+        while True:
+            cancellation.raise_if_cancelled(cancel_token)
+            chunk = await rsp.read_chunk()
+            if not chunk:
+                break
+            data_size += len(chunk)
+            _write_chunk(fh, chunk, hashers, hash_times)
+
+    return data_size
+
+
+def _write_chunk(fh, chunk, hashers, hash_times):
+    hash_start = timeit.default_timer()
+    for hasher in hashers.values():
+        hasher.update(chunk)
+    hash_times[0] += timeit.default_timer() - hash_start
+    fh.write(chunk)
+
+
+def _copy_file(url, file_path, hashers, hash_times, cancel_token=None):
+    """
+    Copies the file of the given file URL into the given file, feeding the given hashers with it
+    """
+
+    data_size = 0
+    with open(url2pathname(urlparse(url).path), 'rb') as source, open(file_path, 'wb') as fh:
+        while True:
+            cancellation.raise_if_cancelled(cancel_token)
+            chunk = source.read(utils.DOWNLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            data_size += len(chunk)
+            _write_chunk(fh, chunk, hashers, hash_times)
+
+    return data_size
+
+
+def _read_file(url):
+    with open(url2pathname(urlparse(url).path), 'rb') as fh:
+        return fh.read()
+
+
+class BackgroundLoop(object):
+    """
+    asyncio loop that runs in a dedicated daemon thread
+    """
+
+    def __init__(self):
+        super(BackgroundLoop, self).__init__()
+
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self):
+        return self._loop
+
+    def is_running(self):
+        """
+        Returns whether or not loop thread is running
+
+        :return: True if the loop is running; False otherwise.
+        :rtype: bool
+        """
+
+        return bool(self._thread and self._thread.is_alive())
+
+    def start(self):
+        """
+        Starts loop thread, if it is not already running
+        """
+
+        with self._lock:
+            if self.is_running():
+                return
+            self._loop = asyncio.new_event_loop()
+            loop_ready = threading.Event()
+            self._thread = threading.Thread(
+                target=self._run_loop, args=(self._loop, loop_ready), name='ArtellaUpdaterAsyncLoop')
+            self._thread.daemon = True
+            self._thread.start()
+            loop_ready.wait()
+
+    def stop(self):
+        """
+        Stops loop thread. Pending tasks are cancelled
+        """
+
+        with self._lock:
+            if not self.is_running():
+                return
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, coro):
+        """
+        Schedules the given coroutine in the loop
+
+        :param coroutine coro: coroutine to run
+        :return: future that can be used from any thread to wait for coroutine result
+        :rtype: concurrent.futures.Future
+        """
+
+        self.start()
+
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def run(self, coro, timeout=None):
+        """
+        Runs the given coroutine in the loop and waits for its result
+
+        :param coroutine coro: coroutine to run
+        :param float timeout: maximum time to wait (in seconds)
+        :return: coroutine result
+        """
+
+        return self.submit(coro).result(timeout)
+
+    def _run_loop(self, loop, loop_ready):
+        asyncio.set_event_loop(loop)
+        loop.call_soon(loop_ready.set)
+        try:
+            loop.run_forever()
+        finally:
+            _cancel_pending_tasks(loop)
+            loop.close()
+
+
+def _cancel_pending_tasks(loop):
+    all_tasks = asyncio.all_tasks if hasattr(asyncio, 'all_tasks') else asyncio.Task.all_tasks
+    pending_tasks = [task for task in all_tasks(loop) if not task.done()]
+    for task in pending_tasks:
+        task.cancel()
+    if pending_tasks:
+        loop.run_until_complete(asyncio.gather(*pending_tasks, return_exceptions=True))
+
+
+def is_available():
+    """
+    Returns whether or not the asyncio client can be used. Proxies are not supported by the client, so it cannot be
+    used if a proxy is configured
+
+    :return: True if the asyncio client can be used; False otherwise.
+    :rtype: bool
+    """
+
+    proxies = getproxies()
+
+    return not proxies.get('http', None) and not proxies.get('https', None)
+
+
+def get_loop_mode():
+    """
+    Returns where asyncio loop of AsyncRunner objects runs, as defined by ARTELLA_UPDATER_ASYNC_LOOP environment
+    variable: in a background thread (thread) or in Qt main thread (qt)
+
+    :return: loop mode
+    :rtype: str
+    """
+
+    loop_mode = os.environ.get(ASYNC_LOOP_ENV, '').strip().lower() or ASYNC_LOOP_MODES[0]
+    if loop_mode not in ASYNC_LOOP_MODES:
+        logger.warning('Unknown Artella Updater async loop mode "{}". Valid modes are: {}'.format(
+            loop_mode, ', '.join(ASYNC_LOOP_MODES)))
+        return ASYNC_LOOP_MODES[0]
+
+    return loop_mode
+
+
+def get_client():
+    """
+    Returns the shared asyncio HTTP client
+
+    :return: asyncio HTTP client
+    :rtype: AsyncHTTPClient
+    """
+
+    global _CLIENT
+
+    with _LOCK:
+        if _CLIENT is None:
+            _CLIENT = AsyncHTTPClient()
+
+    return _CLIENT
+
+
+def get_background_loop():
+    """
+    Returns the shared background loop
+
+    :return: background loop
+    :rtype: BackgroundLoop
+    """
+
+    global _BACKGROUND_LOOP
+
+    with _LOCK:
+        if _BACKGROUND_LOOP is None:
+            _BACKGROUND_LOOP = BackgroundLoop()
+
+    return _BACKGROUND_LOOP
+
+
+if qtutils.QT_AVAILABLE:
+    class AsyncRunner(QtCore.QObject, object):
+        """
+        Runs coroutines and calls their callbacks in Qt main thread. Coroutines run in the shared background loop or,
+        if ARTELLA_UPDATER_ASYNC_LOOP is qt, in an asyncio loop stepped by a Qt timer
+        """
+
+        _taskDone = QtCore.Signal(object, object, object)
+
+        def __init__(self, parent=None):
+            super(AsyncRunner, self).__init__(parent)
+
+            # Futures are discarded from the loop thread when the background loop is used
+            self._futures = set()
+            self._futures_lock = threading.Lock()
+            self._shutdown = False
+            self._qt_loop = None
+            self._step_timer = None
+            if get_loop_mode() == 'qt':
+                self._qt_loop = asyncio.new_event_loop()
+                self._step_timer = QtCore.QTimer(self)
+                self._step_timer.setInterval(QT_STEP_INTERVAL)
+                self._step_timer.timeout.connect(self._step)
+
+            self._taskDone.connect(self._on_task_done)
+
+        def run(self, coro, callback=None):
+            """
+            Runs the given coroutine
+
+            :param coroutine coro: coroutine to run
+            :param callable callback: function called in Qt main thread with coroutine result and error (None if
+                the coroutine finished successfully). It is not called if the coroutine is cancelled
+            :return: future of the coroutine
+            """
+
+            if self._qt_loop is not None:
+                future = self._qt_loop.create_task(coro)
+                if not self._step_timer.isActive():
+                    self._step_timer.start()
+            else:
+                future = get_background_loop().submit(coro)
+            with self._futures_lock:
+                self._futures.add(future)
+            future.add_done_callback(functools.partial(self._on_future_done, callback))
+
+            return future
+
+        def shutdown(self):
+            """
+            Cancels all the pending coroutines. Callbacks are not called after shutdown
+            """
+
+            self._shutdown = True
+            with self._futures_lock:
+                futures = list(self._futures)
+                self._futures.clear()
+            for future in futures:
+                future.cancel()
+            if self._qt_loop is not None:
+                self._step_timer.stop()
+                _cancel_pending_tasks(self._qt_loop)
+                self._qt_loop.close()
+                self._qt_loop = None
+
+        def _step(self):
+            if self._qt_loop is None:
+                return
+            self._qt_loop.call_soon(self._qt_loop.stop)
+            self._qt_loop.run_forever()
+            with self._futures_lock:
+                has_futures = bool(self._futures)
+            if not has_futures:
+                self._step_timer.stop()
+
+        def _on_future_done(self, callback, future):
+            # In background loop mode this is called from loop thread, so the callback is queued to Qt main thread
+            with self._futures_lock:
+                self._futures.discard(future)
+            if future.cancelled():
+                return
+            error = future.exception()
+            if error is not None:
+                logger.error('Error while running Artella Updater async task: {}'.format(error))
+            self._taskDone.emit(callback, None if error is not None else future.result(), error)
+
+        def _on_task_done(self, callback, result, error):
+            if self._shutdown or not callback:
+                return
+            callback(result, error)
@@ -0,0 +1,137 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains cooperative cancellation of updater operations.
+
+Long running updater functions (downloads, package extraction and metadata requests) accept a cancel_token
+argument. They check the token between chunks and package members and raise CancelledError, after removing partial
+files, once the token is cancelled. All tokens are cancelled when the interpreter exits, so running operations do
+not keep the DCC waiting on close.
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import atexit
+import logging
+import weakref
+import threading
+
+logger = logging.getLogger('artella')
+
+_TOKENS = weakref.WeakSet()
+_LOCK = threading.Lock()
+
+
+class CancelledError(Exception):
+    """
+    Exception raised when an operation is cancelled through its cancellation token
+    """
+
+    pass
+
+
+class CancellationToken(object):
+    """
+    Thread-safe flag used to request the cancellation of running operations
+    """
+
+    def __init__(self):
+        super(CancellationToken, self).__init__()
+
+        self._event = threading.Event()
+        self._callbacks = list()
+        self._lock = threading.Lock()
+
+        with _LOCK:
+            _TOKENS.add(self)
+
+    def is_cancelled(self):
+        """
+        Returns whether or not the token has been cancelled
+
+        :return: True if the token was cancelled; False otherwise.
+        :rtype: bool
+        """
+
+        return self._event.is_set()
+
+    def cancel(self):
+        """
+        Cancels the token. Registered callbacks are called in the calling thread
+        """
+
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, list()
+
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as exc:
+                logger.debug('Error while calling cancellation callback: {}'.format(exc))
+
+    def add_callback(self, callback):
+        """
+        Registers a function that is called when the token is cancelled. If the token is already cancelled, the
+        function is called immediately
+
+        :param callable callback: function without arguments
+        """
+
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+
+        callback()
+
+    def raise_if_cancelled(self):
+        """
+        Raises CancelledError if the token has been cancelled
+
+        :raises CancelledError: if the token was cancelled
+        """
+
+        if self._event.is_set():
+            raise CancelledError('Operation cancelled')
+
+    def wait(self, timeout):
+        """
+        Waits the given time or until the token is cancelled, whatever happens first. Used instead of time.sleep
+
+        :param float timeout: maximum time to wait (in seconds)
+        :return: True if the token was cancelled; False otherwise.
+        :rtype: bool
+        """
+
+        return self._event.wait(timeout)
+
+
+def raise_if_cancelled(cancel_token):
+    """
+    Raises CancelledError if the given token (that can be None) has been cancelled
+
+    :param CancellationToken or None cancel_token: cancellation token
+    :raises CancelledError: if the token was cancelled
+    """
+
+    if cancel_token is not None:
+        cancel_token.raise_if_cancelled()
+
+
+def cancel_all():
+    """
+    Cancels all the existing cancellation tokens
+    """
+
+    with _LOCK:
+        tokens = list(_TOKENS)
+
+    for token in tokens:
+        token.cancel()
+
+
+atexit.register(cancel_all)
@@ -0,0 +1,334 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains Artella Updater command line interface implementation
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import os
+import sys
+import json
+import shutil
+import logging
+import argparse
+import tempfile
+
+import artella.dcc as dcc
+from artella.core import plugins
+from artella.plugins.updater import utils, mirror, manifest, compiler
+
+
+logger = logging.getLogger('artella')
+
+
+def main(args=None):
+    """
+    Entry point of the Artella Updater command line interface
+
+    :param list(str) args: command line arguments. If not given, sys.argv arguments will be used
+    :return: exit code (0 if all the operations were successful; 1 otherwise)
+    :rtype: int
+    """
+
+    parser = _create_parser()
+    options = parser.parse_args(args)
+    if not getattr(options, 'command', None):
+        parser.print_help()
+        return 1
+
+    logging.basicConfig(level=logging.DEBUG if options.verbose else logging.WARNING)
+    if options.mirror:
+        utils.set_mirror_url(options.mirror)
+
+    result, valid = options.func(options)
+    _output(result, options)
+
+    return 0 if valid else 1
+
+
+def _create_parser():
+    output_parser = argparse.ArgumentParser(add_help=False)
+    output_parser.add_argument(
+        '--json', action='store_true', help='Output results as JSON')
+    output_parser.add_argument(
+        '-j', '--jobs', type=int, default=4, help='Number of plugins to process in parallel (default: 4)')
+    output_parser.add_argument(
+        '--mirror', default=None, help='URL or folder of the mirror to retrieve data from (see "mirror" command)')
+    output_parser.add_argument(
+        '-v', '--verbose', action='store_true', help='Show debug log messages')
+
+    common_parser = argparse.ArgumentParser(add_help=False, parents=[output_parser])
+    common_parser.add_argument(
+        '--dcc', dest='dcc_name', default=None, help='Name of the DCC to use instead of the current one')
+    common_parser.add_argument(
+        '--platform', default=None, choices=mirror.PLATFORMS, help='OS platform to use instead of the current one')
+
+    parser = argparse.ArgumentParser(
+        prog='python -m artella.plugins.updater', description='Artella Plugins Updater command line interface')
+    subparsers = parser.add_subparsers(dest='command')
+
+    check_parser = subparsers.add_parser(
+        'check', parents=[common_parser], help='Check if new versions of DCC plugin and plugins are available')
+    check_parser.add_argument(
+        'plugin_ids', nargs='*',
+        help='IDs of the plugins to check. If not given, loaded plugins and plugins installed by the updater will be '
+             'used')
+    check_parser.set_defaults(func=_check)
+
+    download_parser = subparsers.add_parser(
+        'download', parents=[common_parser], help='Download latest version of the given plugins')
+    download_parser.add_argument('plugin_ids', nargs='+', help='IDs of the plugins to download')
+    download_parser.add_argument(
+        '-o', '--output', default=os.getcwd(), help='Folder where packages will be downloaded')
+    download_parser.set_defaults(func=_download)
+
+    install_parser = subparsers.add_parser(
+        'install', parents=[common_parser], help='Download and install latest version of the given plugins')
+    install_parser.add_argument('plugin_ids', nargs='+', help='IDs of the plugins to install')
+    install_parser.add_argument(
+        '--install-path', default=None,
+        help='Folder where plugin Python packages will be installed (for example, <site-packages>/artella/plugins). '
+             'If not given, current plugin install folder will be used')
+    install_parser.add_argument(
+        '--force', action='store_true', help='Install plugins even if latest version is already installed')
+    install_parser.add_argument(
+        '--no-compile', dest='compile', action='store_false',
+        help='Do not byte-compile installed plugins (see {} environment variable)'.format(compiler.INTERPRETERS_ENV))
+    install_parser.set_defaults(func=_install)
+
+    status_parser = subparsers.add_parser(
+        'status', parents=[common_parser], help='Show installed version and location of the given plugins')
+    status_parser.add_argument(
+        'plugin_ids', nargs='*', help='IDs of the plugins to show. If not given, loaded plugins will be used')
+    status_parser.set_defaults(func=_status)
+
+    mirror_parser = subparsers.add_parser(
+        'mirror', parents=[output_parser],
+        help='Download all the data retrieved by the updater into a folder that can be used as mirror')
+    mirror_parser.add_argument('mirror_path', help='Root folder of the mirror')
+    mirror_parser.add_argument('plugin_ids', nargs='*', help='IDs of extra plugins to mirror')
+    mirror_parser.add_argument(
+        '--dcc', dest='dcc_names', action='append', default=None,
+        help='Name of a DCC to mirror. Can be given multiple times. If not given, current DCC will be used')
+    mirror_parser.add_argument(
+        '--platform', dest='platforms', action='append', default=None, choices=mirror.PLATFORMS,
+        help='OS platform to mirror. Can be given multiple times. If not given, all platforms will be mirrored')
+    mirror_parser.set_defaults(func=_mirror)
+
+    return parser
+
+
+def _output(result, options):
+    if options.json:
+        print(json.dumps(result, indent=4, sort_keys=True))
+        return
+
+    if options.command == 'mirror':
+        for key in ('downloaded', 'skipped', 'failed'):
+            print('{}: {}'.format(key, len(result.get(key, list()))))
+        for file_path in result.get('failed', list()):
+            print('ERROR {}'.format(file_path))
+        return
+
+    if result.get('error', None):
+        print('ERROR {}'.format(result['error']))
+    dcc_result = result.get('dcc', None)
+    if dcc_result:
+        print('{}: {} -> {}{}'.format(
+            dcc_result.get('name'), dcc_result.get('current_version') or '-', dcc_result.get('latest_version') or '-',
+            ' (update available)' if dcc_result.get('update_available') else ''))
+    for plugin_result in result.get('plugins', list()):
+        error = plugin_result.get('error', '')
+        if error:
+            print('{}: ERROR {}'.format(plugin_result['id'], error))
+        elif options.command == 'check':
+            print('{}: {} -> {}{}'.format(
+                plugin_result['id'], plugin_result.get('installed_version') or '-',
+                plugin_result.get('latest_version') or '-',
+                ' (update available)' if plugin_result.get('update_available') else ''))
+        elif options.command == 'download':
+            print('{}: {}'.format(plugin_result['id'], plugin_result.get('file_path')))
+        elif options.command == 'install':
+            print('{}: {} ({})'.format(
+                plugin_result['id'], plugin_result.get('status'), plugin_result.get('install_path')))
+        else:
+            print('{}: {} ({})'.format(
+                plugin_result['id'], plugin_result.get('installed_version') or '-',
+                plugin_result.get('install_path') or '-'))
+
+
+def _run_plugins(plugin_fn, plugin_ids, jobs=1):
+    """
+    Runs the given function for each one of the given plugins. Errors raised while a plugin is processed are reported
+    in its result, so they do not stop the processing of the other plugins
+
+    :param callable plugin_fn: function that receives a plugin ID and returns the result dictionary of the plugin
+    :param list(str) plugin_ids: IDs of the plugins to process
+    :param int jobs: number of plugins to process in parallel
+    :return: list with the result of each plugin and whether or not all the plugins were processed successfully
+    :rtype: tuple(list(dict), bool)
+    """
+
+    def _run_plugin(plugin_id):
+        try:
+            return plugin_fn(plugin_id)
+        except Exception as exc:
+            logger.debug('Error while processing plugin "{}"'.format(plugin_id), exc_info=True)
+            return {'id': plugin_id, 'error': str(exc) or exc.__class__.__name__}
+
+    results = utils.run_in_parallel(_run_plugin, plugin_ids, jobs=jobs)
+
+    return results, all(not result.get('error') for result in results)
+
+
+def _check(options):
+    result = dict()
+    valid = True
+
+    dcc_name = options.dcc_name or dcc.name()
+    plugin_ids = options.plugin_ids or sorted(set(plugins.plugins().keys()) | set(manifest.installed_plugins().keys()))
+    if not dcc_name and not plugin_ids:
+        result['error'] = 'No DCC is available and no plugin IDs were given (use --dcc option or give plugin IDs)'
+        return result, False
+
+    if dcc_name:
+        platform = options.platform or utils.get_current_platform()
+        latest_release_info = utils.get_latest_stable_artella_dcc_plugin_info(dcc_name=dcc_name, platform=platform)
+        current_version = None
+        if dcc_name == dcc.name():
+            try:
+                from artella.core import dccplugin
+                current_version = dccplugin.DccPlugin().get_version()
+            except Exception as exc:
+                logger.debug('Impossible to retrieve current DCC plugin version: {}'.format(exc))
+        latest_version = latest_release_info.get('version', None)
+        result['dcc'] = {
+            'name': dcc_name,
+            'platform': platform,
+            'current_version': current_version,
+            'latest_version': latest_version,
+            'url': latest_release_info.get('url', ''),
+            'update_available': bool(
+                latest_version and current_version and utils.is_version_newer(latest_version, current_version))
+        }
+        valid = bool(latest_release_info)
+
+    def _check_plugin(plugin_id):
+        pypi_info = utils.get_pypi_info(plugin_id)
+        if not pypi_info:
+            return {'id': plugin_id, 'error': 'Impossible to retrieve PyPI information'}
+        installed_version = utils.get_installed_plugin_version(plugin_id)
+        latest_version = pypi_info.get('version', '')
+        return {
+            'id': plugin_id,
+            'installed_version': installed_version,
+            'latest_version': latest_version,
+            'upload_date': pypi_info.get('upload_date', ''),
+            'size': pypi_info.get('size', ''),
+            'url': pypi_info.get('url', ''),
+            'update_available': bool(
+                not installed_version or utils.is_version_newer(latest_version, installed_version))
+        }
+
+    result['plugins'], plugins_valid = _run_plugins(_check_plugin, plugin_ids, jobs=options.jobs)
+
+    return result, valid and plugins_valid
+
+
+def _download(options):
+    output_path = os.path.abspath(options.output)
+    if not os.path.isdir(output_path):
+        os.makedirs(output_path)
+
+    def _download_plugin(plugin_id):
+        pypi_info = utils.get_pypi_info(plugin_id)
+        plugin_url = pypi_info.get('url', '') if pypi_info else ''
+        if not plugin_url:
+            return {'id': plugin_id, 'error': 'Impossible to retrieve PyPI package URL'}
+        file_path = os.path.join(output_path, plugin_url.split('/')[-1])
+        if not utils.download_package_from_pypi(plugin_url, file_path, digests=pypi_info.get('digests', None)):
+            return {'id': plugin_id, 'error': 'Impossible to download package from PyPI ({})'.format(plugin_url)}
+        return {'id': plugin_id, 'version': pypi_info.get('version', ''), 'file_path': file_path}
+
+    results, valid = _run_plugins(_download_plugin, options.plugin_ids, jobs=options.jobs)
+
+    return {'plugins': results}, valid
+
+
+def _install(options):
+
+    def _install_plugin(plugin_id):
+        install_path = options.install_path or utils.get_plugin_install_path(plugin_id)
+        if not install_path:
+            return {'id': plugin_id, 'error': 'Plugin is not installed and no install path was given'}
+        install_path = os.path.abspath(install_path)
+        pypi_info = utils.get_pypi_info(plugin_id)
+        plugin_url = pypi_info.get('url', '') if pypi_info else ''
+        if not plugin_url:
+            return {'id': plugin_id, 'error': 'Impossible to retrieve PyPI package URL'}
+        latest_version = pypi_info.get('version', '')
+        if options.install_path:
+            installed_version = manifest.get_installed_plugin_version(plugin_id, install_path)
+        else:
+            installed_version = utils.get_installed_plugin_version(plugin_id)
+        if not options.force and installed_version and not utils.is_version_newer(latest_version, installed_version):
+            return {'id': plugin_id, 'version': installed_version, 'install_path': install_path, 'status': 'updated'}
+
+        module_path = utils.get_plugin_module_path(plugin_id)
+        file_hashes = dict()
+        temp_path = tempfile.mkdtemp(prefix='artella-updater-')
+        try:
+            file_path = os.path.join(temp_path, plugin_url.split('/')[-1])
+            extracted_paths = utils.download_and_extract_package_from_pypi(
+                plugin_url, file_path, install_path, package_path=module_path,
+                digests=pypi_info.get('digests', None), file_hashes=file_hashes)
+        finally:
+            shutil.rmtree(temp_path, ignore_errors=True)
+        plugin_folder = utils.find_extracted_folder(install_path, extracted_paths, [module_path.split('.')[-1]])
+        if not plugin_folder:
+            return {'id': plugin_id, 'error': 'Impossible to download and extract plugin from PyPI ({})'.format(
+                plugin_url)}
+        if options.compile and not compiler.compile_package(plugin_folder):
+            logger.warning('Some files of plugin "{}" could not be compiled: {}'.format(plugin_id, plugin_folder))
+        manifest.register_installed_plugin(
+            plugin_id, latest_version, install_path, plugin_folder, file_hashes=file_hashes)
+        utils.clear_plugin_install_paths_cache(plugin_id)
+
+        return {'id': plugin_id, 'version': latest_version, 'install_path': install_path, 'status': 'installed'}
+
+    results, valid = _run_plugins(_install_plugin, options.plugin_ids, jobs=options.jobs)
+
+    return {'plugins': results}, valid
+
+
+def _status(options):
+    plugin_ids = options.plugin_ids or sorted(plugins.plugins().keys())
+
+    def _plugin_status(plugin_id):
+        return {
+            'id': plugin_id,
+            'installed_version': utils.get_installed_plugin_version(plugin_id),
+            'install_path': utils.get_plugin_install_path(plugin_id)
+        }
+
+    results, valid = _run_plugins(_plugin_status, plugin_ids, jobs=options.jobs)
+
+    return {'plugins': results}, valid
+
+
+def _mirror(options):
+    dcc_names = options.dcc_names or [dcc.name()]
+    if not all(dcc_names):
+        return {'failed': ['No DCC name given and no DCC is available']}, False
+
+    stats = mirror.sync_mirror(
+        options.mirror_path, dcc_names, plugin_ids=options.plugin_ids, platforms=options.platforms,
+        jobs=options.jobs)
+
+    return stats, not stats['failed']
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,165 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains functions to byte-compile the Python files of installed plugins.
+
+Plugins are compiled right after being installed, while the updater has write access to the install folder, so
+plugin reloads and next DCC sessions import already compiled files. Besides the current interpreter, plugins can be
+compiled with any other interpreter plugins are deployed to by setting ARTELLA_UPDATER_INTERPRETERS environment
+variable (list of Python executables separated by os.pathsep).
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import os
+import sys
+import logging
+import compileall
+import subprocess
+import multiprocessing
+
+from artella.plugins.updater import tracing
+
+logger = logging.getLogger('artella')
+
+INTERPRETERS_ENV = 'ARTELLA_UPDATER_INTERPRETERS'
+
+
+def get_interpreters():
+    """
+    Returns the extra Python interpreters plugins should be compiled with
+
+    :return: list of Python executable paths
+    :rtype: list(str)
+    """
+
+    interpreters = list()
+    for interpreter in os.environ.get(INTERPRETERS_ENV, '').split(os.pathsep):
+        interpreter = interpreter.strip()
+        if not interpreter or interpreter in interpreters:
+            continue
+        if not os.path.isfile(interpreter):
+            logger.warning('Python interpreter to compile plugins with does not exist: {}'.format(interpreter))
+            continue
+        interpreters.append(interpreter)
+
+    return interpreters
+
+
+def get_compile_jobs(jobs=None):
+    """
+    Returns the number of processes to use to compile plugins
+
+    :param int jobs: number of processes. If not given, number of CPUs will be used
+    :return: number of processes
+    :rtype: int
+    """
+
+    if jobs:
+        return max(1, int(jobs))
+
+    try:
+        return multiprocessing.cpu_count()
+    except NotImplementedError:
+        return 1
+
+
+def can_use_process_pool():
+    """
+    Returns whether or not current interpreter can compile files using a pool of processes.
+    Process pools start new processes using current executable, so they cannot be used inside DCCs, where the
+    executable is the DCC itself (for example, maya.exe).
+
+    :return: True if current executable is a Python interpreter and process pools are available; False otherwise.
+    :rtype: bool
+    """
+
+    if sys.version_info[:2] < (3, 5):
+        return False
+
+    executable_name = os.path.splitext(os.path.basename(sys.executable or ''))[0].lower()
+
+    return executable_name.startswith('python')
+
+
+def compile_package(package_path, jobs=None, interpreters=None):
+    """
+    Byte-compiles all Python files of the given folder with current interpreter and with the given interpreters
+
+    :param str package_path: folder to compile
+    :param int jobs: number of processes to use. If not given, number of CPUs will be used
+    :param list(str) interpreters: extra Python interpreters to compile with. If not given, interpreters defined in
+        ARTELLA_UPDATER_INTERPRETERS environment variable will be used
+    :return: True if all files were compiled successfully with all the interpreters; False otherwise.
+    :rtype: bool
+    """
+
+    if not package_path or not os.path.isdir(package_path):
+        return False
+
+    jobs = get_compile_jobs(jobs)
+    interpreters = get_interpreters() if interpreters is None else interpreters
+
+    with tracing.span('compile', package_path=package_path, interpreter=sys.executable):
+        valid = compile_with_current_interpreter(package_path, jobs=jobs)
+    for interpreter in interpreters:
+        if os.path.normcase(os.path.abspath(interpreter)) == os.path.normcase(os.path.abspath(sys.executable or '')):
+            continue
+        with tracing.span('compile', package_path=package_path, interpreter=interpreter):
+            valid = compile_with_interpreter(interpreter, package_path, jobs=jobs) and valid
+
+    return valid
+
+
+def compile_with_current_interpreter(package_path, jobs=1):
+    """
+    Byte-compiles all Python files of the given folder with current interpreter
+
+    :param str package_path: folder to compile
+    :param int jobs: number of processes to use. Only used if process pools can be used (see can_use_process_pool)
+    :return: True if all files were compiled successfully; False otherwise.
+    :rtype: bool
+    """
+
+    try:
+        if jobs > 1 and can_use_process_pool():
+            return bool(compileall.compile_dir(package_path, quiet=1, workers=jobs))
+        return bool(compileall.compile_dir(package_path, quiet=1))
+    except Exception as exc:
+        logger.warning('Error while compiling plugin files: {} | {}'.format(package_path, exc))
+        return False
+
+
+def compile_with_interpreter(interpreter, package_path, jobs=1):
+    """
+    Byte-compiles all Python files of the given folder by running compileall module with the given interpreter
+
+    :param str interpreter: Python executable path
+    :param str package_path: folder to compile
+    :param int jobs: number of processes to use. Ignored by interpreters that do not support parallel compilation
+    :return: True if all files were compiled successfully; False otherwise.
+    :rtype: bool
+    """
+
+    command = [interpreter, '-m', 'compileall', '-q']
+    commands = [command + ['-j', str(jobs), package_path], command + [package_path]] if jobs > 1 else [
+        command + [package_path]]
+    for i, compile_command in enumerate(commands):
+        try:
+            process = subprocess.Popen(compile_command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+            output = process.communicate()[0]
+        except Exception as exc:
+            logger.warning('Error while compiling plugin files with "{}": {} | {}'.format(
+                interpreter, package_path, exc))
+            return False
+        if process.returncode == 0:
+            return True
+        # Python 2 compileall does not support parallel compilation
+        if i < len(commands) - 1 and b'-j' in output:
+            continue
+        logger.warning('Error while compiling plugin files with "{}": {} | {}'.format(
+            interpreter, package_path, output.decode('utf-8', 'replace').strip()))
+        return False
+
+    return False
@@ -0,0 +1,170 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains file functions shared by Artella Updater modules that write files other processes read
+(manifest, mirror, rollout state, metrics, ...).
+
+Files are always written into a temporary file in the same folder that atomically replaces the target file, so
+readers never find a partially written file or no file at all. Files that are read, modified and written again by
+several processes (for example, the manifest shared by all the DCCs of the user) must be updated while holding a
+FileLock, so changes written by other processes are not lost.
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import os
+import time
+import tempfile
+import logging
+
+logger = logging.getLogger('artella')
+
+LOCK_TIMEOUT = 10.0
+LOCK_STALE_TIMEOUT = 60.0
+LOCK_POLL_INTERVAL = 0.05
+
+
+class FileLockTimeoutError(Exception):
+    """
+    Exception raised when a file lock cannot be acquired before its timeout
+    """
+
+    pass
+
+
+class FileLock(object):
+    """
+    Lock shared between processes. Lock is held while a lock file, created next to the locked file, exists.
+    Lock files older than the stale timeout are considered left behind by killed processes and are removed.
+    """
+
+    def __init__(self, file_path, timeout=LOCK_TIMEOUT, stale_timeout=LOCK_STALE_TIMEOUT):
+        self._lock_path = '{}.lock'.format(file_path)
+        self._timeout = timeout
+        self._stale_timeout = stale_timeout
+        self._locked = False
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    @property
+    def lock_path(self):
+        return self._lock_path
+
+    def acquire(self):
+        """
+        Creates the lock file, waiting until the lock file of other processes is removed
+
+        :raises FileLockTimeoutError: if the lock file is not removed before the lock timeout
+        """
+
+        lock_folder = os.path.dirname(self._lock_path)
+        if lock_folder and not os.path.isdir(lock_folder):
+            try:
+                os.makedirs(lock_folder)
+            except OSError:
+                if not os.path.isdir(lock_folder):
+                    raise
+
+        end_time = time.time() + self._timeout
+        while True:
+            try:
+                file_descriptor = os.open(self._lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except OSError:
+                if not os.path.isfile(self._lock_path):
+                    raise
+                self._remove_stale_lock()
+                if time.time() >= end_time:
+                    raise FileLockTimeoutError('Timeout while waiting for lock file: {}'.format(self._lock_path))
+                time.sleep(LOCK_POLL_INTERVAL)
+                continue
+            try:
+                os.write(file_descriptor, str(os.getpid()).encode('utf-8'))
+            finally:
+                os.close(file_descriptor)
+            self._locked = True
+            return
+
+    def release(self):
+        """
+        Removes the lock file, if it was created by this lock
+        """
+
+        if not self._locked:
+            return
+
+        self._locked = False
+        try:
+            os.remove(self._lock_path)
+        except OSError as exc:
+            logger.warning('Error while removing lock file: {} | {}'.format(self._lock_path, exc))
+
+    def _remove_stale_lock(self):
+        try:
+            if time.time() - os.path.getmtime(self._lock_path) < self._stale_timeout:
+                return
+            logger.warning('Removing stale lock file: {}'.format(self._lock_path))
+            os.remove(self._lock_path)
+        except OSError:
+            # Lock file was removed by its owner (or by other process) in the meantime
+            pass
+
+
+def replace_file(source_path, target_path):
+    """
+    Moves the given file to the target path, replacing the target file atomically if it exists
+
+    :param str source_path: path of the file to move. It must be in the same file system as the target path
+    :param str target_path: path of the file to replace
+    """
+
+    if hasattr(os, 'replace'):
+        os.replace(source_path, target_path)
+    elif os.name != 'nt' or not os.path.isfile(target_path):
+        # rename replaces existing files atomically in POSIX systems
+        os.rename(source_path, target_path)
+    else:
+        # Python 2 cannot replace existing files in Windows, so the old file is moved away before the rename and
+        # restored if the rename fails
+        backup_path = '{}.bak'.format(target_path)
+        if os.path.isfile(backup_path):
+            os.remove(backup_path)
+        os.rename(target_path, backup_path)
+        try:
+            os.rename(source_path, target_path)
+        except OSError:
+            os.rename(backup_path, target_path)
+            raise
+        os.remove(backup_path)
+
+
+def write_file(file_path, data):
+    """
+    Writes the given data into a temporary file that atomically replaces the given file
+
+    :param str file_path: path of the file to write
+    :param str or bytes data: file contents
+    :raises OSError: if the file cannot be written. Target file is not modified
+    """
+
+    file_folder = os.path.dirname(file_path)
+    if file_folder and not os.path.isdir(file_folder):
+        os.makedirs(file_folder)
+
+    file_descriptor, temp_file_path = tempfile.mkstemp(
+        prefix='{}.'.format(os.path.basename(file_path)), suffix='.tmp', dir=file_folder or None)
+    try:
+        with os.fdopen(file_descriptor, 'wb') as fh:
+            fh.write(data.encode('utf-8') if not isinstance(data, bytes) else data)
+            fh.flush()
+            os.fsync(fh.fileno())
+        replace_file(temp_file_path, file_path)
+    except BaseException:
+        if os.path.isfile(temp_file_path):
+            os.remove(temp_file_path)
+        raise
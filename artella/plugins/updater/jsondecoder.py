@@ -0,0 +1,182 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains JSON decoding functions used by Artella Updater.
+
+JSON documents are decoded with the fastest available backend (orjson, ujson or Python json module). Backend can be
+forced with ARTELLA_UPDATER_JSON_BACKEND environment variable.
+
+PyPI JSON documents contain information about all the releases of a package, but the updater only needs package
+info and the files of one release. load_pypi_document function only decodes those parts of the document: the rest
+of the document is skipped without creating Python objects.
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import os
+import re
+import json
+import logging
+
+logger = logging.getLogger('artella')
+
+JSON_BACKEND_ENV = 'ARTELLA_UPDATER_JSON_BACKEND'
+JSON_BACKENDS = ('orjson', 'ujson', 'json')     # Backends in order of preference
+
+_SEPARATOR_REGEX = re.compile(r'[ \t\n\r]*:[ \t\n\r]*')
+
+_BACKEND = None
+
+
+def _import_backend(backend_name):
+    if backend_name == 'json':
+        return json
+    try:
+        return __import__(backend_name)
+    except ImportError:
+        return None
+
+
+def get_backend():
+    """
+    Returns the module used to decode JSON documents
+
+    :return: JSON backend module (orjson, ujson or json)
+    :rtype: module
+    """
+
+    global _BACKEND
+
+    if _BACKEND is not None:
+        return _BACKEND
+
+    backend_names = JSON_BACKENDS
+    forced_backend_name = os.environ.get(JSON_BACKEND_ENV, '').strip().lower()
+    if forced_backend_name:
+        if forced_backend_name in JSON_BACKENDS:
+            backend_names = (forced_backend_name, 'json')
+        else:
+            logger.warning('Unknown Artella Updater JSON backend "{}". Valid backends are: {}'.format(
+                forced_backend_name, ', '.join(JSON_BACKENDS)))
+
+    for backend_name in backend_names:
+        backend = _import_backend(backend_name)
+        if backend is not None:
+            _BACKEND = backend
+            break
+
+    return _BACKEND
+
+
+def set_backend(backend_name=None):
+    """
+    Sets the JSON backend to use
+
+    :param str or None backend_name: name of the backend (orjson, ujson or json). If None, the backend is selected
+        again the next time a document is decoded
+    """
+
+    global _BACKEND
+
+    if backend_name is None:
+        _BACKEND = None
+        return
+
+    backend = _import_backend(backend_name)
+    if backend is None:
+        raise ImportError('JSON backend "{}" is not available'.format(backend_name))
+    _BACKEND = backend
+
+
+def loads(data):
+    """
+    Decodes given JSON document with current JSON backend
+
+    :param str or bytes data: JSON document
+    :return: decoded document
+    """
+
+    if isinstance(data, bytes) and get_backend() is json:
+        data = data.decode('utf-8')
+
+    return get_backend().loads(data)
+
+
+def load_pypi_document(data, version=None):
+    """
+    Decodes the parts of a PyPI JSON document used by the updater: package info and the files of one release.
+    If the document does not follow PyPI JSON API layout, the full document is decoded.
+
+    :param str or bytes data: PyPI JSON document
+    :param str version: version of the release to decode. If not given, the version defined in package info is used
+    :return: dictionary with info and releases keys. Releases only contains given version.
+    :rtype: dict
+    """
+
+    if isinstance(data, bytes):
+        data = data.decode('utf-8')
+
+    try:
+        pypi_data = _load_pypi_document(data, version)
+    except ValueError as exc:
+        logger.debug('Impossible to decode PyPI document selectively. Decoding full document: {}'.format(exc))
+        pypi_data = None
+    if pypi_data is not None:
+        return pypi_data
+
+    pypi_data = loads(data)
+    if not isinstance(pypi_data, dict):
+        return pypi_data
+
+    return {'info': pypi_data.get('info', None), 'releases': pypi_data.get('releases', None)}
+
+
+def _find_value(data, key, index, value_start='[{"'):
+    """
+    Returns the index where the value of the given key starts. As JSON strings cannot contain unescaped quotes, a
+    quoted key preceded by "{" or "," and followed by ":" is always an object key. The depth of the key is not checked,
+    so it must only be used with keys that do not appear at other depths of the document
+    """
+
+    quoted_key = json.dumps(key)
+    index = data.find(quoted_key, index)
+    while index != -1:
+        key_end = index + len(quoted_key)
+        previous_index = index - 1
+        while previous_index >= 0 and data[previous_index] in ' \t\n\r':
+            previous_index -= 1
+        if previous_index >= 0 and data[previous_index] in '{,':
+            separator_match = _SEPARATOR_REGEX.match(data, key_end)
+            value_char = data[separator_match.end():separator_match.end() + 1] if separator_match else ''
+            if value_char and value_char in value_start:
+                return separator_match.end()
+        index = data.find(quoted_key, key_end)
+
+    return None
+
+
+def _load_pypi_document(data, version):
+    """
+    Decodes info and releases[version] values of the given PyPI document using C accelerated Python JSON decoder,
+    so the rest of the document is skipped without creating Python objects
+    """
+
+    decoder = json.JSONDecoder()
+
+    info_index = _find_value(data, 'info', 0, '{')
+    if info_index is None:
+        return None
+    info, info_end = decoder.raw_decode(data, info_index)
+    if not version and isinstance(info, dict):
+        version = info.get('version', None)
+
+    releases = dict()
+    releases_index = _find_value(data, 'releases', info_end, '{') or _find_value(data, 'releases', 0, '{')
+    if releases_index is None:
+        return None
+    release_index = _find_value(data, version, releases_index, '[') if version else None
+    if release_index is not None:
+        releases[version], _ = decoder.raw_decode(data, release_index)
+
+    return {'info': info, 'releases': releases}
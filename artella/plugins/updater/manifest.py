@@ -0,0 +1,226 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains functions to manage the manifest of plugins installed by Artella Updater.
+
+The manifest is a JSON file that stores, for each plugin installed by the updater, its version, install location,
+installed files and their hashes. It is written at install time and read lazily, so knowing which plugins are
+installed does not require to import plugin modules or to scan the file system.
+
+The same manifest file is shared by all the DCCs and Python interpreters of the user, and a plugin can be installed
+in different locations (one per DCC, custom install paths, ...). So each plugin can have multiple entries, one per
+install path and interpreter, and entries are only used for the install path the plugin is loaded from.
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import os
+import sys
+import json
+import platform
+import logging
+import threading
+from datetime import datetime
+
+from artella.plugins.updater import fileutils
+
+logger = logging.getLogger('artella')
+
+MANIFEST_PATH_ENV = 'ARTELLA_UPDATER_MANIFEST'
+LOCK_TIMEOUT = 10.0
+
+_MANIFEST = None
+_LOCK = threading.RLock()
+
+
+def get_manifest_path():
+    """
+    Returns path where installed plugins manifest file is located
+
+    :return: manifest file path
+    :rtype: str
+    """
+
+    return os.environ.get(MANIFEST_PATH_ENV, None) or os.path.normpath(
+        os.path.join(os.path.expanduser('~'), 'artella', 'updater', 'installed-plugins.json'))
+
+
+def installed_plugins():
+    """
+    Returns a dictionary containing the manifest entries of all the plugins installed by the updater.
+    Manifest file is only read the first time this function is called.
+
+    :return: dictionary with plugin IDs as keys and lists of plugin manifest entries as values
+    :rtype: dict
+    """
+
+    global _MANIFEST
+
+    with _LOCK:
+        if _MANIFEST is None:
+            _MANIFEST = _read_manifest(get_manifest_path())
+
+        return _MANIFEST
+
+
+def get_interpreter_key():
+    """
+    Returns the value that identifies current Python interpreter in manifest entries
+
+    :return: interpreter identifier (for example, cpython-3.7@C:/Program Files/Autodesk/Maya2022/Python)
+    :rtype: str
+    """
+
+    return '{}-{}.{}@{}'.format(
+        platform.python_implementation().lower(), sys.version_info[0], sys.version_info[1],
+        _normalize_path(sys.prefix))
+
+
+def get_installed_plugin(plugin_id, install_path):
+    """
+    Returns manifest entry of the given plugin installed, with current Python interpreter, in the given install path.
+    Entry is ignored if the plugin package folder does not exist anymore.
+
+    :param str plugin_id: ID of the plugin (for example, artella-plugins-updater)
+    :param str install_path: path of the folder that contains the plugin Python package. It should be the folder
+        the plugin is loaded from (see artella.plugins.updater.utils.get_plugin_install_path)
+    :return: dictionary with id, version, install_path, package_path, interpreter, files, hashes and install_date
+        keys. None if the plugin was not installed in the given path by the updater.
+    :rtype: dict or None
+    """
+
+    if not install_path:
+        return None
+
+    install_path = _normalize_path(install_path)
+    interpreter_key = get_interpreter_key()
+    for plugin_data in installed_plugins().get(plugin_id, list()):
+        if plugin_data.get('interpreter', None) != interpreter_key:
+            continue
+        if _normalize_path(plugin_data.get('install_path', '')) != install_path:
+            continue
+        if not os.path.isdir(plugin_data.get('package_path', '')):
+            return None
+        return plugin_data
+
+    return None
+
+
+def get_installed_plugin_version(plugin_id, install_path):
+    """
+    Returns version of the given plugin stored in the manifest entry of the given install path
+
+    :param str plugin_id: ID of the plugin (for example, artella-plugins-updater)
+    :param str install_path: path of the folder that contains the plugin Python package
+    :return: plugin version. None if the plugin was not installed in the given path by the updater.
+    :rtype: str or None
+    """
+
+    plugin_data = get_installed_plugin(plugin_id, install_path)
+
+    return plugin_data.get('version', None) if plugin_data else None
+
+
+def register_installed_plugin(plugin_id, version, install_path, package_path, file_hashes=None):
+    """
+    Stores into the manifest the data of a plugin that has been installed with current Python interpreter.
+    Previous entry of the same install path and interpreter is replaced.
+
+    :param str plugin_id: ID of the plugin (for example, artella-plugins-updater)
+    :param str version: installed plugin version
+    :param str install_path: path of the folder that contains the plugin Python package
+    :param str package_path: path of the installed plugin Python package folder
+    :param dict file_hashes: dictionary with installed file paths as keys and their sha256 as values
+    :return: True if the manifest was updated successfully; False otherwise.
+    :rtype: bool
+    """
+
+    file_hashes = file_hashes or dict()
+    relative_hashes = dict(
+        (os.path.relpath(file_path, install_path).replace('\\', '/'), file_hash)
+        for file_path, file_hash in file_hashes.items())
+    interpreter_key = get_interpreter_key()
+    normalized_install_path = _normalize_path(install_path)
+
+    with _LOCK:
+        manifest_path = get_manifest_path()
+        try:
+            # Manifest is shared by all the DCCs of the user, so it is read again while holding the lock to keep
+            # the entries other processes registered since it was last read
+            with fileutils.FileLock(manifest_path, timeout=LOCK_TIMEOUT):
+                manifest_data = _read_manifest(manifest_path)
+                plugin_entries = [
+                    plugin_data for plugin_data in manifest_data.get(plugin_id, list()) if
+                    plugin_data.get('interpreter', None) != interpreter_key or
+                    _normalize_path(plugin_data.get('install_path', '')) != normalized_install_path]
+                plugin_entries.append({
+                    'id': plugin_id,
+                    'version': version,
+                    'install_path': install_path,
+                    'package_path': package_path,
+                    'interpreter': interpreter_key,
+                    'files': sorted(relative_hashes.keys()),
+                    'hashes': relative_hashes,
+                    'install_date': datetime.now().strftime('%Y-%m-%dT%H:%M:%S')
+                })
+                manifest_data[plugin_id] = plugin_entries
+                valid = _write_manifest(manifest_path, manifest_data)
+        except (OSError, fileutils.FileLockTimeoutError) as exc:
+            logger.warning('Error while locking Artella Updater manifest file: {} | {}'.format(manifest_path, exc))
+            return False
+        if valid:
+            global _MANIFEST
+            _MANIFEST = manifest_data
+
+    return valid
+
+
+def reload():
+    """
+    Forces manifest file to be read again next time installed plugins data is requested
+    """
+
+    global _MANIFEST
+
+    with _LOCK:
+        _MANIFEST = None
+
+
+def _normalize_path(path):
+    return os.path.normcase(os.path.realpath(os.path.abspath(path))).replace('\\', '/') if path else ''
+
+
+def _read_manifest(manifest_path):
+    if not os.path.isfile(manifest_path):
+        return dict()
+
+    try:
+        with open(manifest_path, 'r') as fh:
+            manifest_data = json.load(fh)
+    except Exception as exc:
+        logger.warning('Error while reading Artella Updater manifest file: {} | {}'.format(manifest_path, exc))
+        return dict()
+
+    plugins_data = manifest_data.get('plugins', dict()) if isinstance(manifest_data, dict) else dict()
+
+    # Entries written by previous versions (one per plugin) do not define the interpreter they belong to, so they
+    # are discarded. Plugins installed by those versions are resolved by importing them until they are updated
+    return dict(
+        (plugin_id, plugin_entries) for plugin_id, plugin_entries in plugins_data.items() if
+        isinstance(plugin_entries, list))
+
+
+def _write_manifest(manifest_path, manifest_data):
+    """
+    Writes the manifest into a temporary file that replaces the manifest file, so the manifest file is never left
+    partially written (or removed) if the process is interrupted
+    """
+
+    try:
+        fileutils.write_file(manifest_path, json.dumps({'plugins': manifest_data}, indent=4, sort_keys=True))
+    except Exception as exc:
+        logger.warning('Error while writing Artella Updater manifest file: {} | {}'.format(manifest_path, exc))
+        return False
+
+    return True
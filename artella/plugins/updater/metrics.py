@@ -0,0 +1,319 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains Artella Updater metrics export.
+
+Metrics are sent to a sink configured with ARTELLA_UPDATER_METRICS environment variable:
+
+    statsd: metrics are sent over UDP to ARTELLA_UPDATER_STATSD_HOST:ARTELLA_UPDATER_STATSD_PORT (127.0.0.1:8125 by
+        default) using DogStatsD tags
+    prometheus: metrics are written to ARTELLA_UPDATER_PROMETHEUS_TEXTFILE file (~/artella/updater/metrics.prom by
+        default) so they can be collected by node_exporter textfile collector
+
+Most metrics are computed from tracing spans (see artella.plugins.updater.tracing), so enabling a sink also enables
+tracing.
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import os
+import socket
+import logging
+import threading
+
+try:
+    from urllib.parse import urlparse
+except ImportError:
+    from urlparse import urlparse
+
+from artella.plugins.updater import tracing, fileutils
+
+logger = logging.getLogger('artella')
+
+METRICS_ENV = 'ARTELLA_UPDATER_METRICS'
+STATSD_HOST_ENV = 'ARTELLA_UPDATER_STATSD_HOST'
+STATSD_PORT_ENV = 'ARTELLA_UPDATER_STATSD_PORT'
+PROMETHEUS_TEXTFILE_ENV = 'ARTELLA_UPDATER_PROMETHEUS_TEXTFILE'
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+BYTES_BUCKETS = (1024, 16 * 1024, 128 * 1024, 1024 ** 2, 8 * 1024 ** 2, 64 * 1024 ** 2, 512 * 1024 ** 2, 1024 ** 3)
+
+_SINK = None
+_LOCK = threading.Lock()
+
+
+class MetricsSink(object):
+    """
+    Base class of all metrics sinks
+    """
+
+    def increment(self, name, value=1, tags=None):
+        """
+        Increments a counter
+
+        :param str name: counter name (for example, downloaded_bytes_total)
+        :param int or float value: value to add to the counter
+        :param dict tags: metric tags
+        """
+
+        raise NotImplementedError('increment function is not implemented!')
+
+    def observe(self, name, value, tags=None):
+        """
+        Adds a value to a histogram
+
+        :param str name: histogram name (for example, download_seconds)
+        :param int or float value: observed value
+        :param dict tags: metric tags
+        """
+
+        raise NotImplementedError('observe function is not implemented!')
+
+    def flush(self):
+        """
+        Sends pending metrics to the sink backend
+        """
+
+        pass
+
+
+class NullSink(MetricsSink):
+    """
+    Sink that discards all metrics. Used when metrics export is disabled
+    """
+
+    def increment(self, name, value=1, tags=None):
+        pass
+
+    def observe(self, name, value, tags=None):
+        pass
+
+
+class StatsdSink(MetricsSink):
+    """
+    Sink that sends metrics to a statsd server over UDP
+    """
+
+    def __init__(self, host='127.0.0.1', port=8125, prefix='artella.updater'):
+        super(StatsdSink, self).__init__()
+
+        self._address = (host, int(port))
+        self._prefix = prefix
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def increment(self, name, value=1, tags=None):
+        self._send(name, value, 'c', tags)
+
+    def observe(self, name, value, tags=None):
+        self._send(name, value, 'h', tags)
+
+    def _send(self, name, value, metric_type, tags):
+        metric = '{}.{}:{}|{}'.format(self._prefix, name, value, metric_type)
+        if tags:
+            metric += '|#{}'.format(','.join(
+                '{}:{}'.format(tag_name, tag_value) for tag_name, tag_value in sorted(tags.items())))
+        try:
+            self._socket.sendto(metric.encode('utf-8'), self._address)
+        except Exception as exc:
+            logger.debug('Error while sending metric to statsd server {}: {}'.format(self._address, exc))
+
+
+class PrometheusTextfileSink(MetricsSink):
+    """
+    Sink that aggregates metrics in memory and writes them to a file using Prometheus text format
+    """
+
+    def __init__(self, file_path, prefix='artella_updater'):
+        super(PrometheusTextfileSink, self).__init__()
+
+        self._file_path = file_path
+        self._prefix = prefix
+        self._counters = dict()
+        self._histograms = dict()
+        self._lock = threading.Lock()
+
+    def increment(self, name, value=1, tags=None):
+        key = (name, self._get_labels(tags))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+        self.flush()
+
+    def observe(self, name, value, tags=None):
+        key = (name, self._get_labels(tags))
+        buckets = BYTES_BUCKETS if '_bytes' in name else SECONDS_BUCKETS
+        with self._lock:
+            histogram = self._histograms.setdefault(key, {'buckets': [0] * len(buckets), 'sum': 0, 'count': 0})
+            for i, bucket in enumerate(buckets):
+                if value <= bucket:
+                    histogram['buckets'][i] += 1
+            histogram['sum'] += value
+            histogram['count'] += 1
+        self.flush()
+
+    def flush(self):
+        lines = list()
+        with self._lock:
+            for (name, labels), value in sorted(self._counters.items()):
+                lines.append('{}_{}{} {}'.format(self._prefix, name, self._format_labels(labels), value))
+            for (name, labels), histogram in sorted(self._histograms.items()):
+                buckets = BYTES_BUCKETS if '_bytes' in name else SECONDS_BUCKETS
+                for bucket, bucket_count in zip(buckets, histogram['buckets']):
+                    lines.append('{}_{}_bucket{} {}'.format(
+                        self._prefix, name, self._format_labels(labels + (('le', repr(float(bucket))),)), bucket_count))
+                lines.append('{}_{}_bucket{} {}'.format(
+                    self._prefix, name, self._format_labels(labels + (('le', '+Inf'),)), histogram['count']))
+                lines.append('{}_{}_sum{} {}'.format(self._prefix, name, self._format_labels(labels), histogram['sum']))
+                lines.append('{}_{}_count{} {}'.format(
+                    self._prefix, name, self._format_labels(labels), histogram['count']))
+
+            # node_exporter could read the file while it is being written, so it is replaced atomically
+            try:
+                fileutils.write_file(self._file_path, '\n'.join(lines) + '\n')
+            except Exception as exc:
+                logger.debug('Error while writing Prometheus metrics file {}: {}'.format(self._file_path, exc))
+
+    def _get_labels(self, tags):
+        return tuple(sorted((str(tag_name), str(tag_value)) for tag_name, tag_value in (tags or dict()).items()))
+
+    def _format_labels(self, labels):
+        if not labels:
+            return ''
+        return '{{{}}}'.format(','.join('{}="{}"'.format(
+            label_name, label_value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+            for label_name, label_value in labels))
+
+
+def create_sink_from_env():
+    """
+    Creates the metrics sink defined in ARTELLA_UPDATER_METRICS environment variable
+
+    :return: metrics sink
+    :rtype: MetricsSink
+    """
+
+    sink_name = os.environ.get(METRICS_ENV, '').strip().lower()
+    if sink_name == 'statsd':
+        try:
+            return StatsdSink(
+                host=os.environ.get(STATSD_HOST_ENV, None) or '127.0.0.1',
+                port=os.environ.get(STATSD_PORT_ENV, None) or 8125)
+        except Exception as exc:
+            logger.warning('Impossible to create statsd metrics sink: {}'.format(exc))
+    elif sink_name == 'prometheus':
+        return PrometheusTextfileSink(os.environ.get(PROMETHEUS_TEXTFILE_ENV, None) or os.path.normpath(
+            os.path.join(os.path.expanduser('~'), 'artella', 'updater', 'metrics.prom')))
+    elif sink_name:
+        logger.warning('Unknown Artella Updater metrics sink "{}". Valid sinks are: statsd, prometheus'.format(
+            sink_name))
+
+    return NullSink()
+
+
+def get_sink():
+    """
+    Returns current metrics sink
+
+    :return: metrics sink
+    :rtype: MetricsSink
+    """
+
+    return _SINK or NullSink()
+
+
+def set_sink(sink):
+    """
+    Sets the sink metrics are sent to. If the sink is not a NullSink, tracing is enabled, because most metrics are
+    computed from tracing spans
+
+    :param MetricsSink or None sink: metrics sink. If None, metrics export is disabled
+    """
+
+    global _SINK
+
+    with _LOCK:
+        _SINK = sink
+        if sink and not isinstance(sink, NullSink):
+            tracing.enable()
+            tracing.add_listener(_on_span_finished)
+        else:
+            tracing.remove_listener(_on_span_finished)
+
+
+def increment(name, value=1, **tags):
+    """
+    Increments a counter of current metrics sink
+
+    :param str name: counter name
+    :param int or float value: value to add to the counter
+    :param tags: metric tags
+    """
+
+    if _SINK is None:
+        return
+
+    _SINK.increment(name, value, tags)
+
+
+def observe(name, value, **tags):
+    """
+    Adds a value to a histogram of current metrics sink
+
+    :param str name: histogram name
+    :param int or float value: observed value
+    :param tags: metric tags
+    """
+
+    if _SINK is None:
+        return
+
+    _SINK.observe(name, value, tags)
+
+
+def record_cache_access(cache_name, hit):
+    """
+    Counts an access to an updater cache. Cache hit ratio can be computed from these counters
+
+    :param str cache_name: name of the cache (for example, install_paths)
+    :param bool hit: whether or not the requested data was found in the cache
+    """
+
+    increment('cache_requests_total', cache=cache_name, result='hit' if hit else 'miss')
+
+
+def _get_host(url):
+    return urlparse(url or '').netloc or 'local'
+
+
+def _on_span_finished(span):
+    """
+    Converts finished tracing spans into metrics
+    """
+
+    attributes = span.attributes
+    duration = span.duration
+    plugin_id = attributes.get('plugin_id', None)
+    plugin_tags = {'plugin_id': plugin_id} if plugin_id else dict()
+
+    if span.name == 'check':
+        observe('check_latency_seconds', duration)
+    elif span.name == 'ttfb':
+        observe('request_ttfb_seconds', duration, host=_get_host(attributes.get('url', None)))
+    elif span.name == 'metadata':
+        increment('metadata_bytes_total', attributes.get('wire_bytes', attributes.get('bytes', 0)), **plugin_tags)
+    elif span.name == 'download':
+        host = _get_host(attributes.get('url', None))
+        data_size = attributes.get('bytes', 0)
+        increment('downloaded_bytes_total', data_size, host=host, **plugin_tags)
+        observe('download_seconds', duration, host=host, **plugin_tags)
+        if duration > 0 and data_size:
+            observe('download_throughput_bytes_per_second', data_size / duration, host=host, **plugin_tags)
+    elif span.name == 'extract':
+        observe('extract_seconds', duration, **plugin_tags)
+    elif span.name == 'update':
+        observe('install_duration_seconds', duration, **plugin_tags)
+        increment('installs_total', status='error' if span.error else attributes.get('status', 'ok'), **plugin_tags)
+
+
+if os.environ.get(METRICS_ENV, None):
+    set_sink(create_sink_from_env())
@@ -0,0 +1,151 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains functions to build an offline mirror of all the data retrieved by Artella Updater
+
+Mirror folder layout follows the URL layout of the original servers so a mirror folder (or an HTTP server serving
+it) can be used as updater base URL (see artella.plugins.updater.utils.set_mirror_url):
+
+    <mirror>/plugins/<dcc>/versions/stable-<platform>.json
+    <mirror>/pypi/<plugin_id>/json
+    <mirror>/packages/<package_file_name>
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import os
+import hashlib
+import logging
+
+from artella.plugins.updater import utils, metrics, jsondecoder, scheduler, fileutils
+
+logger = logging.getLogger('artella')
+
+PLATFORMS = ('windows', 'darwin', 'linux')
+
+
+def sync_mirror(mirror_path, dcc_names, plugin_ids=None, platforms=None, jobs=8):
+    """
+    Downloads into the given folder all the data Artella Updater retrieves for the given DCCs and plugins.
+    Sync is incremental: files whose digests already match the ones stored in the mirror are skipped.
+
+    :param str mirror_path: root folder of the mirror
+    :param list(str) dcc_names: names of the DCCs to mirror
+    :param list(str) plugin_ids: IDs of extra plugins to mirror. Plugins included in each DCC installer are
+        always mirrored
+    :param list(str) platforms: OS platforms to mirror. If not given, all platforms will be mirrored
+    :param int jobs: number of files to download in parallel
+    :return: dictionary with the list of downloaded, skipped and failed mirror files
+    :rtype: dict
+    """
+
+    # Mirror syncs can take a long time, so they must not delay the requests started by the user
+    with scheduler.priority(scheduler.BACKGROUND):
+        return _sync_mirror(mirror_path, dcc_names, plugin_ids=plugin_ids, platforms=platforms, jobs=jobs)
+
+
+def _sync_mirror(mirror_path, dcc_names, plugin_ids, platforms, jobs):
+
+    mirror_path = os.path.abspath(mirror_path)
+    platforms = platforms or PLATFORMS
+    stats = {'downloaded': list(), 'skipped': list(), 'failed': list()}
+
+    dcc_tasks = [(dcc_name, platform) for dcc_name in dcc_names for platform in platforms]
+    utils.run_in_parallel(lambda task: _sync_dcc_plugin_info(mirror_path, task[0], task[1], stats), dcc_tasks, jobs)
+
+    installer_ids = ['artella-installer-{}'.format(dcc_name) for dcc_name in dcc_names]
+    installer_files = utils.run_in_parallel(
+        lambda plugin_id: _sync_plugin(mirror_path, plugin_id, stats, jobs), installer_ids, jobs)
+
+    all_plugin_ids = list()
+    for plugin_id in list(plugin_ids or list()) + [
+            installer_plugin_id for package_files in installer_files for package_file in package_files or list()
+            for installer_plugin_id in utils.get_installer_plugin_ids_from_package(package_file)]:
+        if plugin_id not in all_plugin_ids and plugin_id not in installer_ids:
+            all_plugin_ids.append(plugin_id)
+    utils.run_in_parallel(lambda plugin_id: _sync_plugin(mirror_path, plugin_id, stats, jobs), all_plugin_ids, jobs)
+
+    return stats
+
+
+def _sync_dcc_plugin_info(mirror_path, dcc_name, platform, stats):
+    url = '{}/{}/versions/stable-{}.json'.format(utils.ARTELLA_UPDATES_URL, dcc_name, platform)
+    file_path = os.path.join(mirror_path, 'plugins', dcc_name, 'versions', 'stable-{}.json'.format(platform))
+
+    return _sync_metadata_file(url, file_path, stats)
+
+
+def _sync_plugin(mirror_path, plugin_id, stats, jobs):
+    """
+    Mirrors PyPI information and latest release files of the given plugin
+    Returns the list of mirrored package file paths
+    """
+
+    url = '{}/{}/json'.format(utils.PYPI_URL, plugin_id)
+    file_path = os.path.join(mirror_path, 'pypi', plugin_id, 'json')
+    if not _sync_metadata_file(url, file_path, stats):
+        return list()
+
+    try:
+        with open(file_path, 'rb') as fh:
+            pypi_data = jsondecoder.load_pypi_document(fh.read())
+    except Exception as exc:
+        logger.warning('Error while reading mirrored PyPI information: {} | {}'.format(file_path, exc))
+        return list()
+
+    latest_version = pypi_data.get('info', dict()).get('version', '')
+    release_files = pypi_data.get('releases', dict()).get(latest_version, list())
+
+    def _sync_release_file(release_data):
+        release_url = release_data.get('url', '')
+        release_file_name = release_data.get('filename', '') or release_url.split('/')[-1]
+        if not release_url or not release_file_name:
+            return None
+        release_file_path = os.path.join(mirror_path, 'packages', release_file_name)
+        expected_hash = release_data.get('digests', dict()).get('sha256', None)
+        if expected_hash and utils.get_file_hash(release_file_path) == expected_hash:
+            stats['skipped'].append(release_file_path)
+            metrics.record_cache_access('mirror', True)
+            return release_file_path
+        metrics.record_cache_access('mirror', False)
+        temp_file_path = '{}.part'.format(release_file_path)
+        utils.make_dirs(os.path.dirname(release_file_path))
+        valid = utils.download_package_from_pypi(
+            release_url, temp_file_path, digests=dict(
+                (digest_name, release_data.get('digests', dict()).get(digest_name)) for digest_name in utils.DIGESTS))
+        if not valid:
+            stats['failed'].append(release_file_path)
+            return None
+        fileutils.replace_file(temp_file_path, release_file_path)
+        stats['downloaded'].append(release_file_path)
+        return release_file_path
+
+    return [release_file for release_file in utils.run_in_parallel(
+        _sync_release_file, release_files, jobs) if release_file]
+
+
+def _sync_metadata_file(url, file_path, stats):
+    """
+    Downloads given metadata file. File is only written if its contents changed
+    """
+
+    try:
+        with scheduler.request():
+            data = utils.open_url(url, compressed=True).read()
+    except Exception as exc:
+        logger.warning('Error while downloading mirror file: {} | {}'.format(url, exc))
+        data = None
+    if not data:
+        stats['failed'].append(file_path)
+        return False
+
+    if hashlib.sha256(data).hexdigest() == utils.get_file_hash(file_path):
+        stats['skipped'].append(file_path)
+        return True
+
+    # Clients can read the mirror while it is synced, so files are replaced atomically
+    fileutils.write_file(file_path, data)
+    stats['downloaded'].append(file_path)
+
+    return True
@@ -0,0 +1,164 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains an opt-in profiler for Artella Updater entry points.
+
+Profiling is enabled setting ARTELLA_UPDATER_PROFILE environment variable to the profiler to use:
+
+    cprofile (or 1): profiles are stored as .prof files (readable with pstats, snakeviz, etc)
+    pyinstrument: profiles are stored as .speedscope.json files (requires pyinstrument package)
+
+Profiles are stored in ARTELLA_UPDATER_PROFILE_DIR folder (~/artella/updater/profiles by default) and their file
+names contain the name of the profiled function, host name and a timestamp:
+
+    <function_name>_<hostname>_<timestamp>.prof
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import os
+import socket
+import logging
+import functools
+import threading
+from datetime import datetime
+
+logger = logging.getLogger('artella')
+
+PROFILE_ENV = 'ARTELLA_UPDATER_PROFILE'
+PROFILE_DIR_ENV = 'ARTELLA_UPDATER_PROFILE_DIR'
+PROFILERS = ('cprofile', 'pyinstrument')
+
+_ACTIVE = threading.local()
+
+
+def get_profiler_name():
+    """
+    Returns the name of the profiler that should be used
+
+    :return: name of the profiler (cprofile or pyinstrument). None if profiling is disabled.
+    :rtype: str or None
+    """
+
+    profiler_name = os.environ.get(PROFILE_ENV, '').strip().lower()
+    if profiler_name in ('', '0', 'false', 'no', 'off'):
+        return None
+    if profiler_name in ('1', 'true', 'yes', 'on'):
+        return 'cprofile'
+    if profiler_name not in PROFILERS:
+        logger.warning('Unknown Artella Updater profiler "{}". Valid profilers are: {}'.format(
+            profiler_name, ', '.join(PROFILERS)))
+        return None
+
+    return profiler_name
+
+
+def get_profiles_path():
+    """
+    Returns folder where profile files are stored
+
+    :return: profiles folder path
+    :rtype: str
+    """
+
+    return os.environ.get(PROFILE_DIR_ENV, None) or os.path.normpath(
+        os.path.join(os.path.expanduser('~'), 'artella', 'updater', 'profiles'))
+
+
+def get_profile_file_path(name, extension):
+    """
+    Returns path of a new profile file for the given profiled function name
+
+    :param str name: name of the profiled function
+    :param str extension: profile file extension (for example, .prof)
+    :return: profile file path
+    :rtype: str
+    """
+
+    file_name = '{}_{}_{}{}'.format(
+        name, socket.gethostname().split('.')[0] or 'unknown', datetime.now().strftime('%Y%m%d-%H%M%S-%f'), extension)
+
+    return os.path.join(get_profiles_path(), file_name)
+
+
+def profile(name=None):
+    """
+    Decorator that profiles the decorated function if profiling is enabled (see ARTELLA_UPDATER_PROFILE environment
+    variable). Nested profiled calls are only profiled by the outermost profiled function.
+
+    :param str name: name used in profile file names. If not given, function name is used
+    :return: decorator
+    """
+
+    def decorator(fn):
+        profile_name = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            profiler_name = get_profiler_name()
+            if not profiler_name or getattr(_ACTIVE, 'profiling', False):
+                return fn(*args, **kwargs)
+            _ACTIVE.profiling = True
+            try:
+                if profiler_name == 'pyinstrument':
+                    return _profile_with_pyinstrument(profile_name, fn, args, kwargs)
+                return _profile_with_cprofile(profile_name, fn, args, kwargs)
+            finally:
+                _ACTIVE.profiling = False
+
+        return wrapper
+
+    return decorator
+
+
+def _make_profiles_dir():
+    profiles_path = get_profiles_path()
+    if not os.path.isdir(profiles_path):
+        os.makedirs(profiles_path)
+
+
+def _profile_with_cprofile(name, fn, args, kwargs):
+    import cProfile
+
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(fn, *args, **kwargs)
+    finally:
+        profile_file_path = get_profile_file_path(name, '.prof')
+        try:
+            _make_profiles_dir()
+            profiler.dump_stats(profile_file_path)
+            logger.info('Artella Updater profile stored: {}'.format(profile_file_path))
+        except Exception as exc:
+            logger.warning('Error while storing Artella Updater profile: {} | {}'.format(profile_file_path, exc))
+
+
+def _profile_with_pyinstrument(name, fn, args, kwargs):
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        logger.warning('pyinstrument is not available. Using cProfile to profile Artella Updater ...')
+        return _profile_with_cprofile(name, fn, args, kwargs)
+
+    profiler = Profiler()
+    profiler.start()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        profiler.stop()
+        try:
+            from pyinstrument.renderers import SpeedscopeRenderer
+            profile_file_path = get_profile_file_path(name, '.speedscope.json')
+            profile_data = profiler.output(renderer=SpeedscopeRenderer())
+        except ImportError:
+            # Old pyinstrument versions do not support speedscope format
+            profile_file_path = get_profile_file_path(name, '.html')
+            profile_data = profiler.output_html()
+        try:
+            _make_profiles_dir()
+            with open(profile_file_path, 'w') as fh:
+                fh.write(profile_data)
+            logger.info('Artella Updater profile stored: {}'.format(profile_file_path))
+        except Exception as exc:
+            logger.warning('Error while storing Artella Updater profile: {} | {}'.format(profile_file_path, exc))
@@ -0,0 +1,212 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains the client-side rate limiter shared by all Artella Updater requests.
+
+Each host has its own token bucket. Rates (requests per second) can be configured with these environment variables:
+
+    ARTELLA_UPDATER_RATE_LIMIT: default rate of all hosts (10 by default). 0 disables rate limiting.
+    ARTELLA_UPDATER_RATE_LIMITS: comma separated list of host specific rates with <host>=<rate>[/<burst>] format
+        (for example, pypi.org=20/40,updates.artellaapp.com=5). Burst is twice the rate by default.
+
+When a host answers with HTTP 429 or 503 its rate is halved (and requests wait the time defined by Retry-After
+header, if any). Rate is slowly increased again with each successful request until the configured rate is reached.
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import os
+import time
+import timeit
+import logging
+import threading
+from email.utils import parsedate_tz, mktime_tz
+
+logger = logging.getLogger('artella')
+
+RATE_LIMIT_ENV = 'ARTELLA_UPDATER_RATE_LIMIT'
+RATE_LIMITS_ENV = 'ARTELLA_UPDATER_RATE_LIMITS'
+
+DEFAULT_RATE = 10.0                 # Requests per second
+MIN_RATE = 0.1                      # Adaptive slowdown never goes below this rate
+RECOVERY_FACTOR = 1.1               # Rate multiplier applied after each successful request while slowed down
+SLOWDOWN_FACTOR = 0.5               # Rate multiplier applied after each throttled request
+MAX_RETRY_AFTER = 60.0              # Maximum time (in seconds) waited because of a Retry-After header
+THROTTLE_STATUS_CODES = (429, 503)
+
+_BUCKETS = dict()
+_LOCK = threading.Lock()
+
+
+class TokenBucket(object):
+    """
+    Thread-safe token bucket with adaptive rate
+    """
+
+    def __init__(self, rate, burst=None):
+        super(TokenBucket, self).__init__()
+
+        self._max_rate = float(rate)
+        self._rate = float(rate)
+        self._burst = float(burst or max(1.0, rate * 2))
+        self._tokens = self._burst
+        self._last_time = timeit.default_timer()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self):
+        return self._rate
+
+    @property
+    def max_rate(self):
+        return self._max_rate
+
+    def reserve(self, tokens=1):
+        """
+        Takes the given number of tokens from the bucket, even if they are not available yet
+
+        :param int tokens: number of tokens to take
+        :return: time (in seconds) the caller must wait before the tokens are available
+        :rtype: float
+        """
+
+        with self._lock:
+            now = timeit.default_timer()
+            self._tokens = min(self._burst, self._tokens + (now - self._last_time) * self._rate)
+            self._last_time = now
+            self._tokens -= tokens
+            wait_time = -self._tokens / self._rate if self._tokens < 0 else 0.0
+
+            return max(wait_time, self._blocked_until - now)
+
+    def acquire(self, tokens=1):
+        """
+        Blocks until the given number of tokens are available
+
+        :param int tokens: number of tokens to take
+        :return: time (in seconds) waited
+        :rtype: float
+        """
+
+        wait_time = self.reserve(tokens)
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+        return wait_time
+
+    def slow_down(self, retry_after=None):
+        """
+        Reduces bucket rate because the host throttled a request
+
+        :param float retry_after: time (in seconds) the host asked to wait before next request
+        """
+
+        with self._lock:
+            self._rate = max(MIN_RATE, self._rate * SLOWDOWN_FACTOR)
+            self._tokens = min(self._tokens, 0.0)
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, timeit.default_timer() + retry_after)
+
+    def recover(self):
+        """
+        Increases bucket rate towards its configured rate after a successful request
+        """
+
+        if self._rate >= self._max_rate:
+            return
+
+        with self._lock:
+            self._rate = min(self._max_rate, self._rate * RECOVERY_FACTOR)
+
+
+def get_host_rates():
+    """
+    Returns host specific rates defined in ARTELLA_UPDATER_RATE_LIMITS environment variable
+
+    :return: dictionary with host names as keys and (rate, burst) tuples as values
+    :rtype: dict
+    """
+
+    host_rates = dict()
+    for host_rate in os.environ.get(RATE_LIMITS_ENV, '').split(','):
+        if not host_rate.strip():
+            continue
+        try:
+            host, rate = host_rate.split('=', 1)
+            rate, _, burst = rate.partition('/')
+            host_rates[host.strip().lower()] = (float(rate), float(burst) if burst else None)
+        except ValueError:
+            logger.warning('Invalid rate limit in {} environment variable: {}'.format(RATE_LIMITS_ENV, host_rate))
+
+    return host_rates
+
+
+def get_default_rate():
+    """
+    Returns default rate defined in ARTELLA_UPDATER_RATE_LIMIT environment variable
+
+    :return: requests per second
+    :rtype: float
+    """
+
+    try:
+        return float(os.environ.get(RATE_LIMIT_ENV, None) or DEFAULT_RATE)
+    except ValueError:
+        logger.warning('Invalid value for {} environment variable: {}'.format(
+            RATE_LIMIT_ENV, os.environ.get(RATE_LIMIT_ENV)))
+        return DEFAULT_RATE
+
+
+def get_bucket(host):
+    """
+    Returns the token bucket of the given host
+
+    :param str host: host name (for example, pypi.org)
+    :return: token bucket. None if rate limiting is disabled for the host.
+    :rtype: TokenBucket or None
+    """
+
+    host = (host or '').lower()
+    if not host:
+        return None
+
+    with _LOCK:
+        if host not in _BUCKETS:
+            rate, burst = get_host_rates().get(host, (get_default_rate(), None))
+            _BUCKETS[host] = TokenBucket(rate, burst) if rate > 0 else None
+
+        return _BUCKETS[host]
+
+
+def reset():
+    """
+    Removes all token buckets, so rates are read again from environment variables
+    """
+
+    with _LOCK:
+        _BUCKETS.clear()
+
+
+def parse_retry_after(value):
+    """
+    Returns the number of seconds defined by the given Retry-After header value
+
+    :param str value: Retry-After header value (seconds or HTTP date)
+    :return: seconds to wait. None if the value is not valid.
+    :rtype: float or None
+    """
+
+    if not value:
+        return None
+
+    try:
+        retry_after = float(value)
+    except ValueError:
+        date_tuple = parsedate_tz(value)
+        if not date_tuple:
+            return None
+        retry_after = mktime_tz(date_tuple) - time.time()
+
+    return min(MAX_RETRY_AFTER, max(0.0, retry_after))
@@ -0,0 +1,181 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains functions to reload the modules of updated Artella plugins without restarting Artella
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import sys
+import inspect
+import logging
+import traceback
+
+from artella.core import plugins
+from artella.plugins.updater import utils, tracing
+
+try:
+    from importlib import reload as reload_module, invalidate_caches
+except ImportError:
+    from imp import reload as reload_module
+
+    def invalidate_caches():
+        pass
+
+logger = logging.getLogger('artella')
+
+# Plugins whose modules are used by all the other plugins or by the loader itself. If any of them is updated, the
+# whole Artella loader must be reloaded
+CORE_PLUGIN_IDS = ('artella-plugins-core', 'artella-plugins-updater')
+
+
+def needs_full_reload(plugin_ids):
+    """
+    Returns whether or not the update of the given plugins requires the whole Artella loader to be reloaded
+
+    :param list(str) plugin_ids: IDs of the updated plugins
+    :return: True if any of the plugins is a core plugin; False otherwise.
+    :rtype: bool
+    """
+
+    return any(plugin_id in CORE_PLUGIN_IDS for plugin_id in plugin_ids)
+
+
+def get_plugin_module_names(plugin_id):
+    """
+    Returns the names of all the already imported modules that belong to the given plugin
+
+    :param str plugin_id: ID of the plugin (for example, artella-plugins-updater)
+    :return: list of module names
+    :rtype: list(str)
+    """
+
+    module_prefixes = [utils.get_plugin_module_path(plugin_id)]
+    plugin_class = plugins.plugins().get(plugin_id, dict()).get('class', None)
+    plugin_class_module = getattr(plugin_class, '__module__', None)
+    if plugin_class_module and not _is_submodule(plugin_class_module, module_prefixes[0]):
+        module_prefixes.append(plugin_class_module.rsplit('.', 1)[0])
+
+    return sorted(
+        module_name for module_name, module in list(sys.modules.items()) if module is not None and any(
+            _is_submodule(module_name, module_prefix) for module_prefix in module_prefixes))
+
+
+def get_module_dependencies(module, module_names):
+    """
+    Returns which of the given modules are referenced by the given module, either directly or through the objects
+    imported into its namespace
+
+    :param module module: module to retrieve dependencies of
+    :param set(str) module_names: names of the modules to check
+    :return: set of module names the module depends on
+    :rtype: set(str)
+    """
+
+    dependencies = set()
+    for value in list(vars(module).values()):
+        try:
+            dependency_name = value.__name__ if inspect.ismodule(value) else getattr(value, '__module__', None)
+        except Exception:
+            continue
+        if dependency_name in module_names and dependency_name != module.__name__:
+            dependencies.add(dependency_name)
+
+    return dependencies
+
+
+def sort_modules_by_dependencies(module_names):
+    """
+    Sorts given modules so every module is placed after the modules it depends on.
+    Modules with circular dependencies are sorted by the number of pending dependencies.
+
+    :param list(str) module_names: names of already imported modules
+    :return: sorted list of module names
+    :rtype: list(str)
+    """
+
+    module_names = set(module_name for module_name in module_names if sys.modules.get(module_name, None))
+    pending_dependencies = dict(
+        (module_name, get_module_dependencies(sys.modules[module_name], module_names)) for module_name in module_names)
+
+    sorted_module_names = list()
+    while pending_dependencies:
+        ready_module_names = sorted(
+            module_name for module_name, dependencies in pending_dependencies.items() if not dependencies)
+        if not ready_module_names:
+            ready_module_names = [min(
+                pending_dependencies, key=lambda module_name: (len(pending_dependencies[module_name]), module_name))]
+        for module_name in ready_module_names:
+            pending_dependencies.pop(module_name)
+            sorted_module_names.append(module_name)
+        for dependencies in pending_dependencies.values():
+            dependencies.difference_update(ready_module_names)
+
+    return sorted_module_names
+
+
+def reload_plugins(plugin_ids):
+    """
+    Reloads the modules of the given plugins in dependency order and replaces their plugin instances with new ones.
+    Other loaded plugins, Artella menu and Artella Drive client connection are not modified.
+
+    :param list(str) plugin_ids: IDs of the plugins to reload
+    :return: True if all the plugins were reloaded successfully; False otherwise.
+    :rtype: bool
+    """
+
+    all_plugins = plugins.plugins()
+    plugin_ids = [plugin_id for plugin_id in plugin_ids if plugin_id in all_plugins]
+    if not plugin_ids:
+        return True
+
+    module_names = list()
+    for plugin_id in plugin_ids:
+        for module_name in get_plugin_module_names(plugin_id):
+            if module_name not in module_names:
+                module_names.append(module_name)
+
+    for plugin_id in plugin_ids:
+        plugin_inst = all_plugins[plugin_id].get('plugin_instance', None)
+        if not plugin_inst:
+            continue
+        try:
+            plugin_inst.cleanup()
+        except Exception:
+            logger.warning('Error while cleaning up Artella Plugin: "{}"'.format(plugin_id))
+            logger.debug(traceback.format_exc())
+
+    invalidate_caches()
+    with tracing.span('reload', plugin_ids=plugin_ids, modules=len(module_names)):
+        for module_name in sort_modules_by_dependencies(module_names):
+            try:
+                reload_module(sys.modules[module_name])
+            except Exception:
+                logger.error('Error while reloading Artella Plugin module: "{}"'.format(module_name))
+                logger.error(traceback.format_exc())
+                return False
+
+    valid = True
+    for plugin_id in plugin_ids:
+        plugin_dict = all_plugins[plugin_id]
+        plugin_class = plugin_dict['class']
+        plugin_class = getattr(sys.modules.get(plugin_class.__module__, None), plugin_class.__name__, plugin_class)
+        plugin_dict['class'] = plugin_class
+        plugin_dict['version'] = utils.get_installed_plugin_version(
+            plugin_id, import_version=False) or plugin_dict.get('version', None)
+        try:
+            plugin_dict['plugin_instance'] = plugin_class(plugin_dict.get('config', dict()))
+        except Exception:
+            logger.error('Impossible to instantiate Artella Plugin: "{}"'.format(plugin_id))
+            logger.error(traceback.format_exc())
+            plugin_dict.pop('plugin_instance', None)
+            valid = False
+            continue
+        logger.info('Artella Plugin: "{}" reloaded successfully!'.format(plugin_id))
+
+    return valid
+
+
+def _is_submodule(module_name, package_name):
+    return module_name == package_name or module_name.startswith('{}.'.format(package_name))
@@ -0,0 +1,288 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains functions to stagger the rollout of new Artella DCC plugin releases.
+
+Staged rollout is opt-in: it is enabled setting ARTELLA_UPDATER_ROLLOUT_STEP environment variable to a percentage
+between 0 and 100 (both excluded). Each seat belongs to a cohort (a number between 0 and 99) computed hashing its host
+name (or user name) and the release version. Release info served by Artella update server can define when the rollout
+of the release started (rollout_start field or, if not available, upload_time field) and the release becomes available
+for cohorts lower than a percentage that grows each interval:
+
+    percentage = ARTELLA_UPDATER_ROLLOUT_STEP * (1 + elapsed_time // ARTELLA_UPDATER_ROLLOUT_INTERVAL)
+
+So, for example, with a step of 10 percent every 60 minutes, 10% of the seats update right away and all of them have
+updated 9 hours after the rollout started. When the server provides a start time, all seats share it, so the schedule
+does not depend on when each seat checks for updates. Otherwise, the rollout of each seat starts the first time the
+seat sees the release. That moment is stored in a state file next to the installed plugins manifest, so the schedule
+survives restarts of the DCC.
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import os
+import re
+import json
+import time
+import socket
+import getpass
+import hashlib
+import logging
+import calendar
+import threading
+from datetime import datetime
+
+from artella.plugins.updater import fileutils, manifest
+
+logger = logging.getLogger('artella')
+
+ROLLOUT_STEP_ENV = 'ARTELLA_UPDATER_ROLLOUT_STEP'
+ROLLOUT_INTERVAL_ENV = 'ARTELLA_UPDATER_ROLLOUT_INTERVAL'
+ROLLOUT_KEY_ENV = 'ARTELLA_UPDATER_ROLLOUT_KEY'
+ROLLOUT_COHORT_ENV = 'ARTELLA_UPDATER_ROLLOUT_COHORT'
+
+DEFAULT_STEP = 100              # Percentage of cohorts a release is opened to each interval (100 disables rollout)
+DEFAULT_INTERVAL = 60           # Minutes between rollout steps
+STATE_FILE_NAME = 'rollout.json'
+
+_TIME_FORMATS = ('%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d')
+_TIMEZONE_REGEX = re.compile(r'(?P<sign>[+-])(?P<hours>\d{2}):?(?P<minutes>\d{2})$')
+
+_FIRST_SEEN_TIMES = dict()
+_LOCK = threading.RLock()
+
+
+def _get_number_env(env_name, default_value):
+    try:
+        return float(os.environ.get(env_name, None) or default_value)
+    except ValueError:
+        logger.warning('Invalid value for {} environment variable: {}'.format(env_name, os.environ.get(env_name)))
+        return default_value
+
+
+def get_rollout_step():
+    """
+    Returns the percentage of cohorts a release is opened to each rollout interval
+
+    :return: percentage between 0 and 100
+    :rtype: float
+    """
+
+    return min(100.0, max(0.0, _get_number_env(ROLLOUT_STEP_ENV, DEFAULT_STEP)))
+
+
+def is_rollout_enabled():
+    """
+    Returns whether or not staged rollouts are enabled. Steps of 0 or 100 percent disable them
+
+    :return: True if staged rollouts are enabled; False otherwise.
+    :rtype: bool
+    """
+
+    return 0 < get_rollout_step() < 100
+
+
+def get_rollout_interval():
+    """
+    Returns the time between rollout steps
+
+    :return: interval in seconds
+    :rtype: float
+    """
+
+    return max(0.0, _get_number_env(ROLLOUT_INTERVAL_ENV, DEFAULT_INTERVAL)) * 60.0
+
+
+def get_seat_key():
+    """
+    Returns the value that identifies current seat. ARTELLA_UPDATER_ROLLOUT_KEY environment variable defines whether
+    host name (default) or user name is used
+
+    :return: seat identifier
+    :rtype: str
+    """
+
+    if os.environ.get(ROLLOUT_KEY_ENV, '').strip().lower() == 'user':
+        try:
+            return getpass.getuser()
+        except Exception:
+            pass
+
+    return socket.gethostname().lower()
+
+
+def get_cohort(version=''):
+    """
+    Returns the rollout cohort of current seat for the given release version.
+    Cohort can be forced with ARTELLA_UPDATER_ROLLOUT_COHORT environment variable (for example, 0 for canary seats).
+
+    :param str version: release version. Cohorts are shuffled for each version, so the same seats are not always
+        the last ones to update
+    :return: cohort number between 0 and 99
+    :rtype: int
+    """
+
+    forced_cohort = os.environ.get(ROLLOUT_COHORT_ENV, None)
+    if forced_cohort:
+        try:
+            return min(99, max(0, int(forced_cohort)))
+        except ValueError:
+            logger.warning('Invalid value for {} environment variable: {}'.format(ROLLOUT_COHORT_ENV, forced_cohort))
+
+    seat_hash = hashlib.sha256('{}:{}'.format(get_seat_key(), version).encode('utf-8')).hexdigest()
+
+    return int(seat_hash[:8], 16) % 100
+
+
+def get_rollout_start_time(rollout_start):
+    """
+    Returns the timestamp of the given rollout start. PyPI upload_time format (UTC ISO 8601, with or without timezone
+    and fractions of second) and UNIX timestamps are supported
+
+    :param str or int or float rollout_start: rollout start time (for example, 2021-01-01T10:00:00Z)
+    :return: rollout start timestamp or None if the rollout start is not valid
+    :rtype: float or None
+    """
+
+    if rollout_start is None or rollout_start == '':
+        return None
+    if isinstance(rollout_start, (int, float)):
+        return float(rollout_start)
+
+    rollout_start = str(rollout_start).strip()
+    try:
+        return float(rollout_start)
+    except ValueError:
+        pass
+
+    offset = 0
+    if rollout_start.endswith('Z'):
+        rollout_start = rollout_start[:-1]
+    else:
+        timezone_match = _TIMEZONE_REGEX.search(rollout_start)
+        if timezone_match and 'T' in rollout_start:
+            offset = (int(timezone_match.group('hours')) * 60 + int(timezone_match.group('minutes'))) * 60
+            offset = -offset if timezone_match.group('sign') == '-' else offset
+            rollout_start = rollout_start[:timezone_match.start()]
+    rollout_start = rollout_start.split('.')[0]
+
+    for time_format in _TIME_FORMATS:
+        try:
+            start_date = datetime.strptime(rollout_start, time_format)
+        except ValueError:
+            continue
+        return float(calendar.timegm(start_date.timetuple()) - offset)
+
+    logger.warning('Invalid Artella DCC plugin release rollout start: {}'.format(rollout_start))
+
+    return None
+
+
+def get_state_path():
+    """
+    Returns path of the file that stores when current seat first saw each release. It is located next to the
+    installed plugins manifest
+
+    :return: rollout state file path
+    :rtype: str
+    """
+
+    return os.path.join(os.path.dirname(manifest.get_manifest_path()), STATE_FILE_NAME)
+
+
+def get_first_seen_time(version, current_time=None):
+    """
+    Returns the moment current seat saw the given release for the first time. If the release was never seen before,
+    given time is stored as the moment it was first seen
+
+    :param str version: release version
+    :param float current_time: current timestamp. If not given, current time is used
+    :return: timestamp of the moment the release was first seen
+    :rtype: float
+    """
+
+    current_time = current_time or time.time()
+    seat_key = get_seat_key()
+    state_path = get_state_path()
+
+    with _LOCK:
+        try:
+            with fileutils.FileLock(state_path):
+                state_data = _read_state(state_path)
+                seat_data = state_data.setdefault(seat_key, dict())
+                first_seen_time = seat_data.get(version, None)
+                if not isinstance(first_seen_time, (int, float)):
+                    first_seen_time = seat_data[version] = _FIRST_SEEN_TIMES.get((seat_key, version), current_time)
+                    fileutils.write_file(state_path, json.dumps(state_data, indent=4, sort_keys=True))
+        except Exception as exc:
+            # State is kept in memory, so at least the schedule progresses while the DCC is running
+            logger.warning('Error while updating Artella Updater rollout state file: {} | {}'.format(state_path, exc))
+            first_seen_time = _FIRST_SEEN_TIMES.get((seat_key, version), current_time)
+        _FIRST_SEEN_TIMES[(seat_key, version)] = first_seen_time
+
+    return first_seen_time
+
+
+def get_rollout_percentage(start_time, current_time=None):
+    """
+    Returns the percentage of cohorts a release whose rollout started at the given time is available to
+
+    :param float start_time: timestamp of the moment the release rollout started
+    :param float current_time: current timestamp. If not given, current time is used
+    :return: percentage between 0 and 100
+    :rtype: float
+    """
+
+    step = get_rollout_step()
+    interval = get_rollout_interval()
+    if not is_rollout_enabled() or not interval:
+        return 100.0
+
+    elapsed_time = max(0.0, (current_time or time.time()) - start_time)
+
+    return min(100.0, step * (1 + int(elapsed_time // interval)))
+
+
+def is_release_available(version, rollout_start=None, current_time=None):
+    """
+    Returns whether or not the given release is already available to current seat cohort
+
+    :param str version: release version
+    :param str or float rollout_start: moment the release rollout started, as provided by the server (see
+        get_rollout_start_time). If not given, the moment current seat first saw the release is used
+    :param float current_time: current timestamp. If not given, current time is used
+    :return: True if the release is available for current seat; False otherwise.
+    :rtype: bool
+    """
+
+    if not is_rollout_enabled():
+        return True
+
+    start_time = get_rollout_start_time(rollout_start)
+    if start_time is None:
+        start_time = get_first_seen_time(version, current_time=current_time)
+
+    rollout_percentage = get_rollout_percentage(start_time, current_time=current_time)
+    cohort = get_cohort(version)
+    available = cohort < rollout_percentage
+    if not available:
+        logger.info(
+            'Artella DCC plugin {} is not available yet for this seat (cohort {} | rollout {}%)'.format(
+                version, cohort, rollout_percentage))
+
+    return available
+
+
+def _read_state(state_path):
+    if not os.path.isfile(state_path):
+        return dict()
+
+    try:
+        with open(state_path, 'r') as fh:
+            state_data = json.load(fh)
+    except Exception as exc:
+        logger.warning('Error while reading Artella Updater rollout state file: {} | {}'.format(state_path, exc))
+        return dict()
+
+    return state_data if isinstance(state_data, dict) else dict()
@@ -0,0 +1,411 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains the priority scheduler shared by all Artella Updater network requests.
+
+Requests are either interactive (started by the user: check for updates, update buttons, ...) or background (mirror
+syncs, automatic update checks, prefetches). Before starting a request, updater functions take a request slot from
+the scheduler. Waiting interactive requests always take free slots before background ones and, while interactive work
+is running, the number of background requests is capped. Long background requests (downloads) yield their slot
+between chunks when interactive requests are waiting or the cap is exceeded, and continue once it is their turn again.
+
+Limits can be configured with these environment variables:
+
+    ARTELLA_UPDATER_MAX_REQUESTS: maximum number of concurrent requests (16 by default). 0 disables the limit.
+    ARTELLA_UPDATER_BACKGROUND_LIMIT: maximum number of concurrent background requests while interactive work is
+        running (1 by default).
+
+The priority of the requests done in a thread is defined with priority context:
+
+    with scheduler.priority(scheduler.BACKGROUND):
+        mirror.sync_mirror(...)
+
+Requests done outside any priority context are interactive.
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import os
+import heapq
+import timeit
+import logging
+import itertools
+import threading
+
+from artella.plugins.updater import metrics, cancellation
+
+logger = logging.getLogger('artella')
+
+MAX_REQUESTS_ENV = 'ARTELLA_UPDATER_MAX_REQUESTS'
+BACKGROUND_LIMIT_ENV = 'ARTELLA_UPDATER_BACKGROUND_LIMIT'
+
+INTERACTIVE = 0
+BACKGROUND = 1
+PRIORITY_NAMES = {INTERACTIVE: 'interactive', BACKGROUND: 'background'}
+
+DEFAULT_MAX_REQUESTS = 16
+DEFAULT_BACKGROUND_LIMIT = 1
+WAIT_INTERVAL = 0.1                 # Time (in seconds) between cancellation checks while a request waits its turn
+
+_SCHEDULER = None
+_LOCK = threading.Lock()
+_CONTEXT = threading.local()
+
+
+class RequestScheduler(object):
+    """
+    Thread-safe priority queue that limits the number of concurrent requests
+    """
+
+    def __init__(self, max_requests=DEFAULT_MAX_REQUESTS, background_limit=DEFAULT_BACKGROUND_LIMIT):
+        super(RequestScheduler, self).__init__()
+
+        self._max_requests = int(max_requests)
+        self._background_limit = max(0, int(background_limit))
+        self._running = {INTERACTIVE: 0, BACKGROUND: 0}
+        self._interactive_work = 0
+        self._waiting = list()
+        self._counter = itertools.count()
+        self._condition = threading.Condition(threading.Lock())
+
+    @property
+    def max_requests(self):
+        return self._max_requests
+
+    @property
+    def background_limit(self):
+        return self._background_limit
+
+    def running(self, priority=None):
+        """
+        Returns the number of running requests
+
+        :param int priority: if given, only requests with this priority are counted
+        :return: number of running requests
+        :rtype: int
+        """
+
+        with self._condition:
+            if priority is None:
+                return sum(self._running.values())
+            return self._running[priority]
+
+    def is_interactive_busy(self):
+        """
+        Returns whether or not interactive work is running or waiting
+
+        :return: True if there is interactive work; False otherwise.
+        :rtype: bool
+        """
+
+        with self._condition:
+            return self._is_interactive_busy()
+
+    def acquire(self, priority=INTERACTIVE, cancel_token=None):
+        """
+        Blocks until a request slot with the given priority is available and takes it
+
+        :param int priority: INTERACTIVE or BACKGROUND
+        :param CancellationToken cancel_token: optional token used to cancel the wait
+        :return: time (in seconds) waited
+        :rtype: float
+        :raises CancelledError: if the token is cancelled while waiting
+        """
+
+        start_time = timeit.default_timer()
+        with self._condition:
+            entry = (priority, next(self._counter))
+            heapq.heappush(self._waiting, entry)
+            try:
+                while self._waiting[0] != entry or not self._can_start(priority):
+                    if cancel_token is not None and cancel_token.is_cancelled():
+                        break
+                    self._condition.wait(WAIT_INTERVAL)
+                else:
+                    heapq.heappop(self._waiting)
+                    self._running[priority] += 1
+                    entry = None
+            finally:
+                if entry is not None:
+                    self._waiting.remove(entry)
+                    heapq.heapify(self._waiting)
+                self._condition.notify_all()
+        cancellation.raise_if_cancelled(cancel_token)
+
+        wait_time = timeit.default_timer() - start_time
+        metrics.observe('scheduler_wait_seconds', wait_time, priority=PRIORITY_NAMES[priority])
+
+        return wait_time
+
+    def enqueue(self, priority=INTERACTIVE):
+        """
+        Adds a request with the given priority to the waiting queue without blocking. Asynchronous requests cannot
+        block the thread their loop runs in, so they enqueue themselves and poll try_acquire until it is their turn
+
+        :param int priority: INTERACTIVE or BACKGROUND
+        :return: waiting queue entry
+        :rtype: tuple
+        """
+
+        with self._condition:
+            entry = (priority, next(self._counter))
+            heapq.heappush(self._waiting, entry)
+
+        return entry
+
+    def try_acquire(self, entry):
+        """
+        Takes a request slot for the given waiting queue entry if it is its turn
+
+        :param tuple entry: entry returned by enqueue
+        :return: True if the slot was taken (entry is removed from the waiting queue); False otherwise.
+        :rtype: bool
+        """
+
+        priority = entry[0]
+        with self._condition:
+            if not self._waiting or self._waiting[0] != entry or not self._can_start(priority):
+                return False
+            heapq.heappop(self._waiting)
+            self._running[priority] += 1
+            self._condition.notify_all()
+
+        return True
+
+    def dequeue(self, entry):
+        """
+        Removes the given entry from the waiting queue. Must be called when a request returned by enqueue stops
+        waiting without taking a slot (for example, because it was cancelled)
+
+        :param tuple entry: entry returned by enqueue
+        """
+
+        with self._condition:
+            if entry in self._waiting:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                self._condition.notify_all()
+
+    def release(self, priority=INTERACTIVE):
+        """
+        Returns a request slot taken with acquire
+
+        :param int priority: priority the slot was taken with
+        """
+
+        with self._condition:
+            self._running[priority] = max(0, self._running[priority] - 1)
+            self._condition.notify_all()
+
+    def should_yield(self, priority):
+        """
+        Returns whether or not a running request with the given priority should return its slot to let interactive
+        requests go first
+
+        :param int priority: priority of the running request
+        :return: True if the request should yield its slot; False otherwise.
+        :rtype: bool
+        """
+
+        if priority != BACKGROUND:
+            return False
+
+        with self._condition:
+            if any(waiting_priority == INTERACTIVE for waiting_priority, _ in self._waiting):
+                return True
+            return self._is_interactive_busy() and self._running[BACKGROUND] > self._background_limit
+
+    def begin_interactive_work(self):
+        """
+        Marks the start of interactive work. Background requests are capped until end_interactive_work is called
+        """
+
+        with self._condition:
+            self._interactive_work += 1
+
+    def end_interactive_work(self):
+        """
+        Marks the end of interactive work started with begin_interactive_work
+        """
+
+        with self._condition:
+            self._interactive_work = max(0, self._interactive_work - 1)
+            self._condition.notify_all()
+
+    def _is_interactive_busy(self):
+        return bool(self._interactive_work or self._running[INTERACTIVE] or any(
+            waiting_priority == INTERACTIVE for waiting_priority, _ in self._waiting))
+
+    def _can_start(self, priority):
+        if self._max_requests > 0 and sum(self._running.values()) >= self._max_requests:
+            return False
+        if priority == BACKGROUND and self._is_interactive_busy():
+            return self._running[BACKGROUND] < self._background_limit
+
+        return True
+
+
+class _PriorityContext(object):
+    """
+    Context that defines the priority of the requests done in current thread while it is active
+    """
+
+    def __init__(self, priority):
+        super(_PriorityContext, self).__init__()
+
+        self._priority = priority
+        self._previous_priority = None
+
+    def __enter__(self):
+        self._previous_priority = getattr(_CONTEXT, 'priority', None)
+        _CONTEXT.priority = self._priority
+        if self._priority == INTERACTIVE:
+            get_scheduler().begin_interactive_work()
+
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _CONTEXT.priority = self._previous_priority
+        if self._priority == INTERACTIVE:
+            get_scheduler().end_interactive_work()
+
+        return False
+
+
+class _RequestSlot(object):
+    """
+    Context that holds a request slot while it is active
+    """
+
+    def __init__(self, priority, cancel_token=None):
+        super(_RequestSlot, self).__init__()
+
+        self._priority = priority
+        self._cancel_token = cancel_token
+        self._scheduler = get_scheduler()
+        self._acquired = False
+        self._parent = None
+
+    @property
+    def priority(self):
+        return self._priority
+
+    def __enter__(self):
+        # Requests done while current thread already holds a slot use that slot
+        self._parent = getattr(_CONTEXT, 'slot', None)
+        if self._parent is None:
+            self._scheduler.acquire(self._priority, cancel_token=self._cancel_token)
+            self._acquired = True
+            _CONTEXT.slot = self
+
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._parent is None:
+            _CONTEXT.slot = None
+            if self._acquired:
+                self._acquired = False
+                self._scheduler.release(self._priority)
+
+        return False
+
+    def checkpoint(self):
+        """
+        Yields the slot if interactive requests should go first, and waits until it is this request turn again.
+        Should be called between the chunks of long requests
+
+        :raises CancelledError: if the cancellation token is cancelled while waiting
+        """
+
+        if self._parent is not None:
+            return self._parent.checkpoint()
+        if not self._acquired or not self._scheduler.should_yield(self._priority):
+            return
+
+        logger.debug('Background request paused to let interactive requests go first')
+        self._acquired = False
+        self._scheduler.release(self._priority)
+        self._scheduler.acquire(self._priority, cancel_token=self._cancel_token)
+        self._acquired = True
+
+
+def _get_int_env(env_name, default_value):
+    try:
+        return int(os.environ.get(env_name, None) or default_value)
+    except ValueError:
+        logger.warning('Invalid value for {} environment variable: {}'.format(env_name, os.environ.get(env_name)))
+        return default_value
+
+
+def get_scheduler():
+    """
+    Returns the scheduler shared by all updater requests
+
+    :return: request scheduler
+    :rtype: RequestScheduler
+    """
+
+    global _SCHEDULER
+
+    with _LOCK:
+        if _SCHEDULER is None:
+            _SCHEDULER = RequestScheduler(
+                max_requests=_get_int_env(MAX_REQUESTS_ENV, DEFAULT_MAX_REQUESTS),
+                background_limit=_get_int_env(BACKGROUND_LIMIT_ENV, DEFAULT_BACKGROUND_LIMIT))
+
+        return _SCHEDULER
+
+
+def reset():
+    """
+    Removes current scheduler, so limits are read again from environment variables.
+    Should not be called while requests are running
+    """
+
+    global _SCHEDULER
+
+    with _LOCK:
+        _SCHEDULER = None
+
+
+def get_priority():
+    """
+    Returns the priority of the requests done in current thread
+
+    :return: INTERACTIVE or BACKGROUND
+    :rtype: int
+    """
+
+    current_priority = getattr(_CONTEXT, 'priority', None)
+
+    return INTERACTIVE if current_priority is None else current_priority
+
+
+def priority(request_priority):
+    """
+    Returns a context that defines the priority of the requests done in current thread inside it.
+    Background requests are capped while an interactive context is active in any thread
+
+    :param int request_priority: INTERACTIVE or BACKGROUND
+    :return: priority context
+    """
+
+    if request_priority not in PRIORITY_NAMES:
+        raise ValueError('Invalid request priority: {}'.format(request_priority))
+
+    return _PriorityContext(request_priority)
+
+
+def request(cancel_token=None, request_priority=None):
+    """
+    Returns a context that holds a request slot while it is active. Network requests (including the read of their
+    responses) must be done inside it
+
+    :param CancellationToken cancel_token: optional token used to cancel the wait for a free slot
+    :param int request_priority: request priority. If not given, current thread priority is used
+    :return: request slot context
+    :raises CancelledError: if the token is cancelled while waiting for a free slot
+    """
+
+    return _RequestSlot(get_priority() if request_priority is None else request_priority, cancel_token=cancel_token)
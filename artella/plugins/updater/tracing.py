@@ -0,0 +1,313 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains a lightweight tracing API used to time the phases of the update pipeline.
+
+Tracing is disabled by default. It can be enabled setting ARTELLA_UPDATER_TRACE environment variable (or calling
+enable function). When enabled, finished spans are stored in memory (see spans function), sent to registered
+listeners and, if ARTELLA_UPDATER_TRACE_LOG environment variable is set, logged as a JSON line. When disabled, span
+function returns a shared no-op span, so instrumented code only pays for a function call.
+
+    with tracing.attributes(plugin_id='artella-plugins-updater'):
+        with tracing.span('download', url=url) as download_span:
+            ...
+            download_span.set(bytes=total_bytes)
+
+Attributes given to the attributes function are added to all the spans created in the same thread inside its
+context.
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import os
+import json
+import time
+import logging
+import threading
+from collections import deque
+
+logger = logging.getLogger('artella')
+
+TRACE_ENV = 'ARTELLA_UPDATER_TRACE'
+TRACE_LOG_ENV = 'ARTELLA_UPDATER_TRACE_LOG'
+MAX_SPANS = 1000
+
+
+def _is_env_enabled(env_name):
+    return os.environ.get(env_name, '').strip().lower() not in ('', '0', 'false', 'no', 'off')
+
+
+_ENABLED = _is_env_enabled(TRACE_ENV) or _is_env_enabled(TRACE_LOG_ENV)
+_LOG = _is_env_enabled(TRACE_LOG_ENV)
+_SPANS = deque(maxlen=MAX_SPANS)
+_LISTENERS = list()
+_LOCK = threading.Lock()
+_CONTEXT = threading.local()
+
+
+class Span(object):
+    """
+    Timed phase of the update pipeline. Spans are finished when exiting their context
+    """
+
+    __slots__ = ('name', 'attributes', 'start_time', 'end_time', 'error', '_start_counter', '_duration')
+
+    def __init__(self, name, **attributes):
+        context_attributes = getattr(_CONTEXT, 'attributes', None)
+        self.name = name
+        self.attributes = dict(context_attributes, **attributes) if context_attributes else attributes
+        self.start_time = time.time()
+        self.end_time = None
+        self.error = None
+        self._start_counter = _counter()
+        self._duration = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        if exc_type is not None:
+            self.error = '{}: {}'.format(exc_type.__name__, exc_value)
+        self.finish()
+        return False
+
+    @property
+    def duration(self):
+        """
+        Returns span duration in seconds. If the span is not finished yet, elapsed time is returned
+
+        :return: duration in seconds
+        :rtype: float
+        """
+
+        return self._duration if self._duration is not None else _counter() - self._start_counter
+
+    def set(self, **attributes):
+        """
+        Sets given attributes (such as byte counts or plugin IDs) into the span
+        """
+
+        self.attributes.update(attributes)
+
+    def finish(self, duration=None):
+        """
+        Finishes the span and records it
+
+        :param float duration: span duration in seconds. If not given, time elapsed since span creation is used
+        """
+
+        if self._duration is not None:
+            return
+        self._duration = duration if duration is not None else _counter() - self._start_counter
+        self.end_time = self.start_time + self._duration
+        _record(self)
+
+    def to_dict(self):
+        """
+        Returns span data as a dictionary
+
+        :return: dictionary with name, start_time, duration, error and attributes keys
+        :rtype: dict
+        """
+
+        return {
+            'name': self.name,
+            'start_time': self.start_time,
+            'duration': self.duration,
+            'error': self.error,
+            'attributes': dict(self.attributes)
+        }
+
+
+class _NullSpan(object):
+    """
+    Span returned when tracing is disabled. It does nothing
+    """
+
+    __slots__ = ()
+
+    name = None
+    error = None
+    duration = 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        return False
+
+    def set(self, **attributes):
+        pass
+
+    def finish(self, duration=None):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _AttributesContext(object):
+    """
+    Context that adds attributes to all the spans created in current thread while it is active
+    """
+
+    def __init__(self, attributes):
+        self._attributes = attributes
+        self._previous_attributes = None
+
+    def __enter__(self):
+        self._previous_attributes = getattr(_CONTEXT, 'attributes', None)
+        _CONTEXT.attributes = dict(self._previous_attributes or dict(), **self._attributes)
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        _CONTEXT.attributes = self._previous_attributes
+        return False
+
+
+def is_enabled():
+    """
+    Returns whether or not tracing is enabled
+
+    :return: True if tracing is enabled; False otherwise.
+    :rtype: bool
+    """
+
+    return _ENABLED
+
+
+def enable(log=None):
+    """
+    Enables tracing
+
+    :param bool log: whether or not finished spans should be logged. If not given, current value is kept
+    """
+
+    global _ENABLED, _LOG
+    _ENABLED = True
+    if log is not None:
+        _LOG = bool(log)
+
+
+def disable():
+    """
+    Disables tracing. Already recorded spans are kept
+    """
+
+    global _ENABLED
+    _ENABLED = False
+
+
+def span(name, **attributes):
+    """
+    Returns a new span with the given name and attributes. Span is finished when exiting its context
+
+    :param str name: name of the phase (for example, download)
+    :param attributes: span attributes
+    :return: new span or a no-op span if tracing is disabled
+    :rtype: Span
+    """
+
+    if not _ENABLED:
+        return _NULL_SPAN
+
+    return Span(name, **attributes)
+
+
+def attributes(**span_attributes):
+    """
+    Returns a context that adds the given attributes to all the spans created in current thread inside it
+
+    :param span_attributes: span attributes (for example, plugin_id)
+    :return: attributes context or a no-op context if tracing is disabled
+    """
+
+    if not _ENABLED:
+        return _NULL_SPAN
+
+    return _AttributesContext(span_attributes)
+
+
+def record_span(name, duration, **attributes):
+    """
+    Records a span whose duration was measured by the caller
+
+    :param str name: name of the phase
+    :param float duration: duration in seconds
+    :param attributes: span attributes
+    """
+
+    if not _ENABLED:
+        return
+
+    new_span = Span(name, **attributes)
+    new_span.start_time -= duration
+    new_span.finish(duration)
+
+
+def spans(name=None):
+    """
+    Returns recorded spans. Only the last MAX_SPANS spans are kept
+
+    :param str name: if given, only spans with this name will be returned
+    :return: list of finished spans, from oldest to newest
+    :rtype: list(Span)
+    """
+
+    with _LOCK:
+        recorded_spans = list(_SPANS)
+
+    return [recorded_span for recorded_span in recorded_spans if name is None or recorded_span.name == name]
+
+
+def clear():
+    """
+    Removes all recorded spans
+    """
+
+    with _LOCK:
+        _SPANS.clear()
+
+
+def add_listener(listener):
+    """
+    Registers a function that will be called with each finished span
+
+    :param callable listener: function that receives a Span as its only argument
+    """
+
+    with _LOCK:
+        if listener not in _LISTENERS:
+            _LISTENERS.append(listener)
+
+
+def remove_listener(listener):
+    """
+    Unregisters given span listener
+
+    :param callable listener: function registered with add_listener
+    """
+
+    with _LOCK:
+        if listener in _LISTENERS:
+            _LISTENERS.remove(listener)
+
+
+def _counter():
+    return time.perf_counter() if hasattr(time, 'perf_counter') else time.time()
+
+
+def _record(finished_span):
+    with _LOCK:
+        _SPANS.append(finished_span)
+        listeners = list(_LISTENERS)
+
+    if _LOG:
+        logger.info('artella-updater-trace {}'.format(json.dumps(finished_span.to_dict(), sort_keys=True, default=str)))
+
+    for listener in listeners:
+        try:
+            listener(finished_span)
+        except Exception as exc:
+            logger.debug('Error while calling trace listener {}: {}'.format(listener, exc))
@@ -10,6 +10,7 @@ from __future__ import print_function, division, absolute_import
 import logging
 
 from artella.core import plugin, qtutils, dccplugin
+from artella.plugins.updater import profiler
 
 logger = logging.getLogger('artella')
 
@@ -22,15 +23,18 @@ class UpdaterPlugin(plugin.ArtellaPlugin, object):
     def __init__(self, config_dict=None, manager=None):
         super(UpdaterPlugin, self).__init__(config_dict=config_dict, manager=manager)
 
+    @profiler.profile('check_for_updates')
     def check_for_updates(self, show_dialogs=True):
         """
         Shows UI informing the user if there is available or not a new version of the DCC plugin to download
         """
 
-        from artella.plugins.updater import utils
+        from artella.plugins.updater import utils, tracing, scheduler
         from artella.plugins.updater.widgets import versioninfo
 
-        latest_release_info = utils.get_latest_stable_artella_dcc_plugin_info(show_dialogs=show_dialogs)
+        # The user is waiting for the result, so the check goes before background requests
+        with scheduler.priority(scheduler.INTERACTIVE), tracing.span('check', show_dialogs=show_dialogs):
+            latest_release_info = utils.get_latest_stable_artella_dcc_plugin_info(show_dialogs=show_dialogs)
         if not latest_release_info:
             return False
 
@@ -42,50 +46,56 @@ class UpdaterPlugin(plugin.ArtellaPlugin, object):
 
         return True
 
+    @profiler.profile('updater')
     def updater(self):
         """
         Shows an about window that shows information about current installed Artella plugin
         """
 
+        from artella.plugins.updater import tracing
         from artella.plugins.updater.widgets import updater
 
         if not qtutils.QT_AVAILABLE:
             logger.warning('Updater UI cannot be launched because Qt is not available!')
             return False
 
-        updater_window = updater.UpdaterWindow()
-        updater_window.show()
+        with tracing.span('ui_build', window='updater'):
+            updater_window = updater.UpdaterWindow()
+            updater_window.show()
 
         return True
 
     def update_is_available(self, show_dialogs=True):
         """
-        Returns whether or not a new Artella DCC plugin version is available to download
+        Returns whether or not a new Artella DCC plugin version is available to download.
+        Checks without dialogs are automatic ones, so they are done with background request priority and new releases
+        are only reported once the staged rollout (see artella.plugins.updater.rollout) reaches current seat
         :return:
         """
 
-        from artella.plugins.updater import utils
+        from artella.plugins.updater import utils, tracing, rollout, scheduler
 
         current_version = dccplugin.DccPlugin().get_version()
         if not current_version:
             return True
-        latest_release_info = utils.get_latest_stable_artella_dcc_plugin_info(show_dialogs=show_dialogs)
+        check_priority = scheduler.INTERACTIVE if show_dialogs else scheduler.BACKGROUND
+        with scheduler.priority(check_priority), tracing.span(
+                'check', current_version=current_version, show_dialogs=show_dialogs) as check_span:
+            latest_release_info = utils.get_latest_stable_artella_dcc_plugin_info(show_dialogs=show_dialogs)
+            check_span.set(latest_version=latest_release_info.get('version', None) if latest_release_info else None)
         if not latest_release_info:
             return True
         latest_version = latest_release_info.get('version', None)
         if not latest_version:
             return True
 
-        current_version_split = current_version.split('.')
-        latest_version_split = latest_version.split('.')
+        if not utils.is_version_newer(latest_version, current_version):
+            return False
 
-        if latest_version_split[0] > current_version_split[0]:
+        # Explicit checks are done by the user, so they are never delayed by staged rollouts
+        if show_dialogs:
             return True
-        else:
-            if latest_version_split[1] > current_version_split[1]:
-                return True
-            else:
-                if latest_version_split[2] > latest_version_split[2]:
-                    return True
-
-        return False
+
+        # New releases are opened progressively to the different seat cohorts to avoid all of them downloading the
+        # release at the same time
+        return rollout.is_release_available(latest_version, latest_release_info.get('rollout_start', None))
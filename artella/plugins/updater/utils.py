@@ -6,58 +6,495 @@ Module that contains utils functions for Artella Updater
 """
 
 import os
+import re
 import ssl
 import sys
+import time
+import socket
+import timeit
 import math
 import json
+import zlib
 import logging
+import shutil
+import hashlib
+import zipfile
 import tarfile
+import pkgutil
+import tempfile
+import functools
+import threading
+import importlib
 from datetime import datetime
 
 try:
+    from queue import Queue
+except ImportError:
+    from Queue import Queue
+
+try:
+    from http.client import HTTPConnection, HTTPSConnection
     from urllib.parse import urlparse, urlencode, urlunparse
-    from urllib.request import urlopen, Request
+    from urllib.request import urlopen, Request, pathname2url, build_opener, HTTPHandler, HTTPSHandler
     from urllib.error import HTTPError, URLError
 except ImportError:
+    from httplib import HTTPConnection, HTTPSConnection
     from urlparse import urlparse, urlunparse
-    from urllib import urlencode
-    from urllib2 import urlopen, Request, HTTPError, URLError
+    from urllib import urlencode, pathname2url
+    from urllib2 import urlopen, Request, HTTPError, URLError, build_opener, HTTPHandler, HTTPSHandler
 
 import artella.dcc as dcc
 from artella.core import qtutils, utils
+from artella.plugins.updater import (
+    manifest, compiler, tracing, metrics, ratelimit, jsondecoder, cancellation, scheduler)
 
 if qtutils.QT_AVAILABLE:
     from artella.externals.Qt import QtCore
 
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
 logger = logging.getLogger('artella')
 
+PYPI_URL = 'https://pypi.org/pypi'
+ARTELLA_UPDATES_URL = 'https://updates.artellaapp.com/plugins'
+MIRROR_URL_ENV = 'ARTELLA_UPDATER_MIRROR_URL'
+PACKAGE_EXTENSIONS = ('.whl', '.tar.gz')     # Package file types in order of preference
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+EXTRACT_JOBS = 4
+DIGESTS = ('sha256', 'blake2b_256')                     # PyPI release digests used to verify downloads
+PIPELINE_QUEUE_SIZE = 64                                # Maximum number of tar members waiting to be written
+PIPELINE_QUEUE_MAX_SIZE = 16 * 1024 * 1024              # Maximum bytes of tar members waiting to be written
+PIPELINE_MAX_MEMBER_SIZE = 1024 * 1024                  # Bigger tar members are written without being queued
+PIPELINE_WAIT_INTERVAL = 0.1                            # Seconds between cancellation checks while the queue is full
+THROTTLE_RETRIES = 3                                    # Times throttled requests (HTTP 429 and 503) are retried
+METADATA_FOLDER_EXTENSIONS = ('.dist-info', '.egg-info')
 
-def get_pypi_info(plugin_id):
+_SDIST_ROOT_REGEX = re.compile(r'^(?P<name>.+?)-(?P<version>\d[^-]*)$')
+_WHEEL_DATA_FOLDERS = ('purelib', 'platlib')
 
-    pypi_url = 'https://pypi.org/pypi/{}/json'.format(plugin_id)
-    req = Request(pypi_url)
+_MIRROR_URL = None
+_PLUGIN_INSTALL_PATHS = dict()
 
-    rsp = None
-    pypi_info = dict()
+
+def set_mirror_url(mirror_url):
+    """
+    Sets the base URL of the mirror that will be used to retrieve all updater data instead of PyPI and Artella servers
+
+    :param str or None mirror_url: URL (or local folder path) of the mirror. If None, mirror will be disabled.
+    """
+
+    global _MIRROR_URL
+    _MIRROR_URL = mirror_url
+
+
+def get_mirror_url():
+    """
+    Returns the base URL of the mirror used to retrieve updater data (see artella.plugins.updater.mirror)
+
+    :return: mirror base URL. None if no mirror is used.
+    :rtype: str or None
+    """
+
+    mirror_url = _MIRROR_URL or os.environ.get(MIRROR_URL_ENV, None)
+    if not mirror_url:
+        return None
+    if os.path.isdir(mirror_url):
+        mirror_url = 'file:{}'.format(pathname2url(os.path.abspath(mirror_url)))
+
+    return mirror_url.rstrip('/')
+
+
+def get_pypi_url(plugin_id):
+    """
+    Returns URL where PyPI JSON information of the given plugin can be retrieved from
+
+    :param str plugin_id: ID of the plugin (for example, artella-plugins-updater)
+    :return: PyPI JSON URL
+    :rtype: str
+    """
+
+    base_url = '{}/pypi'.format(get_mirror_url()) if get_mirror_url() else PYPI_URL
+
+    return '{}/{}/json'.format(base_url, plugin_id)
+
+
+def get_artella_dcc_plugin_url(dcc_name, platform):
+    """
+    Returns URL where latest stable Artella DCC plugin information can be retrieved from
+
+    :param str dcc_name: name of the DCC
+    :param str platform: name of the OS platform (windows, darwin and linux)
+    :return: Artella DCC plugin JSON URL
+    :rtype: str
+    """
+
+    base_url = '{}/plugins'.format(get_mirror_url()) if get_mirror_url() else ARTELLA_UPDATES_URL
+
+    return '{}/{}/versions/stable-{}.json'.format(base_url, dcc_name, platform)
+
+
+def get_package_url(url):
+    """
+    Returns URL where the given PyPI package file URL should be downloaded from, taking into account mirror
+
+    :param str url: PyPI package file URL
+    :return: package file URL
+    :rtype: str
+    """
+
+    mirror_url = get_mirror_url()
+    if not mirror_url or not url:
+        return url
+
+    return '{}/packages/{}'.format(mirror_url, url.split('/')[-1])
+
+
+def get_accepted_encodings():
+    """
+    Returns the content encodings updater metadata requests accept. Brotli is only accepted if brotli package is
+    available
+
+    :return: list of content encodings in order of preference
+    :rtype: list(str)
+    """
+
+    return (['br'] if brotli is not None else list()) + ['gzip', 'deflate']
+
+
+def open_url(url, context=None, compressed=False, cancel_token=None):
+    """
+    Opens the given URL. All updater requests are done through this function, so they share the rate limit of each
+    host (see artella.plugins.updater.ratelimit). Throttled requests (HTTP 429 and 503) are retried.
+
+    :param str url: URL to open
+    :param ssl.SSLContext context: optional SSL context
+    :param bool compressed: whether or not compressed responses are requested. Compressed responses are decompressed
+        while they are read. Should only be used for metadata requests: packages are already compressed
+    :param CancellationToken cancel_token: optional token used to cancel the request while it waits for its turn
+    :return: response object
+    :raises CancelledError: if the request is cancelled
+    """
+
+    parsed_url = urlparse(url)
+    host = parsed_url.hostname if parsed_url.scheme in ('http', 'https') else None
+    bucket = ratelimit.get_bucket(host)
+
+    for retry in range(THROTTLE_RETRIES + 1):
+        if bucket:
+            _wait(bucket.reserve(), cancel_token)
+        cancellation.raise_if_cancelled(cancel_token)
+        try:
+            rsp = _open_url(url, context=context, compressed=compressed)
+        except HTTPError as exc:
+            if not bucket or exc.code not in ratelimit.THROTTLE_STATUS_CODES or retry >= THROTTLE_RETRIES:
+                raise
+            headers = exc.info()
+            retry_after = ratelimit.parse_retry_after(headers.get('Retry-After', None) if headers else None)
+            bucket.slow_down(retry_after)
+            metrics.increment('retries_total', operation='throttled', host=host)
+            logger.warning('Request throttled by {} (HTTP {}). Retrying at {:.2f} requests per second ...'.format(
+                host, exc.code, bucket.rate))
+            continue
+        if bucket:
+            bucket.recover()
+        return rsp
+
+
+def _wait(seconds, cancel_token=None):
+    if seconds <= 0:
+        return
+    if cancel_token is not None:
+        cancel_token.wait(seconds)
+    else:
+        time.sleep(seconds)
+
+
+def read_response(rsp, cancel_token=None, chunk_size=DOWNLOAD_CHUNK_SIZE):
+    """
+    Reads the whole body of the given response. If a cancellation token is given, body is read in chunks and the
+    token is checked between them
+
+    :param rsp: response object returned by open_url
+    :param CancellationToken cancel_token: optional cancellation token
+    :param int chunk_size: size of the chunks read when a cancellation token is given
+    :return: response body
+    :rtype: bytes
+    :raises CancelledError: if the read is cancelled. Response is closed
+    """
+
+    if cancel_token is None:
+        return rsp.read()
+
+    chunks = list()
     try:
+        while True:
+            cancel_token.raise_if_cancelled()
+            chunk = rsp.read(chunk_size)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    except cancellation.CancelledError:
+        rsp.close()
+        raise
+
+    return b''.join(chunks)
+
+
+def _open_url(url, context=None, compressed=False):
+    req = Request(url)
+    if compressed:
+        req.add_header('Accept-Encoding', ', '.join(get_accepted_encodings()))
+
+    if tracing.is_enabled():
+        with tracing.span('ttfb', url=url) as ttfb_span:
+            rsp = build_opener(_TracedHTTPHandler(), _TracedHTTPSHandler(context=context)).open(req)
+            ttfb_span.set(status=rsp.getcode())
+    elif context is not None:
+        rsp = urlopen(req, context=context)
+    else:
         rsp = urlopen(req)
-    except URLError as exc:
-        if hasattr(exc, 'reason'):
-            msg = 'Failed to retrieve Plugin {} PyPI information ({}): "{}"'.format(plugin_id, pypi_url, exc.reason)
-        elif hasattr(exc, 'code'):
-            msg = 'Failed to retrieve Plugin {} PyPI information ({}): "{}"'.format(plugin_id, pypi_url, exc.code)
+
+    if not compressed:
+        return rsp
+
+    headers = rsp.info()
+    decompressor = create_decompressor((headers.get('Content-Encoding', None) if headers else None) or '')
+    if decompressor is None:
+        return rsp
+
+    return _DecodedResponse(rsp, decompressor)
+
+
+class _DecodedResponse(object):
+    """
+    Wraps a compressed HTTP response and decompresses its data while it is read
+    """
+
+    def __init__(self, rsp, decompressor):
+        super(_DecodedResponse, self).__init__()
+
+        self._rsp = rsp
+        self._buffer = b''
+        self._eof = False
+        self._decompressor = decompressor
+        self.wire_bytes = 0
+
+    def __getattr__(self, name):
+        return getattr(self._rsp, name)
+
+    def read(self, size=-1):
+        while not self._eof and (size is None or size < 0 or len(self._buffer) < size):
+            self._buffer += self._decompress(self._rsp.read(DOWNLOAD_CHUNK_SIZE))
+
+        if size is None or size < 0:
+            data, self._buffer = self._buffer, b''
         else:
-            msg = exc
-        logger.debug(exc)
-        logger.error(msg)
-    if not rsp:
-        return pypi_info
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+
+        return data
+
+    def _decompress(self, chunk):
+        if not chunk:
+            self._eof = True
+            return self._decompressor.flush()
+
+        self.wire_bytes += len(chunk)
+
+        return self._decompressor.decompress(chunk)
+
+
+class _Decompressor(object):
+    """
+    Decompresses HTTP response bodies encoded with gzip, deflate or br content encodings
+    """
+
+    def __init__(self, encoding):
+        super(_Decompressor, self).__init__()
+
+        self._encoding = encoding
+        # Deflate data is buffered until its zlib header is validated, so it can be decoded again as raw deflate
+        self._head = b'' if encoding == 'deflate' else None
+        if encoding == 'br':
+            self._decompressor = brotli.Decompressor()
+        elif encoding == 'gzip':
+            self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        else:
+            self._decompressor = zlib.decompressobj()
+
+    def decompress(self, data):
+        if not data:
+            return b''
+        if self._encoding == 'br':
+            return self._decompressor.process(data)
+        if self._head is None:
+            return self._decompressor.decompress(data)
+
+        self._head += data
+        try:
+            decompressed_data = self._decompressor.decompress(data)
+        except zlib.error:
+            # Some servers send raw deflate data without zlib header
+            head, self._head = self._head, None
+            self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+            return self._decompressor.decompress(head)
+        if len(self._head) >= 2:
+            self._head = None
+
+        return decompressed_data
+
+    def flush(self):
+        return self._decompressor.flush() if self._encoding != 'br' else b''
+
+
+def create_decompressor(encoding):
+    """
+    Returns an object that decompresses HTTP response bodies encoded with the given content encoding. Chunks of the
+    body are passed to its decompress method and the remaining data is returned by its flush method.
+    Deflate bodies are decoded both with zlib header and without it (raw deflate).
+
+    :param str encoding: Content-Encoding header value (gzip, deflate or br)
+    :return: decompressor object. None if the encoding is not supported.
+    :rtype: object or None
+    """
+
+    encoding = (encoding or '').strip().lower()
+    if encoding not in ('gzip', 'deflate', 'br') or (encoding == 'br' and brotli is None):
+        return None
+
+    return _Decompressor(encoding)
+
+
+def _traced_connect(connection, connect_fn):
+    """
+    Opens given HTTP connection recording DNS, connect and TLS spans.
+    Python 2 connections do not allow to intercept socket creation, so a single connect span is recorded.
+    """
+
+    is_tls = isinstance(connection, HTTPSConnection)
+    socket_durations = list()
+
+    if hasattr(connection, '_create_connection'):
+        def _create_connection(address, timeout=socket._GLOBAL_DEFAULT_TIMEOUT, source_address=None):
+            with tracing.span('dns', host=address[0]) as dns_span:
+                address_infos = socket.getaddrinfo(address[0], address[1], 0, socket.SOCK_STREAM)
+            socket_durations.append(dns_span.duration)
+            with tracing.span('connect', host=address[0], tls=is_tls) as connect_span:
+                error = None
+                for address_info in address_infos:
+                    try:
+                        sock = socket.create_connection(
+                            (address_info[4][0], address[1]), timeout=timeout, source_address=source_address)
+                        break
+                    except socket.error as exc:
+                        error = exc
+                else:
+                    raise error or socket.error('No address found for host: {}'.format(address[0]))
+            socket_durations.append(connect_span.duration)
+            return sock
+        connection._create_connection = _create_connection
+
+    start_time = timeit.default_timer()
+    connect_fn(connection)
+    elapsed_time = timeit.default_timer() - start_time
+
+    if not socket_durations:
+        tracing.record_span('connect', elapsed_time, host=connection.host, tls=is_tls)
+    elif is_tls:
+        tracing.record_span('tls', max(0.0, elapsed_time - sum(socket_durations)), host=connection.host)
+
+
+class _TracedHTTPConnection(HTTPConnection, object):
+    def connect(self):
+        _traced_connect(self, HTTPConnection.connect)
+
+
+class _TracedHTTPSConnection(HTTPSConnection, object):
+    def connect(self):
+        _traced_connect(self, HTTPSConnection.connect)
+
+
+class _TracedHTTPHandler(HTTPHandler, object):
+    def http_open(self, req):
+        return self.do_open(_TracedHTTPConnection, req)
+
 
-    plugin_pypi_rsp = rsp.read()
+class _TracedHTTPSHandler(HTTPSHandler, object):
+    def https_open(self, req):
+        return self.do_open(_TracedHTTPSConnection, req, context=self._context)
+
+
+def get_file_hash(file_path, algorithm='sha256', chunk_size=1024 * 1024):
+    """
+    Returns the hex digest of the given file contents
+
+    :param str file_path: path of the file to hash
+    :param str algorithm: hashlib algorithm name
+    :param int chunk_size: size of the chunks file is read in
+    :return: hex digest. None if file does not exist.
+    :rtype: str or None
+    """
+
+    if not file_path or not os.path.isfile(file_path):
+        return None
+
+    file_hash = hashlib.new(algorithm)
+    with open(file_path, 'rb') as fh:
+        while True:
+            chunk = fh.read(chunk_size)
+            if not chunk:
+                break
+            file_hash.update(chunk)
+
+    return file_hash.hexdigest()
+
+
+def get_pypi_info(plugin_id, cancel_token=None):
+
+    pypi_url = get_pypi_url(plugin_id)
+
+    rsp = None
+    pypi_info = dict()
+    with scheduler.request(cancel_token=cancel_token):
+        try:
+            rsp = open_url(pypi_url, compressed=True, cancel_token=cancel_token)
+        except URLError as exc:
+            if hasattr(exc, 'reason'):
+                msg = 'Failed to retrieve Plugin {} PyPI information ({}): "{}"'.format(
+                    plugin_id, pypi_url, exc.reason)
+            elif hasattr(exc, 'code'):
+                msg = 'Failed to retrieve Plugin {} PyPI information ({}): "{}"'.format(plugin_id, pypi_url, exc.code)
+            else:
+                msg = exc
+            logger.debug(exc)
+            logger.error(msg)
+        if not rsp:
+            return pypi_info
+
+        with tracing.span('metadata', plugin_id=plugin_id) as metadata_span:
+            plugin_pypi_rsp = read_response(rsp, cancel_token=cancel_token)
+            metadata_span.set(
+                bytes=len(plugin_pypi_rsp or b''), wire_bytes=getattr(rsp, 'wire_bytes', len(plugin_pypi_rsp or b'')))
+
+    return parse_pypi_info(plugin_pypi_rsp)
+
+
+def parse_pypi_info(plugin_pypi_rsp):
+    """
+    Returns the information updater uses from the given PyPI JSON document
+
+    :param str or bytes plugin_pypi_rsp: PyPI JSON document of a plugin
+    :return: dictionary with plugin author, summary, latest version and latest version package data
+    :rtype: dict
+    """
+
+    pypi_info = dict()
     if not plugin_pypi_rsp:
         return pypi_info
 
-    plugin_pypi_data = json.loads(plugin_pypi_rsp)
+    plugin_pypi_data = jsondecoder.load_pypi_document(plugin_pypi_rsp)
     if not plugin_pypi_data:
         return pypi_info
 
@@ -72,20 +509,84 @@ def get_pypi_info(plugin_id):
 
     plugin_pypi_releases = plugin_pypi_data.get('releases', dict())
     release_info = plugin_pypi_releases.get(pypi_info['version'], list())
-    release = None
-    for release_data in release_info:
-        release_filename = release_data.get('filename', '')
-        if release_filename.endswith('.tar.gz'):
-            release = release_data
-            break
+    release = get_preferred_release(release_info)
     release_date = (release.get('upload_time', '') if release else '').split('T')[0].split('-')
-    pypi_info['upload_date'] = datetime(*[int(date_token) for date_token in release_date]).strftime('%d %B %Y')
+    pypi_info['upload_date'] = datetime(
+        *[int(date_token) for date_token in release_date]).strftime('%d %B %Y') if all(release_date) else ''
     pypi_info['size'] = convert_size(release.get('size', '') if release else '')
-    pypi_info['url'] = release.get('url', '')
+    pypi_info['url'] = get_package_url(release.get('url', '') if release else '')
+    pypi_info['filename'] = release.get('filename', '') if release else ''
+    pypi_info['package_type'] = release.get('packagetype', '') if release else ''
+    release_digests = release.get('digests', dict()) if release else dict()
+    pypi_info['digests'] = dict(
+        (digest_name, release_digests[digest_name]) for digest_name in DIGESTS if release_digests.get(digest_name))
 
     return pypi_info
 
 
+def get_plugins_pypi_info(plugin_ids, jobs=4, cancel_token=None):
+    """
+    Returns PyPI information of the given plugins. Information of the plugins is retrieved in parallel
+
+    :param list(str) plugin_ids: IDs of the plugins to retrieve information of
+    :param int jobs: maximum number of plugins to retrieve information of in parallel
+    :param CancellationToken cancel_token: optional cancellation token
+    :return: dictionary with plugin IDs as keys and PyPI information (see get_pypi_info) as values
+    :rtype: dict
+    :raises CancelledError: if the requests are cancelled
+    """
+
+    plugin_ids = list(plugin_ids)
+    plugins_pypi_info = run_in_parallel(
+        functools.partial(get_pypi_info, cancel_token=cancel_token), plugin_ids, jobs=jobs, cancel_token=cancel_token)
+
+    return dict((plugin_id, pypi_info or dict()) for plugin_id, pypi_info in zip(plugin_ids, plugins_pypi_info))
+
+
+def is_compatible_wheel(file_name):
+    """
+    Returns whether or not the given wheel file can be installed in current Python interpreter.
+    Only pure Python wheels are supported.
+
+    :param str file_name: wheel file name (for example, artella_plugins_about-1.0.3-py2.py3-none-any.whl)
+    :return: True if the wheel is compatible; False otherwise.
+    :rtype: bool
+    """
+
+    wheel_parts = os.path.splitext(os.path.basename(file_name))[0].split('-')
+    if len(wheel_parts) < 5:
+        return False
+    python_tags, abi_tag, platform_tag = wheel_parts[-3].split('.'), wheel_parts[-2], wheel_parts[-1]
+    if abi_tag != 'none' or platform_tag != 'any':
+        return False
+
+    valid_tags = ('py{}'.format(sys.version_info[0]), 'py{}{}'.format(sys.version_info[0], sys.version_info[1]))
+
+    return any(python_tag in valid_tags for python_tag in python_tags)
+
+
+def get_preferred_release(release_info):
+    """
+    Returns the release file that should be installed from the given PyPI release files.
+    Wheels are preferred over sdists (see PACKAGE_EXTENSIONS)
+
+    :param list(dict) release_info: list of PyPI release files data
+    :return: PyPI release file data. None if no valid release file is found.
+    :rtype: dict or None
+    """
+
+    for package_extension in PACKAGE_EXTENSIONS:
+        for release_data in release_info:
+            release_filename = release_data.get('filename', '')
+            if not release_filename.endswith(package_extension):
+                continue
+            if package_extension == '.whl' and not is_compatible_wheel(release_filename):
+                continue
+            return release_data
+
+    return None
+
+
 def convert_size(size_bytes):
     if size_bytes == 0 or size_bytes is None or size_bytes == '':
         return "0B"
@@ -98,40 +599,926 @@ def convert_size(size_bytes):
     return "%s %s" % (s, size_name[i])
 
 
-def download_and_extract_package_from_pypi(url, file_path, install_path, max_retries=10):
+def get_current_platform():
+    """
+    Returns the name of the current OS platform as used by Artella server
+
+    :return: windows, darwin or linux. None if current OS platform is not supported.
+    :rtype: str or None
+    """
+
+    if utils.is_windows():
+        return 'windows'
+    elif utils.is_mac():
+        return 'darwin'
+    elif utils.is_linux():
+        return 'linux'
+
+    return None
+
+
+def is_version_newer(latest_version, current_version):
+    """
+    Returns whether or not given latest version is newer than the given current one
+
+    :param str latest_version: version string (for example, 1.2.3)
+    :param str current_version: version string (for example, 1.2.0)
+    :return: True if latest version is greater than current version; False otherwise.
+    :rtype: bool
+    """
+
+    def _version_tokens(version):
+        tokens = list()
+        for version_token in str(version or '').split('.'):
+            digits = ''
+            for char in version_token:
+                if not char.isdigit():
+                    break
+                digits += char
+            tokens.append(int(digits) if digits else 0)
+        return tokens
+
+    latest_tokens = _version_tokens(latest_version)
+    current_tokens = _version_tokens(current_version)
+    max_length = max(len(latest_tokens), len(current_tokens))
+    latest_tokens.extend([0] * (max_length - len(latest_tokens)))
+    current_tokens.extend([0] * (max_length - len(current_tokens)))
+
+    return latest_tokens > current_tokens
+
+
+def get_plugin_module_path(plugin_id):
+    """
+    Returns the dotted module path of the Python package that implements the plugin with given ID
+
+    :param str plugin_id: ID of the plugin (for example, artella-plugins-updater)
+    :return: dotted module path (for example, artella.plugins.updater)
+    :rtype: str
+    """
+
+    return plugin_id.replace('-', '.')
+
+
+def get_plugin_install_path(plugin_id):
+    """
+    Returns the path where the Python package of the given plugin is installed. If the plugin is already loaded, the
+    location it was loaded from is returned; otherwise, the location the plugin would be imported from.
+
+    :param str plugin_id: ID of the plugin (for example, artella-plugins-updater)
+    :return: path of the folder that contains the plugin package. None if the plugin is not installed.
+    :rtype: str or None
+    """
+
+    with tracing.span('locate', plugin_id=plugin_id) as locate_span:
+        if plugin_id in _PLUGIN_INSTALL_PATHS:
+            locate_span.set(source='cache')
+            metrics.record_cache_access('install_paths', True)
+            return _PLUGIN_INSTALL_PATHS[plugin_id]
+
+        metrics.record_cache_access('install_paths', False)
+        module_path = get_plugin_module_path(plugin_id)
+        module_locations = get_loaded_module_locations(module_path)
+        if module_locations:
+            locate_span.set(source='loaded')
+        else:
+            locate_span.set(source='import')
+            module_locations = find_module_locations(module_path)
+        if not module_locations:
+            return None
+
+        install_path = os.path.dirname(module_locations[0])
+        _PLUGIN_INSTALL_PATHS[plugin_id] = install_path
+
+    return install_path
+
+
+def clear_plugin_install_paths_cache(plugin_id=None):
+    """
+    Clears the cache of plugin install paths resolved during current session
+
+    :param str plugin_id: ID of the plugin to clear cache of. If not given, all cached paths will be cleared
+    """
+
+    if plugin_id:
+        _PLUGIN_INSTALL_PATHS.pop(plugin_id, None)
+    else:
+        _PLUGIN_INSTALL_PATHS.clear()
+
+
+def get_loaded_module_locations(module_path):
+    """
+    Returns the folders the given Python package was loaded from
+
+    :param str module_path: dotted module path (for example, artella.plugins.updater)
+    :return: list of package folders. Empty list if the package is not loaded.
+    :rtype: list(str)
+    """
+
+    module = sys.modules.get(module_path, None)
+    if module is None:
+        return list()
+
+    module_paths = getattr(module, '__path__', None)
+    if module_paths:
+        return list(module_paths)
+    module_file = getattr(module, '__file__', None)
+
+    return [os.path.dirname(module_file)] if module_file else list()
+
+
+def find_module_locations(module_path):
+    """
+    Returns the folders where the given Python package is located without importing (and executing) it.
+    Only parent packages are imported, as required by Python import system to search sub modules.
+
+    :param str module_path: dotted module path (for example, artella.plugins.updater)
+    :return: list of package folders (namespace packages can have more than one). Empty list if not found.
+    :rtype: list(str)
+    """
+
+    try:
+        from importlib.util import find_spec
+    except ImportError:
+        find_spec = None
+
+    try:
+        if find_spec:
+            module_spec = find_spec(module_path)
+            if not module_spec:
+                return list()
+            if module_spec.submodule_search_locations:
+                return list(module_spec.submodule_search_locations)
+            return [os.path.dirname(module_spec.origin)] if module_spec.origin else list()
+        else:
+            module_loader = pkgutil.find_loader(module_path)
+            module_file_name = getattr(module_loader, 'filename', None)
+            return [module_file_name] if module_file_name else list()
+    except Exception as exc:
+        logger.debug('Impossible to find module "{}" locations: {}'.format(module_path, exc))
+
+    return list()
+
+
+def get_installed_plugin_version(plugin_id, import_version=True):
+    """
+    Returns the version of the installed plugin with given ID.
+    Version stored in the manifest is only used if it belongs to the location the plugin is loaded from.
+
+    :param str plugin_id: ID of the plugin (for example, artella-plugins-updater)
+    :param bool import_version: whether or not the version module of the plugin is imported if the version is not
+        found in the manifest
+    :return: installed version of the plugin. None if the plugin is not installed.
+    :rtype: str or None
+    """
+
+    manifest_version = manifest.get_installed_plugin_version(plugin_id, get_plugin_install_path(plugin_id))
+    if manifest_version or not import_version:
+        return manifest_version
+
+    version_module_path = '{}.__version__'.format(get_plugin_module_path(plugin_id))
+    try:
+        version_mod = importlib.import_module(version_module_path)
+        return version_mod.get_version()
+    except Exception as exc:
+        logger.debug('Impossible to retrieve installed version of plugin "{}": {}'.format(plugin_id, exc))
+
+    return None
+
+
+def make_dirs(folder_path):
+    """
+    Creates given folder and all its missing parent folders. It is safe to call it concurrently from multiple threads
+
+    :param str folder_path: path of the folder to create
+    """
+
+    if not folder_path or os.path.isdir(folder_path):
+        return
+    try:
+        os.makedirs(folder_path)
+    except OSError:
+        if not os.path.isdir(folder_path):
+            raise
+
+
+def run_in_parallel(fn, items, jobs=1, cancel_token=None):
+    """
+    Calls the given function for each one of the given items using a pool of threads
+
+    :param callable fn: function to call. It receives an item as its only argument
+    :param list items: list of items to process
+    :param int jobs: maximum number of threads to use
+    :param CancellationToken cancel_token: optional token. Once cancelled, pending items are not processed
+    :return: list with the result of each call, in the same order as the given items. Calls are done with the request
+        priority of the calling thread (see artella.plugins.updater.scheduler)
+    :rtype: list
+    :raises CancelledError: if the token is cancelled
+    """
+
+    items = list(items)
+    results = [None] * len(items)
+    jobs = max(1, min(int(jobs or 1), len(items)))
+    if jobs <= 1:
+        for i, item in enumerate(items):
+            cancellation.raise_if_cancelled(cancel_token)
+            results[i] = fn(item)
+        return results
+
+    lock = threading.Lock()
+    pending = list(reversed(list(enumerate(items))))
+    request_priority = scheduler.get_priority()
+
+    def _worker():
+        with scheduler.priority(request_priority):
+            while True:
+                with lock:
+                    if not pending or (cancel_token is not None and cancel_token.is_cancelled()):
+                        return
+                    index, item = pending.pop()
+                try:
+                    results[index] = fn(item)
+                except cancellation.CancelledError:
+                    return
+                except Exception as exc:
+                    logger.error('Error while processing "{}": {}'.format(item, exc))
+
+    threads = [threading.Thread(target=_worker) for _ in range(jobs)]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+    for thread in threads:
+        thread.join()
+    cancellation.raise_if_cancelled(cancel_token)
+
+    return results
+
+
+def download_package_from_pypi(url, file_path, max_retries=10, digests=None, cancel_token=None):
+    """
+    Downloads the package file located in the given PyPI URL.
+    If digests are given, file contents are hashed while they are streamed to disk and the file is rejected (and
+    removed) if any digest does not match.
+
+    :param str url: PyPI URL of the package file to download
+    :param str file_path: path where package file will be stored
+    :param int max_retries: maximum number of download attempts
+    :param dict digests: optional PyPI release digests ({'sha256': ..., 'blake2b_256': ...})
+    :param CancellationToken cancel_token: optional token checked between downloaded chunks
+    :return: True if the package was downloaded (and verified) successfully; False otherwise. Background downloads
+        are paused between chunks while interactive requests wait for a free request slot
+    :rtype: bool
+    :raises CancelledError: if the download is cancelled. Partially downloaded file is removed
+    """
+
+    hashers = dict()
+    verify_time = 0.0
+    is_tracing = tracing.is_enabled()
     current_retry = 0
     while True:
         current_retry += 1
         if current_retry > max_retries:
             break
         try:
-            file_data = urlopen(url)
-            data_to_write = file_data.read()
-            if not data_to_write:
+            with scheduler.request(cancel_token=cancel_token) as request_slot, tracing.span(
+                    'download', url=url) as download_span:
+                file_data = open_url(url, cancel_token=cancel_token)
+                hashers = get_digest_hashers(digests)
+                data_size = 0
+                with open(file_path, 'wb') as fh:
+                    while True:
+                        cancellation.raise_if_cancelled(cancel_token)
+                        request_slot.checkpoint()
+                        chunk = file_data.read(DOWNLOAD_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        data_size += len(chunk)
+                        verify_start = timeit.default_timer() if is_tracing else 0.0
+                        for hasher in hashers.values():
+                            hasher.update(chunk)
+                        if is_tracing:
+                            verify_time += timeit.default_timer() - verify_start
+                        fh.write(chunk)
+                download_span.set(bytes=data_size)
+            if not data_size:
                 logger.warning('No data found in PyPI package: {}'.format(url))
-                break
-            with open(file_path, 'wb') as fh:
-                fh.write(data_to_write)
-                break
+                remove_file(file_path)
+            break
+        except cancellation.CancelledError:
+            logger.info('Download of PyPI package cancelled: {}'.format(url))
+            remove_file(file_path)
+            raise
         except Exception as exc:
             logger.warning('Error while downloading PyPI package: {} | {}'.format(url, exc))
+            remove_file(file_path)
             return False
 
     if not os.path.isfile(file_path):
         return False
-    valid_extract = True
-    tar = tarfile.open(file_path, "r:gz")
+
+    return verify_digests(url, file_path, hashers, digests, hash_time=verify_time)
+
+
+def verify_digests(url, file_path, hashers, digests, hash_time=0.0):
+    """
+    Checks that the given hashers, fed with the contents of a downloaded file, match the expected digests.
+    File is removed if any digest does not match.
+
+    :param str url: URL the file was downloaded from
+    :param str file_path: path of the downloaded file
+    :param dict hashers: dictionary with digest names as keys and hashlib objects as values (see get_digest_hashers)
+    :param dict digests: expected PyPI release digests ({'sha256': ..., 'blake2b_256': ...})
+    :param float hash_time: seconds spent hashing file contents while they were downloaded
+    :return: True if all digests match; False otherwise.
+    :rtype: bool
+    """
+
+    with tracing.span('verify', url=url, digests=sorted(hashers.keys())) as verify_span:
+        for digest_name, hasher in hashers.items():
+            if hasher.hexdigest() != digests[digest_name].lower():
+                logger.error('Downloaded PyPI package {} digest does not match expected one: {} | {} != {}'.format(
+                    digest_name, url, hasher.hexdigest(), digests[digest_name]))
+                remove_file(file_path)
+                verify_span.set(valid=False)
+                return False
+        # Digests are computed while the file is downloaded, so that time is included in the verification time
+        verify_span.finish(verify_span.duration + hash_time)
+
+    return True
+
+
+def get_digest_hashers(digests):
+    """
+    Returns hashlib objects for the given PyPI digests that can be computed in current Python interpreter
+
+    :param dict digests: PyPI release digests ({'sha256': ..., 'blake2b_256': ...})
+    :return: dictionary with digest names as keys and hashlib objects as values
+    :rtype: dict
+    """
+
+    hashers = dict()
+    for digest_name, digest_value in (digests or dict()).items():
+        if not digest_value:
+            continue
+        if digest_name == 'sha256':
+            hashers[digest_name] = hashlib.sha256()
+        elif digest_name == 'blake2b_256' and hasattr(hashlib, 'blake2b'):
+            hashers[digest_name] = hashlib.blake2b(digest_size=32)
+
+    return hashers
+
+
+def remove_file(file_path):
+    """
+    Removes given file, ignoring errors if the file does not exist
+
+    :param str file_path: path of the file to remove
+    """
+
     try:
-        tar.extractall(install_path)
+        os.remove(file_path)
+    except OSError:
+        pass
+
+
+def get_package_members_map(member_names, package_path):
+    """
+    Returns a dictionary that maps the package member names that belong to the given Python package subtree to
+    the path, relative to install path, where they should be extracted.
+    Package can be located at package file root or inside <name>-<version>.data/purelib (wheels) and inside sdist root
+    folder or its src folder (sdists). Distribution metadata (wheel METADATA and sdist PKG-INFO) is also mapped, to a
+    <name>-<version>.dist-info or <name>-<version>.egg-info folder, so the installed version can be read with
+    importlib.metadata or pkg_resources. Other members (setup.py, tests, docs, ...) are not included.
+
+    :param list(str) member_names: names of the package file members
+    :param str package_path: dotted module path of the Python package to extract (for example, artella.plugins.about)
+    :return: dictionary with package member names as keys and relative extraction paths as values
+    :rtype: dict
+    """
+
+    package_parts = package_path.replace('/', '.').split('.')
+    package_name = package_parts[-1]
+    num_parts = len(package_parts)
+
+    members_map = dict()
+    for member_name in member_names:
+        member_parts = [part for part in member_name.replace('\\', '/').split('/') if part and part != '.']
+        if not member_parts or '..' in member_parts or os.path.isabs(member_name):
+            continue
+        for offset in _get_package_offsets(member_parts):
+            if member_parts[offset:offset + num_parts] == package_parts:
+                members_map[member_name] = '/'.join([package_name] + member_parts[offset + num_parts:])
+                break
+        else:
+            metadata_name = _get_metadata_member_target(member_parts)
+            if metadata_name:
+                members_map[member_name] = metadata_name
+
+    return members_map
+
+
+def _get_package_offsets(member_parts):
+    """
+    Returns the number of leading folders that can precede the Python package in the given package member path
+    """
+
+    offsets = [0]
+    if len(member_parts) < 2:
+        return offsets
+    if member_parts[0].endswith('.data'):
+        if member_parts[1] in _WHEEL_DATA_FOLDERS:
+            offsets.append(2)
+        return offsets
+    offsets.append(1)
+    if member_parts[1] == 'src':
+        offsets.append(2)
+
+    return offsets
+
+
+def _get_metadata_member_target(member_parts):
+    """
+    Returns the path, relative to install path, where the given distribution metadata member should be extracted
+    """
+
+    if len(member_parts) != 2:
+        return None
+
+    folder_name, file_name = member_parts
+    if folder_name.endswith('.dist-info') and file_name == 'METADATA':
+        return '/'.join(member_parts)
+    if file_name == 'PKG-INFO':
+        sdist_root_match = _SDIST_ROOT_REGEX.match(folder_name)
+        if sdist_root_match:
+            return '{}-{}.egg-info/PKG-INFO'.format(
+                get_distribution_key(sdist_root_match.group('name')), sdist_root_match.group('version'))
+
+    return None
+
+
+def get_distribution_key(distribution_name):
+    """
+    Returns the normalized name used in the metadata folders of the given distribution
+
+    :param str distribution_name: name of the distribution (for example, artella-plugins-about)
+    :return: normalized distribution name (for example, artella_plugins_about)
+    :rtype: str
+    """
+
+    return re.sub(r'[-_.]+', '_', distribution_name).lower()
+
+
+def remove_stale_metadata(install_path, extracted_paths):
+    """
+    Removes, from the given install path, the metadata folders of other versions of the distributions whose metadata
+    was just extracted, so only the metadata of the installed version is found
+
+    :param str install_path: path where package contents were extracted
+    :param list(str) extracted_paths: paths of the extracted files and folders
+    """
+
+    extracted_folders = set()
+    for extracted_path in extracted_paths:
+        relative_parts = os.path.relpath(extracted_path, install_path).replace('\\', '/').split('/')
+        if relative_parts[0].endswith(METADATA_FOLDER_EXTENSIONS):
+            extracted_folders.add(relative_parts[0])
+    if not extracted_folders:
+        return
+
+    def _get_folder_distribution_key(folder_name):
+        return get_distribution_key(os.path.splitext(folder_name)[0].rsplit('-', 1)[0])
+
+    distribution_keys = set(_get_folder_distribution_key(folder_name) for folder_name in extracted_folders)
+    for folder_name in os.listdir(install_path):
+        if folder_name in extracted_folders or not folder_name.endswith(METADATA_FOLDER_EXTENSIONS):
+            continue
+        if _get_folder_distribution_key(folder_name) not in distribution_keys:
+            continue
+        folder_path = os.path.join(install_path, folder_name)
+        try:
+            if os.path.isdir(folder_path):
+                shutil.rmtree(folder_path)
+            else:
+                os.remove(folder_path)
+        except OSError as exc:
+            logger.warning('Impossible to remove stale package metadata: {} | {}'.format(folder_path, exc))
+
+
+def extract_package(
+        file_path, install_path, package_path=None, jobs=EXTRACT_JOBS, file_hashes=None, cancel_token=None):
+    """
+    Extracts the given package file (wheel or sdist) into the given install path
+
+    :param str file_path: path of the package file to extract
+    :param str install_path: path where package contents will be extracted
+    :param str package_path: optional dotted module path of the Python package to extract. If given, only the
+        package subtree and distribution metadata are extracted and they are placed directly inside install path
+        (install_path/<package_name>). Metadata of other versions of the distribution is removed.
+    :param int jobs: number of threads used to extract package files
+    :param dict file_hashes: optional dictionary that will be filled with the sha256 of each extracted file (keys are
+        extracted file paths). Hashes are computed from the data being written, so files are not read again.
+    :param CancellationToken cancel_token: optional token checked between package members
+    :return: list with the paths of all the extracted files and folders. Empty list if extraction failed.
+    :rtype: list(str)
+    :raises CancelledError: if the extraction is cancelled. Already extracted members are kept, but partially written
+        files are removed
+    """
+
+    with tracing.span('extract', file_path=file_path, package_path=package_path) as extract_span:
+        extracted_paths = _extract_package(
+            file_path, install_path, package_path=package_path, jobs=jobs, file_hashes=file_hashes,
+            cancel_token=cancel_token)
+        if package_path and extracted_paths:
+            remove_stale_metadata(install_path, extracted_paths)
+        extract_span.set(files=len(extracted_paths))
+
+    return extracted_paths
+
+
+def _extract_package(
+        file_path, install_path, package_path=None, jobs=EXTRACT_JOBS, file_hashes=None, cancel_token=None):
+    extracted_paths = list()
+    if not os.path.isfile(file_path):
+        return extracted_paths
+
+    if zipfile.is_zipfile(file_path):
+
+        try:
+            extracted_paths = _extract_zip(
+                file_path, install_path, package_path=package_path, jobs=jobs, file_hashes=file_hashes,
+                cancel_token=cancel_token)
+        except cancellation.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning('Error while extracting PyPI package: {} | {}'.format(file_path, exc))
+            extracted_paths = list()
+        return extracted_paths
+
+    try:
+        extracted_paths = _extract_tar(
+            file_path, install_path, package_path=package_path, jobs=jobs, file_hashes=file_hashes,
+            cancel_token=cancel_token)
+    except cancellation.CancelledError:
+        raise
     except Exception as exc:
-        logger.warning('Error while extracting PyPI package: {} | {}'.format(url, exc))
-        valid_extract = False
+        logger.warning('Error while extracting PyPI package: {} | {}'.format(file_path, exc))
+        extracted_paths = list()
+
+    return extracted_paths
+
+
+def _extract_tar(file_path, install_path, package_path=None, jobs=EXTRACT_JOBS, file_hashes=None, cancel_token=None):
+    """
+    Extracts tar (sdist) file members using a pipeline: the calling thread acts as producer, decompressing the tar
+    stream and reading member payloads, while a pool of consumer threads writes those payloads to disk. Both stages
+    are joined by a queue bounded both by number of members and by bytes, so decompression and disk writes overlap
+    while the memory used by queued members stays below PIPELINE_QUEUE_MAX_SIZE.
+    """
+
+    write_queue = Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    queue_budget = _ByteBudget(PIPELINE_QUEUE_MAX_SIZE)
+    errors = list()
+
+    def _write_members():
+        while True:
+            item = write_queue.get()
+            if item is None:
+                return
+            target_path, data, mode, queued_size = item
+            try:
+                if errors:
+                    continue
+                with open(target_path, 'wb') as fh:
+                    fh.write(data)
+                if file_hashes is not None:
+                    file_hashes[target_path] = hashlib.sha256(data).hexdigest()
+                _set_file_mode(target_path, mode)
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                queue_budget.release(queued_size)
+
+    consumers = [threading.Thread(target=_write_members) for _ in range(max(1, jobs or 1))]
+    for consumer in consumers:
+        consumer.daemon = True
+        consumer.start()
+
+    extracted_paths = list()
+    try:
+        with tarfile.open(file_path, 'r|*') as tar:
+            for member in tar:
+                if errors:
+                    break
+                cancellation.raise_if_cancelled(cancel_token)
+                if package_path:
+                    target_name = get_package_members_map([member.name], package_path).get(member.name, None)
+                else:
+                    member_parts = member.name.replace('\\', '/').split('/')
+                    target_name = None if '..' in member_parts or os.path.isabs(member.name) else member.name
+                if not target_name:
+                    continue
+                target_path = os.path.join(install_path, *target_name.split('/'))
+                if member.isdir():
+                    make_dirs(target_path)
+                elif member.isfile():
+                    make_dirs(os.path.dirname(target_path))
+                    source = tar.extractfile(member)
+                    if member.size > PIPELINE_MAX_MEMBER_SIZE:
+                        _write_file_object(source, target_path, file_hashes=file_hashes, cancel_token=cancel_token)
+                        _set_file_mode(target_path, member.mode)
+                    else:
+                        queue_budget.acquire(member.size, cancel_token=cancel_token)
+                        try:
+                            data = source.read()
+                        except BaseException:
+                            queue_budget.release(member.size)
+                            raise
+                        write_queue.put((target_path, data, member.mode, member.size))
+                else:
+                    logger.debug('Skipping extraction of non regular package member: {}'.format(member.name))
+                    continue
+                extracted_paths.append(target_path)
     finally:
-        tar.close()
-    if not valid_extract:
-        return False
+        for _ in consumers:
+            write_queue.put(None)
+        for consumer in consumers:
+            consumer.join()
 
-    return True
+    if errors:
+        raise errors[0]
+
+    return extracted_paths
+
+
+class _ByteBudget(object):
+    """
+    Counter of bytes shared between threads. Acquiring bytes blocks while the acquired bytes would exceed the budget
+    """
+
+    def __init__(self, max_size):
+        super(_ByteBudget, self).__init__()
+
+        self._max_size = max_size
+        self._size = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, size, cancel_token=None):
+        """
+        Waits until the given number of bytes fits into the budget. Sizes bigger than the whole budget are acquired
+        once no other bytes are acquired
+
+        :param int size: number of bytes to acquire
+        :param CancellationToken cancel_token: optional token checked while waiting
+        :raises CancelledError: if the wait is cancelled
+        """
+
+        with self._condition:
+            while self._size and self._size + size > self._max_size:
+                cancellation.raise_if_cancelled(cancel_token)
+                self._condition.wait(PIPELINE_WAIT_INTERVAL)
+            self._size += size
+
+    def release(self, size):
+        """
+        Releases the given number of acquired bytes
+
+        :param int size: number of bytes to release
+        """
+
+        with self._condition:
+            self._size -= size
+            self._condition.notify_all()
+
+
+def _write_file_object(source, target_path, file_hashes=None, chunk_size=1024 * 1024, cancel_token=None):
+    file_hash = hashlib.sha256() if file_hashes is not None else None
+    try:
+        with open(target_path, 'wb') as fh:
+            while True:
+                cancellation.raise_if_cancelled(cancel_token)
+                chunk = source.read(chunk_size)
+                if not chunk:
+                    break
+                if file_hash:
+                    file_hash.update(chunk)
+                fh.write(chunk)
+    except cancellation.CancelledError:
+        remove_file(target_path)
+        raise
+    if file_hash:
+        file_hashes[target_path] = file_hash.hexdigest()
+
+
+def _set_file_mode(file_path, mode):
+    if not mode:
+        return
+    try:
+        os.chmod(file_path, mode & 0o777)
+    except OSError:
+        pass
+
+
+def _extract_zip(file_path, install_path, package_path=None, jobs=EXTRACT_JOBS, file_hashes=None, cancel_token=None):
+    """
+    Extracts zip (wheel) file members using a pool of threads. Zip central directory allows each thread to read its
+    members independently, so decompression and writes of different members are done in parallel
+    """
+
+    with zipfile.ZipFile(file_path) as zip_file:
+        member_infos = zip_file.infolist()
+    member_names = [member_info.filename for member_info in member_infos]
+    if package_path:
+        members_map = get_package_members_map(member_names, package_path)
+    else:
+        members_map = dict((member_name, member_name) for member_name in member_names if '..' not in member_name.split(
+            '/') and not os.path.isabs(member_name))
+
+    extracted_paths = list()
+    file_infos = list()
+    folder_paths = set()
+    for member_info in member_infos:
+        target_name = members_map.get(member_info.filename, None)
+        if not target_name:
+            continue
+        target_path = os.path.join(install_path, *target_name.split('/'))
+        extracted_paths.append(target_path)
+        if member_info.filename.endswith('/'):
+            folder_paths.add(target_path)
+        else:
+            folder_paths.add(os.path.dirname(target_path))
+            file_infos.append((member_info, target_path))
+
+    for folder_path in sorted(folder_paths):
+        make_dirs(folder_path)
+
+    jobs = max(1, min(jobs or 1, len(file_infos)))
+    errors = list()
+
+    def _extract_members(infos_to_extract):
+        try:
+            with zipfile.ZipFile(file_path) as thread_zip_file:
+                for member_info, target_path in infos_to_extract:
+                    cancellation.raise_if_cancelled(cancel_token)
+                    source = thread_zip_file.open(member_info)
+                    try:
+                        _write_file_object(source, target_path, file_hashes=file_hashes, cancel_token=cancel_token)
+                    finally:
+                        source.close()
+        except Exception as exc:
+            errors.append(exc)
+
+    run_in_parallel(_extract_members, [file_infos[i::jobs] for i in range(jobs)], jobs=jobs)
+    if errors:
+        raise errors[0]
+
+    return extracted_paths
+
+
+def download_and_extract_package_from_pypi(
+        url, file_path, install_path, max_retries=10, package_path=None, digests=None, file_hashes=None,
+        cancel_token=None):
+    """
+    Downloads the package file located in the given PyPI URL and extracts it into the given install path
+
+    :param str url: PyPI URL of the package file to download
+    :param str file_path: path where package file will be stored
+    :param str install_path: path where package contents will be extracted
+    :param int max_retries: maximum number of download attempts
+    :param str package_path: optional dotted module path of the Python package to extract (see extract_package)
+    :param dict digests: optional PyPI release digests used to verify the download before extracting it
+    :param dict file_hashes: optional dictionary filled with the sha256 of each extracted file (see extract_package)
+    :param CancellationToken cancel_token: optional token checked while the package is downloaded and extracted
+    :return: list with the paths of all the extracted files and folders. Empty list if download or extraction failed.
+    :rtype: list(str)
+    :raises CancelledError: if the download or the extraction is cancelled
+    """
+
+    valid_download = download_package_from_pypi(
+        url, file_path, max_retries=max_retries, digests=digests, cancel_token=cancel_token)
+    if not valid_download:
+        return list()
+    cancellation.raise_if_cancelled(cancel_token)
+
+    return extract_package(
+        file_path, install_path, package_path=package_path, file_hashes=file_hashes, cancel_token=cancel_token)
+
+
+def get_plugin_package_file_path(plugin_id, version, url, install_path):
+    """
+    Returns the path where the package file of the given plugin release is downloaded before it is extracted
+
+    :param str plugin_id: ID of the plugin (for example, artella-plugins-updater)
+    :param str version: plugin release version
+    :param str url: PyPI URL of the release package file
+    :param str install_path: path where package contents will be extracted
+    :return: package file path. None if the URL does not point to a valid package file.
+    :rtype: str or None
+    """
+
+    for extension in PACKAGE_EXTENSIONS:
+        if url and url.endswith(extension):
+            return os.path.join(install_path, '{}_{}{}'.format(plugin_id, version, extension))
+
+    return None
+
+
+def find_extracted_folder(install_path, extracted_paths, folder_names):
+    """
+    Returns the shallowest extracted folder whose name matches any of the given ones.
+    Only the given extracted paths are checked, so install path contents are never walked.
+
+    :param str install_path: path where package contents were extracted
+    :param list(str) extracted_paths: paths returned by extract_package function
+    :param list(str) folder_names: names of the folder to find
+    :return: path of the found folder. None if no folder was found.
+    :rtype: str or None
+    """
+
+    found_folder = None
+    found_depth = None
+    for extracted_path in extracted_paths:
+        path_parts = os.path.relpath(extracted_path, install_path).replace('\\', '/').split('/')
+        for i, path_part in enumerate(path_parts):
+            if found_depth is not None and i >= found_depth:
+                break
+            if path_part not in folder_names:
+                continue
+            folder_path = os.path.join(install_path, *path_parts[:i + 1])
+            if i < len(path_parts) - 1 or os.path.isdir(folder_path):
+                found_folder = folder_path
+                found_depth = i
+            break
+
+    return found_folder
+
+
+def get_installer_plugin_ids_from_package(file_path):
+    """
+    Returns the IDs of the plugins included in the given Artella DCC installer package file
+
+    :param str file_path: path of the artella-installer-<dcc> package file
+    :return: list of plugin IDs
+    :rtype: list(str)
+    """
+
+    plugin_ids = list()
+    if not file_path or not os.path.isfile(file_path):
+        return plugin_ids
+
+    config_data = None
+    try:
+        if zipfile.is_zipfile(file_path):
+            with zipfile.ZipFile(file_path) as zip_file:
+                for member_name in zip_file.namelist():
+                    if os.path.basename(member_name) == 'artella-installer.json':
+                        config_data = json.loads(zip_file.read(member_name).decode('utf-8'))
+                        break
+        else:
+            with tarfile.open(file_path, 'r:gz') as tar:
+                for member in tar:
+                    if member.isfile() and os.path.basename(member.name) == 'artella-installer.json':
+                        config_data = json.loads(tar.extractfile(member).read().decode('utf-8'))
+                        break
+    except Exception as exc:
+        logger.warning('Error while reading Artella installer package: {} | {}'.format(file_path, exc))
+        return plugin_ids
+    if not config_data:
+        return plugin_ids
+
+    for config_plugin in config_data.get('plugins', list()):
+        plugin_id = config_plugin.get('id', '')
+        if not plugin_id:
+            plugin_repo = config_plugin.get('repo', '')
+            if plugin_repo:
+                plugin_id = plugin_repo.split('/')[-1]
+        if plugin_id and plugin_id not in plugin_ids:
+            plugin_ids.append(plugin_id)
+
+    return plugin_ids
+
+
+def get_dcc_installer_plugin_ids(dcc_name=None):
+    """
+    Returns the IDs of the plugins that are installed by the Artella installer of the given DCC
+
+    :param str dcc_name: name of the DCC. If not given current DCC will be used
+    :return: list of plugin IDs
+    :rtype: list(str)
+    """
+
+    dcc_name = dcc_name or dcc.name()
+    dcc_pypi_info = get_pypi_info('artella-installer-{}'.format(dcc_name))
+    dcc_url = dcc_pypi_info.get('url', '') if dcc_pypi_info else ''
+    if not dcc_url:
+        return list()
+
+    temp_path = tempfile.mkdtemp(prefix='artella-updater-')
+    try:
+        file_path = os.path.join(temp_path, dcc_url.split('/')[-1])
+        if not download_package_from_pypi(dcc_url, file_path):
+            return list()
+        return get_installer_plugin_ids_from_package(file_path)
+    finally:
+        shutil.rmtree(temp_path, ignore_errors=True)
 
 
 def get_latest_stable_artella_dcc_plugin_info(dcc_name=None, platform=None, show_dialogs=False):
@@ -150,14 +1537,7 @@ def get_latest_stable_artella_dcc_plugin_info(dcc_name=None, platform=None, show
 
     dcc_name = dcc_name or dcc.name()
 
-    current_platform = platform or None
-    if not current_platform:
-        if utils.is_windows():
-            current_platform = 'windows'
-        elif utils.is_mac():
-            current_platform = 'darwin'
-        elif utils.is_linux():
-            current_platform = 'linux'
+    current_platform = platform or get_current_platform()
     if not current_platform:
         msg = 'Impossible to retrieve Dcc plugin info from Artella server because ' \
               'current OS platform is not supported: "{}"'.format(sys.platform)
@@ -166,31 +1546,39 @@ def get_latest_stable_artella_dcc_plugin_info(dcc_name=None, platform=None, show
             qtutils.show_warning_message_box(message_title, msg)
         return dcc_plugin_info
 
-    artella_url = 'https://updates.artellaapp.com/plugins/{}/versions/stable-{}.json'.format(dcc_name, current_platform)
-    req = Request(artella_url)
+    artella_url = get_artella_dcc_plugin_url(dcc_name, current_platform)
 
     rsp = None
-    try:
-        rsp = urlopen(req)
-    except Exception:
+    artella_rsp = None
+    error_message = None
+    with scheduler.request():
         try:
-            ssl._create_default_https_context = ssl._create_unverified_context
-            # To avoid [SSL: CERTIFICATE_VERIFY_FAILED] errors.
-            context = ssl._create_unverified_context()
-            rsp = urlopen(req, context=context)
-        except URLError as exc:
-            if hasattr(exc, 'reason'):
-                msg = 'Failed to retrieve Artella DCC plugin info ¨{}({})" from  Artella server ({}): "{}"'.format(
-                    dcc_name, current_platform, artella_url, exc.reason)
-            elif hasattr(exc, 'code'):
-                msg = 'Failed to retrieve Artella DCC plugin info ¨{}({})" from  Artella server ({}): "{}"'.format(
-                    dcc_name, current_platform, artella_url, exc.code)
-            else:
-                msg = exc
-            logger.debug(exc)
-            logger.error(msg)
-            if show_dialogs:
-                qtutils.show_error_message_box(message_title, msg)
+            rsp = open_url(artella_url, compressed=True)
+        except Exception:
+            metrics.increment('retries_total', operation='dcc_plugin_info')
+            try:
+                ssl._create_default_https_context = ssl._create_unverified_context
+                # To avoid [SSL: CERTIFICATE_VERIFY_FAILED] errors.
+                context = ssl._create_unverified_context()
+                rsp = open_url(artella_url, context=context, compressed=True)
+            except URLError as exc:
+                if hasattr(exc, 'reason'):
+                    msg = 'Failed to retrieve Artella DCC plugin info ¨{}({})" from  Artella server ({}): "{}"'.format(
+                        dcc_name, current_platform, artella_url, exc.reason)
+                elif hasattr(exc, 'code'):
+                    msg = 'Failed to retrieve Artella DCC plugin info ¨{}({})" from  Artella server ({}): "{}"'.format(
+                        dcc_name, current_platform, artella_url, exc.code)
+                else:
+                    msg = exc
+                logger.debug(exc)
+                logger.error(msg)
+                error_message = msg
+        if rsp:
+            artella_rsp = rsp.read()
+
+    # Dialogs are shown once the request slot is released, so other requests do not wait for the user
+    if error_message and show_dialogs:
+        qtutils.show_error_message_box(message_title, error_message)
 
     warning_message = 'Was not possible to retrieve DCC Artella plugin info ¨{}({})" from  Artella server'.format(
         dcc_name, current_platform)
@@ -200,14 +1588,13 @@ def get_latest_stable_artella_dcc_plugin_info(dcc_name=None, platform=None, show
             qtutils.show_warning_message_box(message_title, warning_message)
         return dcc_plugin_info
 
-    artella_rsp = rsp.read()
     if not artella_rsp:
         if show_dialogs:
             qtutils.show_warning_message_box(message_title, warning_message)
         return dcc_plugin_info
 
     try:
-        dcc_plugin_data = json.loads(artella_rsp)
+        dcc_plugin_data = jsondecoder.loads(artella_rsp)
     except Exception as exc:
         msg = 'Error while reading data from Artella DCC plugin info ¨{}({})": {}'.format(
             dcc_name, current_platform, exc)
@@ -225,6 +1612,10 @@ def get_latest_stable_artella_dcc_plugin_info(dcc_name=None, platform=None, show
     dcc_plugin_info['version'] = dcc_plugin_data.get('version', '0.0.0')
     dcc_plugin_info['file_name'] = dcc_plugin_data.get('file_name', '')
     dcc_plugin_info['url'] = dcc_plugin_data.get('url', '')
+    # Staged rollouts (see artella.plugins.updater.rollout) are scheduled from the start time provided by the server,
+    # if any, or from the moment current seat first sees the release
+    dcc_plugin_info['rollout_start'] = dcc_plugin_data.get('rollout_start', None) or dcc_plugin_data.get(
+        'upload_time', None)
 
     return dcc_plugin_info
 
@@ -243,7 +1634,11 @@ if qtutils.QT_AVAILABLE:
             self._latest_version = None
             self._url = None
             self._install_path = None
+            self._digests = None
+            self._package_file_path = None
             self._max_retries = 10
+            self._compile = True
+            self._cancel_token = cancellation.CancellationToken()
 
         def set_id(self, id):
             self._id = id
@@ -260,50 +1655,128 @@ if qtutils.QT_AVAILABLE:
         def set_install_path(self, install_path):
             self._install_path = install_path
 
+        def set_digests(self, digests):
+            self._digests = digests
+
+        def set_package_file_path(self, file_path):
+            """
+            Sets the path of the already downloaded package file to install. If not set, the package file is
+            downloaded by the worker
+
+            :param str or None file_path: downloaded package file path
+            """
+
+            self._package_file_path = file_path
+
         def set_max_retries(self, value):
             self._max_retries = value
 
+        def set_compile(self, flag):
+            self._compile = flag
+
+        def cancel(self):
+            """
+            Cancels current and future updates. Can be called from any thread
+            """
+
+            self._cancel_token.cancel()
+
         def run(self):
             self.updateStart.emit()
 
-            if not self._url or not self._url.endswith('.tar.gz'):
-                error_msg = 'Plugin Package URL does not contains a .tar.gaz file ({} | {} | {}'.format(
-                    self._id, self._latest_version, self._url)
-                self.updateFinish.emit(error_msg)
-                return
+            # Updates are started by the user, so they go before background requests
+            with scheduler.priority(scheduler.INTERACTIVE), tracing.attributes(plugin_id=self._id), tracing.span(
+                    'update', version=self._latest_version) as update_span:
+                try:
+                    error_msg = self._run()
+                    update_span.set(status='error' if error_msg else 'ok')
+                except cancellation.CancelledError:
+                    error_msg = 'Plugin update cancelled ({} | {})'.format(self._id, self._latest_version)
+                    update_span.set(status='cancelled')
 
+            self.updateFinish.emit(error_msg)
+
+        def _run(self):
             # TODO: We should download to a temporal folder and once everything is extracted we should move the info to
             # TODO: its proper place
 
-            base_file_name = '{}_{}'.format(self._id, self._latest_version)
-            file_name = '{}.tar.gz'.format(base_file_name)
-            file_path = os.path.join(self._install_path, file_name)
+            file_path = get_plugin_package_file_path(self._id, self._latest_version, self._url, self._install_path)
+            if not file_path:
+                error_msg = 'Plugin Package URL does not contains a valid package file ({} | {} | {})'.format(
+                    self._id, self._latest_version, self._url)
+                return error_msg
 
+            module_path = get_plugin_module_path(self._id)
+            file_hashes = dict()
             try:
-                valid = download_and_extract_package_from_pypi(
-                    self._url, file_path, self._install_path, max_retries=self._max_retries)
-                if not valid:
+                if self._package_file_path and os.path.isfile(self._package_file_path):
+                    # Package file was already downloaded (and verified) by the asyncio client
+                    extracted_paths = extract_package(
+                        self._package_file_path, self._install_path, package_path=module_path,
+                        file_hashes=file_hashes, cancel_token=self._cancel_token)
+                else:
+                    extracted_paths = download_and_extract_package_from_pypi(
+                        self._url, file_path, self._install_path, max_retries=self._max_retries,
+                        package_path=module_path, digests=self._digests, file_hashes=file_hashes,
+                        cancel_token=self._cancel_token)
+                if not extracted_paths:
                     error_msg = 'Impossible to download and extract plugin from PyPI server ({} | {} | {})'.format(
                         self._id, self._latest_version, self._url)
-                    self.updateFinish.emit(error_msg)
-                    return
+                    return error_msg
+            except cancellation.CancelledError:
+                raise
             except Exception as exc:
                 error_msg = 'Error while downloading new plugin version from PyPI server ({} | {} | {} | {})'.format(
                         self._id, self._latest_version, self._url, exc)
-                self.updateFinish.emit(error_msg)
-                return False
+                return error_msg
 
-            plugin_folder = None
-            for root, dirs, files in os.walk(self._install_path):
-                for plugin_dir in dirs:
-                    if plugin_dir == self._package or plugin_dir == self._package.lower():
-                        plugin_folder = os.path.join(root, plugin_dir)
-                        break
+            plugin_folder = find_extracted_folder(self._install_path, extracted_paths, [module_path.split('.')[-1]])
 
             if not plugin_folder or not os.path.isdir(plugin_folder):
                 error_msg = 'No Plugin folder found ({}) in the extracted Plugin data ({} | {})'.format(
-                    self._package, self._id, self._latest_version)
-                self.updateFinish.emit(error_msg)
+                    module_path, self._id, self._latest_version)
+                return error_msg
+
+            if self._compile and not compiler.compile_package(plugin_folder):
+                logger.warning('Some files of plugin "{}" could not be compiled: {}'.format(self._id, plugin_folder))
+
+            manifest.register_installed_plugin(
+                self._id, self._latest_version, self._install_path, plugin_folder, file_hashes=file_hashes)
+            clear_plugin_install_paths_cache(self._id)
+
+            return ''
+
+    class PluginsInfoWorker(QtCore.QObject, object):
+
+        infoFetched = QtCore.Signal(str, object)
+        infoFailed = QtCore.Signal(str, str)
+
+        def __init__(self):
+            super(PluginsInfoWorker, self).__init__()
+
+            self._jobs = 4
+            self._cancel_token = cancellation.CancellationToken()
+
+        def set_jobs(self, value):
+            self._jobs = value
+
+        def cancel(self):
+            """
+            Cancels current and future fetches. Can be called from any thread
+            """
+
+            self._cancel_token.cancel()
+
+        def fetch(self, package, plugin_ids):
+            try:
+                with scheduler.priority(scheduler.INTERACTIVE):
+                    plugins_pypi_info = get_plugins_pypi_info(
+                        plugin_ids, jobs=self._jobs, cancel_token=self._cancel_token)
+            except cancellation.CancelledError:
+                return
+            except Exception as exc:
+                logger.error('Error while retrieving PyPI information of package "{}" plugins: {}'.format(package, exc))
+                self.infoFailed.emit(package, str(exc))
                 return
 
-            self.updateFinish.emit('')
+            self.infoFetched.emit(package, plugins_pypi_info)
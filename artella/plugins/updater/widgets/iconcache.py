@@ -0,0 +1,185 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains a shared cache of scaled plugin icons that are decoded asynchronously
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import logging
+
+from artella.core import qtutils, resource
+from artella.plugins.updater import metrics
+
+if qtutils.QT_AVAILABLE:
+    from artella.externals.Qt import QtCore, QtGui
+
+logger = logging.getLogger('artella')
+
+_ICON_CACHE = None
+
+
+def get_icon_cache():
+    """
+    Returns the icon cache shared by all Artella Updater widgets
+
+    :return: icon cache instance
+    :rtype: IconCache
+    """
+
+    global _ICON_CACHE
+    if _ICON_CACHE is None:
+        _ICON_CACHE = IconCache()
+
+    return _ICON_CACHE
+
+
+def get_device_pixel_ratio(widget=None):
+    """
+    Returns the device pixel ratio that should be used to render pixmaps in the given widget
+
+    :param QtWidgets.QWidget widget: widget pixmaps will be drawn in. If not given, application ratio will be used
+    :return: device pixel ratio
+    :rtype: float
+    """
+
+    target = widget or QtGui.QGuiApplication.instance()
+    if not target:
+        return 1.0
+    device_pixel_ratio = getattr(target, 'devicePixelRatioF', None) or getattr(target, 'devicePixelRatio', None)
+
+    return float(device_pixel_ratio()) if device_pixel_ratio else 1.0
+
+
+if qtutils.QT_AVAILABLE:
+    class IconLoaderSignals(QtCore.QObject, object):
+        loaded = QtCore.Signal(object, QtGui.QImage)
+
+    class IconLoaderTask(QtCore.QRunnable, object):
+        """
+        Decodes an icon file on a worker thread. QImageReader decodes the image directly at the requested size, so
+        there is no need to load the full size image and scale it later
+        """
+
+        def __init__(self, key):
+            super(IconLoaderTask, self).__init__()
+
+            self._key = key
+            self.signals = IconLoaderSignals()
+
+        def run(self):
+            path, width, height, device_pixel_ratio = self._key
+            reader = QtGui.QImageReader(path)
+            image_size = reader.size()
+            if image_size.isValid():
+                target_size = QtCore.QSize(int(width * device_pixel_ratio), int(height * device_pixel_ratio))
+                reader.setScaledSize(image_size.scaled(target_size, QtCore.Qt.KeepAspectRatio))
+            image = reader.read()
+            if image.isNull():
+                logger.debug('Impossible to load icon "{}": {}'.format(path, reader.errorString()))
+            self.signals.loaded.emit(self._key, image)
+
+    class IconCache(QtCore.QObject, object):
+        """
+        Cache of scaled pixmaps keyed by (path, width, height, device pixel ratio)
+        """
+
+        def __init__(self, parent=None):
+            super(IconCache, self).__init__(parent)
+
+            self._pixmaps = dict()
+            self._callbacks = dict()
+            self._loader_signals = dict()
+            self._thread_pool = QtCore.QThreadPool.globalInstance()
+
+        def pixmap(self, path, size, device_pixel_ratio=1.0):
+            """
+            Returns cached pixmap of the given icon path and size
+
+            :param str path: icon file path
+            :param QtCore.QSize size: logical size of the pixmap
+            :param float device_pixel_ratio: device pixel ratio pixmap is rendered with
+            :return: cached pixmap. None if the pixmap is not cached yet.
+            :rtype: QtGui.QPixmap or None
+            """
+
+            return self._pixmaps.get(self._get_key(path, size, device_pixel_ratio), None)
+
+        def default_pixmap(self, size, device_pixel_ratio=1.0):
+            """
+            Returns default Artella pixmap scaled to the given size. Scaled pixmap is computed only once per size
+
+            :param QtCore.QSize size: logical size of the pixmap
+            :param float device_pixel_ratio: device pixel ratio pixmap is rendered with
+            :return: scaled default pixmap
+            :rtype: QtGui.QPixmap
+            """
+
+            key = self._get_key('artella', size, device_pixel_ratio)
+            if key not in self._pixmaps:
+                target_size = QtCore.QSize(int(size.width() * device_pixel_ratio),
+                                           int(size.height() * device_pixel_ratio))
+                default_pixmap = (resource.pixmap('artella') or QtGui.QPixmap()).scaled(
+                    target_size, QtCore.Qt.KeepAspectRatio, transformMode=QtCore.Qt.SmoothTransformation)
+                default_pixmap.setDevicePixelRatio(device_pixel_ratio)
+                self._pixmaps[key] = default_pixmap
+
+            return self._pixmaps[key]
+
+        def load(self, path, size, callback, device_pixel_ratio=1.0):
+            """
+            Requests the pixmap of the given icon path and size. If the pixmap is cached the callback is called
+            immediately; otherwise icon is decoded in a worker thread and callback is called, in the main thread,
+            once the pixmap is available. Concurrent requests of the same pixmap are only decoded once.
+
+            :param str path: icon file path
+            :param QtCore.QSize size: logical size of the pixmap
+            :param callable callback: function called with the loaded QtGui.QPixmap
+            :param float device_pixel_ratio: device pixel ratio pixmap is rendered with
+            """
+
+            key = self._get_key(path, size, device_pixel_ratio)
+            if key in self._pixmaps:
+                metrics.record_cache_access('icons', True)
+                callback(self._pixmaps[key])
+                return
+            metrics.record_cache_access('icons', False)
+
+            if key in self._callbacks:
+                self._callbacks[key].append(callback)
+                return
+            self._callbacks[key] = [callback]
+
+            loader_task = IconLoaderTask(key)
+            loader_task.signals.loaded.connect(self._on_icon_loaded)
+            self._loader_signals[key] = loader_task.signals
+            self._thread_pool.start(loader_task)
+
+        def clear(self):
+            """
+            Removes all cached pixmaps
+            """
+
+            self._pixmaps.clear()
+
+        def _get_key(self, path, size, device_pixel_ratio):
+            return path, size.width(), size.height(), float(device_pixel_ratio)
+
+        def _on_icon_loaded(self, key, image):
+            self._loader_signals.pop(key, None)
+
+            callbacks = self._callbacks.pop(key, list())
+
+            if image.isNull():
+                return
+
+            pixmap = QtGui.QPixmap.fromImage(image)
+            pixmap.setDevicePixelRatio(key[3])
+            self._pixmaps[key] = pixmap
+            for callback in callbacks:
+                try:
+                    callback(pixmap)
+                except RuntimeError:
+                    # Widget that requested the icon has been already deleted
+                    pass
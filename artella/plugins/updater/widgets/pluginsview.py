@@ -0,0 +1,509 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains Artella Updater plugins list model/view implementation.
+Plugins data is stored in a list model and each plugin card is painted by a delegate, so only visible rows are painted
+and no widgets are created per plugin.
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import logging
+
+from artella.core import qtutils, resource
+from artella.plugins.updater import utils, scheduler, cancellation
+from artella.plugins.updater.widgets import iconcache
+
+try:
+    from artella.plugins.updater import aionet
+except (ImportError, SyntaxError):
+    # asyncio network client is only available in Python 3
+    aionet = None
+
+if qtutils.QT_AVAILABLE:
+    from artella.externals.Qt import QtCore, QtWidgets, QtGui
+
+logger = logging.getLogger('artella')
+
+STATE_LOADING = 'loading'
+STATE_IDLE = 'idle'
+STATE_UPDATING = 'updating'
+STATE_UPDATED = 'updated'
+STATE_ERROR = 'error'
+
+
+def can_update_plugin(plugin_data):
+    """
+    Returns whether or not the given plugin data has a version available to update to
+
+    :param dict plugin_data: plugin data stored in PluginsModel
+    :return: True if the plugin can be updated; False otherwise.
+    :rtype: bool
+    """
+
+    latest_version = plugin_data.get('latest_version', '')
+
+    return bool(latest_version and plugin_data.get('url', '') and latest_version != plugin_data.get('version', None))
+
+
+def can_fetch_plugin(plugin_data):
+    """
+    Returns whether or not the PyPI information of the given plugin can be requested again, because the previous
+    request failed
+
+    :param dict plugin_data: plugin data stored in PluginsModel
+    :return: True if the plugin information can be requested again; False otherwise.
+    :rtype: bool
+    """
+
+    return plugin_data.get('state', STATE_IDLE) == STATE_ERROR and not plugin_data.get('latest_version', '')
+
+
+if qtutils.QT_AVAILABLE:
+    class PluginsModel(QtCore.QAbstractListModel, object):
+        """
+        List model that stores the data of the plugins shown by Artella Updater.
+        Each row is a dictionary with id, name, package, version, author, email, summary, latest_version,
+        upload_date, size, url, digests, icon_path, state and error keys.
+        """
+
+        IdRole = QtCore.Qt.UserRole + 1
+        PluginRole = QtCore.Qt.UserRole + 2
+        StateRole = QtCore.Qt.UserRole + 3
+
+        ICON_SIZE = QtCore.QSize(30, 30)
+
+        def __init__(self, parent=None):
+            super(PluginsModel, self).__init__(parent)
+
+            self._plugins = list()
+            self._rows = dict()
+
+        def rowCount(self, parent=QtCore.QModelIndex()):
+            if parent.isValid():
+                return 0
+            return len(self._plugins)
+
+        def data(self, index, role=QtCore.Qt.DisplayRole):
+            if not index.isValid() or not 0 <= index.row() < len(self._plugins):
+                return None
+
+            plugin_data = self._plugins[index.row()]
+            if role == QtCore.Qt.DisplayRole:
+                return plugin_data.get('name', '')
+            elif role == QtCore.Qt.ToolTipRole:
+                return plugin_data.get('error', '') or plugin_data.get('summary', '')
+            elif role == QtCore.Qt.DecorationRole:
+                return self._get_icon_pixmap(plugin_data)
+            elif role == self.IdRole:
+                return plugin_data.get('id', '')
+            elif role == self.PluginRole:
+                return plugin_data
+            elif role == self.StateRole:
+                return plugin_data.get('state', STATE_IDLE)
+
+            return None
+
+        def flags(self, index):
+            if not index.isValid():
+                return QtCore.Qt.NoItemFlags
+            return QtCore.Qt.ItemIsEnabled
+
+        def add_plugin(self, plugin_data):
+            """
+            Adds a new plugin into the model
+
+            :param dict plugin_data: plugin data
+            """
+
+            plugin_data = dict(plugin_data)
+            plugin_data.setdefault('state', STATE_IDLE)
+            row = len(self._plugins)
+            self.beginInsertRows(QtCore.QModelIndex(), row, row)
+            self._plugins.append(plugin_data)
+            self._rows[plugin_data['id']] = row
+            self.endInsertRows()
+
+        def get_plugin(self, plugin_id):
+            """
+            Returns data of the plugin with given ID
+
+            :param str plugin_id: ID of the plugin
+            :return: plugin data. None if the plugin is not in the model.
+            :rtype: dict or None
+            """
+
+            row = self._rows.get(plugin_id, None)
+
+            return self._plugins[row] if row is not None else None
+
+        def plugin_ids(self):
+            """
+            Returns the IDs of all the plugins in the model
+
+            :return: list of plugin IDs
+            :rtype: list(str)
+            """
+
+            return [plugin_data['id'] for plugin_data in self._plugins]
+
+        def update_plugin(self, plugin_id, **kwargs):
+            """
+            Updates the data of the plugin with given ID and notifies views
+
+            :param str plugin_id: ID of the plugin
+            :param kwargs: plugin data keys to update
+            """
+
+            row = self._rows.get(plugin_id, None)
+            if row is None:
+                return
+
+            self._plugins[row].update(kwargs)
+            model_index = self.index(row, 0)
+            self.dataChanged.emit(model_index, model_index)
+
+        def remove_plugin(self, plugin_id):
+            """
+            Removes the plugin with given ID from the model
+
+            :param str plugin_id: ID of the plugin
+            """
+
+            row = self._rows.get(plugin_id, None)
+            if row is None:
+                return
+
+            self.beginRemoveRows(QtCore.QModelIndex(), row, row)
+            self._plugins.pop(row)
+            self._rows = dict((plugin_data['id'], i) for i, plugin_data in enumerate(self._plugins))
+            self.endRemoveRows()
+
+        def _get_icon_pixmap(self, plugin_data):
+            icon_cache = iconcache.get_icon_cache()
+            device_pixel_ratio = iconcache.get_device_pixel_ratio()
+            icon_path = plugin_data.get('icon_path', None)
+            if icon_path:
+                icon_pixmap = icon_cache.pixmap(icon_path, self.ICON_SIZE, device_pixel_ratio)
+                if icon_pixmap:
+                    return icon_pixmap
+                # Icons are only decoded when a row is painted for the first time
+                if not plugin_data.get('icon_requested', False):
+                    plugin_data['icon_requested'] = True
+                    plugin_id = plugin_data['id']
+                    icon_cache.load(
+                        icon_path, self.ICON_SIZE, lambda pixmap: self.update_plugin(plugin_id),
+                        device_pixel_ratio=device_pixel_ratio)
+
+            return icon_cache.default_pixmap(self.ICON_SIZE, device_pixel_ratio)
+
+    class PluginDelegate(QtWidgets.QStyledItemDelegate, object):
+        """
+        Delegate that paints plugin cards and handles clicks on their update (or retry) button
+        """
+
+        updateRequested = QtCore.Signal(str)
+        fetchRequested = QtCore.Signal(str)
+
+        PADDING = 6
+        ROW_HEIGHT = 110
+        BUTTON_SIZE = QtCore.QSize(120, 26)
+
+        def __init__(self, parent=None):
+            super(PluginDelegate, self).__init__(parent)
+
+            self._pressed_index = None
+            self._success_pixmap = None
+
+        def sizeHint(self, option, index):
+            return QtCore.QSize(option.rect.width(), self.ROW_HEIGHT)
+
+        def paint(self, painter, option, index):
+            plugin_data = index.data(PluginsModel.PluginRole)
+            if not plugin_data:
+                return super(PluginDelegate, self).paint(painter, option, index)
+
+            widget = option.widget
+            style = widget.style() if widget else QtWidgets.QApplication.style()
+            palette = option.palette
+            rect = option.rect.adjusted(2, 2, -2, -2)
+            padding = self.PADDING
+
+            painter.save()
+
+            frame_option = QtWidgets.QStyleOptionFrame()
+            frame_option.rect = rect
+            frame_option.palette = palette
+            frame_option.lineWidth = 1
+            frame_option.state = QtWidgets.QStyle.State_Raised
+            style.drawPrimitive(QtWidgets.QStyle.PE_Frame, frame_option, painter, widget)
+
+            icon_rect = QtCore.QRect(
+                rect.left() + padding, rect.top() + padding, PluginsModel.ICON_SIZE.width(),
+                PluginsModel.ICON_SIZE.height())
+            icon_pixmap = index.data(QtCore.Qt.DecorationRole)
+            if icon_pixmap:
+                style.drawItemPixmap(painter, icon_rect, QtCore.Qt.AlignCenter, icon_pixmap)
+
+            button_rect = self._get_button_rect(option.rect)
+            separator_x = button_rect.left() - padding * 2
+            text_left = icon_rect.right() + padding
+            text_width = max(0, separator_x - padding - text_left)
+
+            name_font = QtGui.QFont(option.font)
+            name_font.setBold(True)
+            name_metrics = QtGui.QFontMetrics(name_font)
+            name_rect = QtCore.QRect(text_left, rect.top() + padding, text_width, name_metrics.height())
+            name_text = '{} ({})'.format(plugin_data.get('name', ''), plugin_data.get('version', None))
+            painter.setFont(name_font)
+            painter.setPen(palette.color(QtGui.QPalette.Text))
+            painter.drawText(
+                name_rect, QtCore.Qt.AlignLeft | QtCore.Qt.AlignVCenter,
+                name_metrics.elidedText(name_text, QtCore.Qt.ElideRight, text_width))
+
+            info_rect = QtCore.QRect(text_left, name_rect.bottom() + 2, text_width, option.fontMetrics.height())
+            info_text = ' | '.join([info for info in (
+                plugin_data.get('upload_date', ''), plugin_data.get('size', '')) if info])
+            painter.setFont(option.font)
+            painter.setPen(palette.color(QtGui.QPalette.Disabled, QtGui.QPalette.Text))
+            painter.drawText(
+                info_rect, QtCore.Qt.AlignLeft | QtCore.Qt.AlignVCenter,
+                option.fontMetrics.elidedText(info_text, QtCore.Qt.ElideRight, text_width))
+
+            summary_top = max(icon_rect.bottom(), info_rect.bottom()) + padding
+            summary_rect = QtCore.QRect(
+                rect.left() + padding, summary_top, separator_x - padding - rect.left() - padding,
+                rect.bottom() - padding - summary_top)
+            painter.setPen(palette.color(QtGui.QPalette.Text))
+            painter.drawText(
+                summary_rect, QtCore.Qt.AlignLeft | QtCore.Qt.AlignTop | QtCore.Qt.TextWordWrap,
+                plugin_data.get('summary', ''))
+
+            painter.setPen(palette.color(QtGui.QPalette.Mid))
+            painter.drawLine(separator_x, rect.top() + padding, separator_x, rect.bottom() - padding)
+
+            state = plugin_data.get('state', STATE_IDLE)
+            if state in (STATE_LOADING, STATE_UPDATING):
+                painter.setPen(palette.color(QtGui.QPalette.Text))
+                painter.drawText(
+                    button_rect, QtCore.Qt.AlignCenter, 'Checking ...' if state == STATE_LOADING else 'Wait please ...')
+            elif state == STATE_UPDATED:
+                style.drawItemPixmap(painter, button_rect, QtCore.Qt.AlignCenter, self._get_success_pixmap())
+            else:
+                can_update = can_update_plugin(plugin_data) or can_fetch_plugin(plugin_data)
+                button_option = QtWidgets.QStyleOptionButton()
+                button_option.rect = button_rect
+                button_option.palette = palette
+                button_option.fontMetrics = option.fontMetrics
+                button_option.text = self._get_button_text(plugin_data)
+                button_option.state = QtWidgets.QStyle.State_Enabled if can_update else QtWidgets.QStyle.State_None
+                if can_update and self._pressed_index is not None and self._pressed_index == index:
+                    button_option.state |= QtWidgets.QStyle.State_Sunken
+                else:
+                    button_option.state |= QtWidgets.QStyle.State_Raised
+                style.drawControl(QtWidgets.QStyle.CE_PushButton, button_option, painter, widget)
+
+            painter.restore()
+
+        def editorEvent(self, event, model, option, index):
+            event_type = event.type()
+            if event_type not in (QtCore.QEvent.MouseButtonPress, QtCore.QEvent.MouseButtonRelease):
+                return False
+
+            plugin_data = index.data(PluginsModel.PluginRole)
+            if not plugin_data or plugin_data.get('state', STATE_IDLE) in (
+                    STATE_LOADING, STATE_UPDATING, STATE_UPDATED):
+                return False
+
+            over_button = self._get_button_rect(option.rect).contains(event.pos())
+            if event_type == QtCore.QEvent.MouseButtonPress:
+                if not over_button or not (can_update_plugin(plugin_data) or can_fetch_plugin(plugin_data)):
+                    return False
+                self._pressed_index = QtCore.QPersistentModelIndex(index)
+                self._update_view(option.rect)
+                return True
+
+            was_pressed = self._pressed_index is not None and self._pressed_index == index
+            self._pressed_index = None
+            self._update_view(option.rect)
+            if was_pressed and over_button:
+                if can_fetch_plugin(plugin_data):
+                    self.fetchRequested.emit(plugin_data['id'])
+                else:
+                    self.updateRequested.emit(plugin_data['id'])
+                return True
+
+            return False
+
+        def _get_button_rect(self, rect):
+            return QtCore.QRect(
+                rect.right() - self.PADDING * 2 - self.BUTTON_SIZE.width(),
+                rect.center().y() - self.BUTTON_SIZE.height() // 2,
+                self.BUTTON_SIZE.width(), self.BUTTON_SIZE.height())
+
+        def _get_button_text(self, plugin_data):
+            if can_fetch_plugin(plugin_data):
+                return 'Retry'
+            if plugin_data.get('state', STATE_IDLE) == STATE_ERROR:
+                return 'Retry ({})'.format(plugin_data.get('latest_version', ''))
+            if not can_update_plugin(plugin_data):
+                return 'Updated'
+
+            return 'Update ({})'.format(plugin_data.get('latest_version', ''))
+
+        def _get_success_pixmap(self):
+            if self._success_pixmap is None:
+                self._success_pixmap = resource.pixmap('success') or QtGui.QPixmap()
+            return self._success_pixmap
+
+        def _update_view(self, rect):
+            view = self.parent()
+            if isinstance(view, QtWidgets.QAbstractItemView):
+                view.viewport().update(rect)
+
+    class PluginsView(QtWidgets.QListView, object):
+        """
+        View that shows the plugins stored in a PluginsModel. All rows have the same size, so the view does not need
+        to compute the size of every row to layout them.
+        """
+
+        updateRequested = QtCore.Signal(str)
+        fetchRequested = QtCore.Signal(str)
+
+        def __init__(self, parent=None):
+            super(PluginsView, self).__init__(parent)
+
+            self.setUniformItemSizes(True)
+            self.setSelectionMode(QtWidgets.QAbstractItemView.NoSelection)
+            self.setVerticalScrollMode(QtWidgets.QAbstractItemView.ScrollPerPixel)
+            self.setHorizontalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)
+            self.setFocusPolicy(QtCore.Qt.NoFocus)
+            self.setMinimumWidth(500)
+
+            self._delegate = PluginDelegate(self)
+            self.setItemDelegate(self._delegate)
+            self._delegate.updateRequested.connect(self.updateRequested.emit)
+            self._delegate.fetchRequested.connect(self.fetchRequested.emit)
+
+    class PluginsUpdater(QtCore.QObject, object):
+        """
+        Updates plugins stored in plugins models one at a time. Package files are downloaded by the asyncio network
+        client, when available, and extracted by a single worker thread
+        """
+
+        pluginUpdated = QtCore.Signal(str)
+        updatePlugin = QtCore.Signal()
+
+        def __init__(self, parent=None):
+            super(PluginsUpdater, self).__init__(parent)
+
+            self._queue = list()
+            self._current = None
+
+            self._async_runner = None
+            self._async_cancel_token = None
+            if aionet is not None and aionet.is_available():
+                self._async_runner = aionet.AsyncRunner(self)
+                self._async_cancel_token = cancellation.CancellationToken()
+
+            self._update_plugin_thread = QtCore.QThread(self)
+            self._update_plugin_worker = utils.UpdatePluginWorker()
+            self._update_plugin_worker.moveToThread(self._update_plugin_thread)
+            self._update_plugin_worker.updateFinish.connect(self._on_finish_update)
+            self.updatePlugin.connect(self._update_plugin_worker.run)
+            self._update_plugin_thread.start()
+
+        def update_plugin(self, model, plugin_id):
+            """
+            Queues the update of the given plugin
+
+            :param PluginsModel model: model the plugin belongs to
+            :param str plugin_id: ID of the plugin to update
+            """
+
+            plugin_data = model.get_plugin(plugin_id)
+            if not plugin_data or plugin_data.get('state', STATE_IDLE) in (
+                    STATE_LOADING, STATE_UPDATING, STATE_UPDATED):
+                return
+
+            model.update_plugin(plugin_id, state=STATE_UPDATING, error='')
+            self._queue.append((model, plugin_id))
+            self._update_next()
+
+        def shutdown(self):
+            """
+            Cancels current update and stops the worker thread used to update plugins
+            """
+
+            self._queue = list()
+            if self._async_runner is not None:
+                self._async_cancel_token.cancel()
+                self._async_runner.shutdown()
+            self._update_plugin_worker.cancel()
+            self._update_plugin_thread.quit()
+            self._update_plugin_thread.wait()
+
+        def _update_next(self):
+            if self._current or not self._queue:
+                return
+
+            self._current = self._queue.pop(0)
+            model, plugin_id = self._current
+            plugin_data = model.get_plugin(plugin_id)
+            install_path = utils.get_plugin_install_path(plugin_id)
+            if not install_path:
+                self._on_finish_update('No install path found for plugin: {}'.format(plugin_id))
+                return
+
+            latest_version = plugin_data.get('latest_version', '')
+            url = plugin_data.get('url', '')
+            digests = plugin_data.get('digests', None)
+            self._update_plugin_worker.set_id(plugin_id)
+            self._update_plugin_worker.set_package(plugin_data.get('package', None))
+            self._update_plugin_worker.set_latest_version(latest_version)
+            self._update_plugin_worker.set_url(url)
+            self._update_plugin_worker.set_digests(digests)
+            self._update_plugin_worker.set_install_path(install_path)
+            self._update_plugin_worker.set_package_file_path(None)
+
+            file_path = utils.get_plugin_package_file_path(plugin_id, latest_version, url, install_path)
+            if self._async_runner is None or not file_path:
+                self.updatePlugin.emit()
+                return
+
+            # Package file is downloaded without blocking a thread and the worker only extracts it
+            self._async_runner.run(
+                aionet.get_client().download(
+                    url, file_path, digests=digests, cancel_token=self._async_cancel_token,
+                    request_priority=scheduler.INTERACTIVE),
+                lambda valid, error: self._on_package_downloaded(url, file_path, valid, error))
+
+        def _on_package_downloaded(self, url, file_path, valid, error):
+            if not self._current:
+                return
+
+            plugin_id = self._current[1]
+            if error is not None or not valid:
+                error_msg = 'Impossible to download plugin from PyPI server ({} | {})'.format(plugin_id, url)
+                self._on_finish_update('{} | {}'.format(error_msg, error) if error is not None else error_msg)
+                return
+
+            self._update_plugin_worker.set_package_file_path(file_path)
+            self.updatePlugin.emit()
+
+        def _on_finish_update(self, error_msg):
+            if not self._current:
+                return
+
+            model, plugin_id = self._current
+            self._current = None
+            if error_msg:
+                logger.error(error_msg)
+                model.update_plugin(plugin_id, state=STATE_ERROR, error=error_msg)
+            else:
+                plugin_data = model.get_plugin(plugin_id)
+                model.update_plugin(plugin_id, state=STATE_UPDATED, version=plugin_data.get('latest_version', ''))
+                self.pluginUpdated.emit(plugin_id)
+
+            self._update_next()
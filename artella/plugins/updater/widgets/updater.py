@@ -11,25 +11,57 @@ import os
 import logging
 
 from artella import dcc
-from artella.core import qtutils, plugins, utils as core_utils
+from artella.core import qtutils, plugins
 from artella.core.dcc import window
-from artella.plugins.updater import utils
+from artella.plugins.updater import utils, reloader, tracing, profiler, scheduler, cancellation
+
+try:
+    from artella.plugins.updater import aionet
+except (ImportError, SyntaxError):
+    # asyncio network client is only available in Python 3
+    aionet = None
+
 
 if qtutils.QT_AVAILABLE:
-    from artella.externals.Qt import QtCore, QtWidgets, QtGui
+    from artella.externals.Qt import QtCore, QtWidgets
 
-from artella.plugins.updater.widgets import plugin
+from artella.plugins.updater.widgets import pluginsview
 
 logger = logging.getLogger('artella')
 
 
 if qtutils.QT_AVAILABLE:
     class UpdaterWindow(window.Window, object):
+
+        fetchPluginsInfo = QtCore.Signal(str, object)
+
         def __init__(self, parent=None, **kwargs):
             super(UpdaterWindow, self).__init__(parent, **kwargs)
 
             self._plugins = dict()
-            self._plugin_updated = False
+            self._updated_plugins = list()
+            self._plugins_updater = pluginsview.PluginsUpdater(self)
+            self._plugins_updater.pluginUpdated.connect(self._on_updated_plugin)
+
+            self._async_runner = None
+            self._async_cancel_token = None
+            self._plugins_info_thread = None
+            if aionet is not None and aionet.is_available():
+                self._async_runner = aionet.AsyncRunner(self)
+                self._async_cancel_token = cancellation.CancellationToken()
+            else:
+                self._plugins_info_thread = QtCore.QThread(self)
+                self._plugins_info_worker = utils.PluginsInfoWorker()
+                self._plugins_info_worker.moveToThread(self._plugins_info_thread)
+                self._plugins_info_worker.infoFetched.connect(self._on_plugins_info_fetched)
+                self._plugins_info_worker.infoFailed.connect(self._on_plugins_info_failed)
+                self.fetchPluginsInfo.connect(self._plugins_info_worker.fetch)
+                self._plugins_info_thread.start()
+
+            # Windows are not closed when the DCC quits, so running work is cancelled before the application exits
+            app = QtWidgets.QApplication.instance()
+            if app:
+                app.aboutToQuit.connect(self._shutdown_workers)
 
             self.setWindowTitle('Artella Updater')
 
@@ -38,17 +70,28 @@ if qtutils.QT_AVAILABLE:
             self.resize(self.minimumSizeHint())
 
         def closeEvent(self, event):
-            if self._plugin_updated:
-                dcc_name = dcc.name()
-                import artella.loader
-                artella.loader._reload()
-                if dcc_name == 'maya':
-                    import maya.cmds as cmds
-                    cmds.evalDeferred(artella.loader.init)
-                else:
-                    artella.loader.init()
+            self._shutdown_workers()
+            if self._updated_plugins:
+                if reloader.needs_full_reload(self._updated_plugins) or not reloader.reload_plugins(
+                        self._updated_plugins):
+                    self._reload_artella()
+                self._updated_plugins = list()
             super(UpdaterWindow, self).closeEvent(event)
 
+        def _shutdown_workers(self):
+            """
+            Cancels running downloads and metadata requests and stops the threads used by them
+            """
+
+            self._plugins_updater.shutdown()
+            if self._async_runner is not None:
+                self._async_cancel_token.cancel()
+                self._async_runner.shutdown()
+            if self._plugins_info_thread is not None:
+                self._plugins_info_worker.cancel()
+                self._plugins_info_thread.quit()
+                self._plugins_info_thread.wait()
+
         def get_main_layout(self):
             main_layout = QtWidgets.QVBoxLayout()
             main_layout.setContentsMargins(5, 5, 5, 5)
@@ -62,103 +105,182 @@ if qtutils.QT_AVAILABLE:
             self._package_tabs = QtWidgets.QTabWidget()
             self.main_layout.addWidget(self._package_tabs)
 
+            self._package_tabs.currentChanged.connect(self._on_current_package_tab_changed)
+
         def _add_package_tab(self, package_name):
+            """
+            Adds an empty tab for the given package. Tab contents are built the first time the tab becomes active
+            """
+
             package_widget = QtWidgets.QWidget()
             package_layout = QtWidgets.QVBoxLayout()
             package_layout.setContentsMargins(2, 2, 2, 2)
             package_layout.setSpacing(2)
             package_widget.setLayout(package_layout)
-            package_scroll = QtWidgets.QScrollArea()
-            package_scroll.setHorizontalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)
-            package_scroll.setWidgetResizable(True)
-            package_scroll.setWidget(package_widget)
 
-            self._package_tabs.addTab(package_widget, package_name)
+            self._plugins[package_name]['layout'] = package_layout
+            tab_index = self._package_tabs.addTab(package_widget, package_name)
+            self._package_tabs.tabBar().setTabData(tab_index, package_name)
 
             return package_layout
 
+        def _build_package_tab(self, tab_index):
+            """
+            Builds the plugins list of the package tab with given index and requests PyPI information of its plugins
+            """
+
+            package_name = self._package_tabs.tabBar().tabData(tab_index) if tab_index >= 0 else None
+            package_data = self._plugins.get(package_name, None)
+            if not package_data or package_data.get('model', None) is not None:
+                return
+
+            with tracing.span('ui_build', package=package_name, plugins=len(package_data['plugins'])):
+                package_model = pluginsview.PluginsModel(self)
+                package_view = pluginsview.PluginsView()
+                package_view.setModel(package_model)
+                package_view.updateRequested.connect(
+                    lambda plugin_id: self._plugins_updater.update_plugin(package_model, plugin_id))
+                package_view.fetchRequested.connect(lambda plugin_id: self._refetch_plugins_info(package_name))
+                package_data['model'] = package_model
+                package_data['layout'].addWidget(package_view)
+
+                for plugin_data in package_data['plugins']:
+                    package_model.add_plugin(dict(plugin_data, state=pluginsview.STATE_LOADING))
+
+            self._fetch_plugins_info(package_name, [plugin_data['id'] for plugin_data in package_data['plugins']])
+
+        def _fetch_plugins_info(self, package_name, plugin_ids):
+            """
+            Requests PyPI information of the given plugins of the given package
+            """
+
+            if self._async_runner is not None:
+                # The user is waiting for this information, so background requests are capped while it is fetched
+                self._async_runner.run(
+                    aionet.get_client().get_plugins_pypi_info(
+                        plugin_ids, cancel_token=self._async_cancel_token, request_priority=scheduler.INTERACTIVE),
+                    lambda plugins_pypi_info, error: self._on_async_plugins_info_fetched(
+                        package_name, plugins_pypi_info, error))
+            else:
+                self.fetchPluginsInfo.emit(package_name, plugin_ids)
+
+        def _refetch_plugins_info(self, package_name):
+            """
+            Requests again PyPI information of the plugins of the given package whose previous request failed
+            """
+
+            package_model = self._plugins.get(package_name, dict()).get('model', None)
+            if not package_model:
+                return
+
+            plugin_ids = [
+                plugin_id for plugin_id in package_model.plugin_ids() if
+                pluginsview.can_fetch_plugin(package_model.get_plugin(plugin_id))]
+            if not plugin_ids:
+                return
+            for plugin_id in plugin_ids:
+                package_model.update_plugin(plugin_id, state=pluginsview.STATE_LOADING, error='')
+            self._fetch_plugins_info(package_name, plugin_ids)
+
+        @profiler.profile('fill_data')
         def _fill_data(self):
 
-            install_path = r'D:\dev\artella\test_download'
-
-            dcc_plugins = list()
-            dcc_install_package = 'artella-installer-{}'.format(dcc.name())
-            base_file_name = 'artella_installer_maya'
-            file_name = '{}.tar.gz'.format(base_file_name)
-            file_path = os.path.join(install_path, file_name)
-            dcc_pypi_info = utils.get_pypi_info(dcc_install_package)
-            if dcc_pypi_info:
-                dcc_url = dcc_pypi_info.get('url', '')
-                if dcc_url:
-                    valid = utils.download_and_extract_package_from_pypi(dcc_url, file_path, install_path)
-                    if valid:
-                        config_file = None
-                        print('Install Path: {}'.format(install_path))
-                        for root, dirs, files in os.walk(install_path):
-                            if config_file:
-                                break
-                            for file_path in files:
-                                if file_path == 'artella-installer.json':
-                                    config_file = os.path.join(root, file_path)
-                                    break
-                        if config_file and os.path.isfile(config_file):
-                            config_data = core_utils.read_json(config_file)
-                            config_plugins = config_data.get('plugins', list())
-                            for config_plugin in config_plugins:
-                                plugin_id = config_plugin.get('id', '')
-                                if not plugin_id:
-                                    plugin_repo = config_plugin.get('repo', '')
-                                    if plugin_repo:
-                                        plugin_id = plugin_repo.split('/')[-1]
-                                if plugin_id:
-                                    dcc_plugins.append(plugin_id)
-            dcc_plugins = list(set(dcc_plugins))
-
             all_plugins = plugins.plugins()
             for plugin_id, plugin_data in all_plugins.items():
 
                 plugin_name = plugin_data['name']
                 plugin_icon_name = plugin_data.get('icon', None)
                 plugin_package = plugin_data.get('package', None)
-                plugin_version = plugin_data.get('version', None)
+                plugin_version = utils.get_installed_plugin_version(
+                    plugin_id, import_version=False) or plugin_data.get('version', None)
                 plugin_resource_paths = plugin_data.get('resource_paths', list())
 
-                if plugin_id in dcc_plugins:
-                    dcc_plugins.remove(plugin_id)
-
-                plugin_icon_pixmap = None
+                plugin_icon_path = None
                 if plugin_icon_name and plugin_resource_paths:
                     for plugin_resource_path in plugin_resource_paths:
-                        plugin_icon_path = os.path.join(plugin_resource_path, plugin_icon_name)
-                        if os.path.isfile(plugin_icon_path):
-                            plugin_icon_pixmap = QtGui.QPixmap(plugin_icon_path)
-
-                if plugin_package not in self._plugins:
-                    package_layout = self._add_package_tab(plugin_package)
-                    self._plugins[plugin_package] = {'layout': package_layout, 'plugins': []}
-                else:
-                    package_layout = self._plugins[plugin_package]['layout']
-
-                pypi_info = utils.get_pypi_info(plugin_id)
+                        resource_icon_path = os.path.join(plugin_resource_path, plugin_icon_name)
+                        if os.path.isfile(resource_icon_path):
+                            plugin_icon_path = resource_icon_path
+                            break
+
+                self._plugins.setdefault(plugin_package, {'layout': None, 'model': None, 'plugins': []})
+                self._plugins[plugin_package]['plugins'].append({
+                    'id': plugin_id,
+                    'name': plugin_name,
+                    'package': plugin_package,
+                    'version': plugin_version,
+                    'icon_path': plugin_icon_path
+                })
+
+            # Adding the first tab makes it the current one, so only its contents are built here
+            for plugin_package in self._plugins.keys():
+                self._add_package_tab(plugin_package)
+            self._build_package_tab(self._package_tabs.currentIndex())
+
+        def _on_current_package_tab_changed(self, tab_index):
+            self._build_package_tab(tab_index)
+
+        def _on_plugins_info_fetched(self, package_name, plugins_pypi_info):
+            package_model = self._plugins.get(package_name, dict()).get('model', None)
+            if not package_model:
+                return
+
+            for plugin_id in package_model.plugin_ids():
+                if package_model.get_plugin(plugin_id).get('state', None) != pluginsview.STATE_LOADING:
+                    continue
+                pypi_info = plugins_pypi_info.get(plugin_id, None)
                 if not pypi_info:
+                    package_model.remove_plugin(plugin_id)
                     continue
-
-                plugin_author = pypi_info.get('author', '')
-                plugin_author_email = pypi_info.get('author_email', '')
-                plugin_summary = pypi_info.get('summary', '')
-                plugin_latest_version = pypi_info.get('version', '')    # this is the latest version of the plugin in PyPI
-                plugin_upload_date = pypi_info.get('upload_date', '')
-                plugin_size = pypi_info.get('size', '')
-                plugin_url = pypi_info.get('url', '')
-
-                new_plugin_widget = plugin.PluginVersionWidget(
-                    plugin_id, plugin_name, plugin_package, plugin_version, plugin_author, plugin_author_email,
-                    plugin_summary, plugin_latest_version, plugin_upload_date, plugin_size, plugin_url, plugin_icon_pixmap)
-                new_plugin_widget.updated.connect(self._on_updated_plugin)
-                self._plugins[plugin_package]['plugins'].append(new_plugin_widget)
-                package_layout.addWidget(new_plugin_widget)
-
-            print(dcc_plugins)
-
-        def _on_updated_plugin(self):
-            self._plugin_updated = True
+                package_model.update_plugin(
+                    plugin_id,
+                    state=pluginsview.STATE_IDLE,
+                    author=pypi_info.get('author', ''),
+                    email=pypi_info.get('author_email', ''),
+                    summary=pypi_info.get('summary', ''),
+                    latest_version=pypi_info.get('version', ''),     # latest version of the plugin in PyPI
+                    upload_date=pypi_info.get('upload_date', ''),
+                    size=pypi_info.get('size', ''),
+                    url=pypi_info.get('url', ''),
+                    digests=pypi_info.get('digests', None))
+
+        def _on_async_plugins_info_fetched(self, package_name, plugins_pypi_info, error):
+            if error is not None:
+                self._on_plugins_info_failed(package_name, str(error))
+            else:
+                self._on_plugins_info_fetched(package_name, plugins_pypi_info or dict())
+
+        def _on_plugins_info_failed(self, package_name, error_msg):
+            """
+            Keeps the plugins whose information could not be retrieved, so it can be requested again
+            """
+
+            package_model = self._plugins.get(package_name, dict()).get('model', None)
+            if not package_model:
+                return
+
+            for plugin_id in package_model.plugin_ids():
+                if package_model.get_plugin(plugin_id).get('state', None) != pluginsview.STATE_LOADING:
+                    continue
+                package_model.update_plugin(
+                    plugin_id, state=pluginsview.STATE_ERROR,
+                    error='Impossible to retrieve plugin PyPI information: {}'.format(error_msg))
+
+        def _reload_artella(self):
+            """
+            Reloads the whole Artella loader. Used when core plugins are updated
+            """
+
+            dcc_name = dcc.name()
+            import artella.loader
+            with tracing.span('reload', plugin_ids=list(self._updated_plugins), full=True):
+                artella.loader._reload()
+            if dcc_name == 'maya':
+                import maya.cmds as cmds
+                cmds.evalDeferred(artella.loader.init)
+            else:
+                artella.loader.init()
+
+        def _on_updated_plugin(self, plugin_id):
+            if plugin_id not in self._updated_plugins:
+                self._updated_plugins.append(plugin_id)
@@ -0,0 +1,127 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains fixtures shared by Artella Updater tests
+"""
+
+import os
+import ssl
+import threading
+import subprocess
+
+import pytest
+
+try:
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+    from SocketServer import ThreadingMixIn
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class _RoutesRequestHandler(BaseHTTPRequestHandler):
+    """
+    Answers requests with the responses registered in the server routes. A route is either a (status, headers, body)
+    tuple or a function that receives the handler and returns that tuple. If body is a list, it is sent using chunked
+    transfer encoding
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        self.server.requests.append((path, dict((name.lower(), value) for name, value in self.headers.items())))
+        route = self.server.routes.get(path, (404, dict(), b'Not Found'))
+        status, headers, body = route(self) if callable(route) else route
+
+        self.send_response(status)
+        for header_name, header_value in headers.items():
+            self.send_header(header_name, header_value)
+        if isinstance(body, list):
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for chunk in body:
+                self.wfile.write('{:x}\r\n'.format(len(chunk)).encode('ascii') + chunk + b'\r\n')
+            self.wfile.write(b'0\r\n\r\n')
+        else:
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _HTTPServer(object):
+    def __init__(self, server, scheme='http'):
+        self._server = server
+        self._scheme = scheme
+        self.routes = server.routes
+        self.requests = server.requests
+
+    def url(self, path):
+        return '{}://127.0.0.1:{}{}'.format(self._scheme, self._server.server_address[1], path)
+
+    def requested_paths(self):
+        return [path for path, _ in self.requests]
+
+
+def _serve(ssl_context=None):
+    from artella.plugins.updater import ratelimit
+
+    server = _ThreadingHTTPServer(('127.0.0.1', 0), _RoutesRequestHandler)
+    if ssl_context is not None:
+        server.socket = ssl_context.wrap_socket(server.socket, server_side=True)
+    server.routes = dict()
+    server.requests = list()
+    server_thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05})
+    server_thread.daemon = True
+    server_thread.start()
+
+    # Throttled requests slow down the host bucket, so buckets are not shared between tests
+    ratelimit.reset()
+    try:
+        yield _HTTPServer(server, 'https' if ssl_context is not None else 'http')
+    finally:
+        ratelimit.reset()
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture()
+def http_server():
+    """
+    Starts a local HTTP server that answers with the responses registered in its routes dictionary
+    """
+
+    for server in _serve():
+        yield server
+
+
+@pytest.fixture()
+def https_server(tmpdir):
+    """
+    Starts a local HTTPS server with a self-signed certificate that answers with the responses registered in its
+    routes dictionary
+    """
+
+    cert_path = str(tmpdir.join('cert.pem'))
+    key_path = str(tmpdir.join('key.pem'))
+    try:
+        subprocess.check_call([
+            'openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1', '-subj', '/CN=127.0.0.1',
+            '-keyout', key_path, '-out', cert_path], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except (OSError, subprocess.CalledProcessError):
+        pytest.skip('openssl is not available to create a self-signed certificate')
+    if not os.path.isfile(cert_path):
+        pytest.skip('Self-signed certificate could not be created')
+
+    ssl_context = ssl.SSLContext(getattr(ssl, 'PROTOCOL_TLS_SERVER', ssl.PROTOCOL_SSLv23))
+    ssl_context.load_cert_chain(cert_path, key_path)
+    for server in _serve(ssl_context):
+        yield server
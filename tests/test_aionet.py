@@ -0,0 +1,229 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for Artella Updater asyncio network client
+"""
+
+import os
+import sys
+import gzip
+import json
+import zlib
+import hashlib
+import threading
+
+import pytest
+
+pytest.importorskip('artella.core')
+
+if sys.version_info[0] < 3:
+    pytest.skip('asyncio network client requires Python 3', allow_module_level=True)
+
+import asyncio    # noqa: E402
+
+from artella.plugins.updater import aionet, utils, scheduler, cancellation    # noqa: E402
+
+PYPI_DOCUMENT = json.dumps({
+    'info': {'author': 'Artella', 'summary': 'About plugin', 'version': '1.0.0'},
+    'releases': {'1.0.0': [{'filename': 'artella-plugins-about-1.0.0.tar.gz', 'packagetype': 'sdist'}]},
+    'description': 'Artella plugin. ' * 1000}).encode('utf-8')
+
+
+def _run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+@pytest.fixture()
+def limited_scheduler(monkeypatch):
+    """
+    Uses a request scheduler that only allows one request at a time
+    """
+
+    monkeypatch.setenv(scheduler.MAX_REQUESTS_ENV, '1')
+    scheduler.reset()
+    yield scheduler.get_scheduler()
+    scheduler.reset()
+
+
+def test_fetch(http_server):
+    http_server.routes['/json'] = (200, dict(), PYPI_DOCUMENT)
+
+    assert _run(aionet.AsyncHTTPClient().fetch(http_server.url('/json'))) == PYPI_DOCUMENT
+
+
+def _raw_deflate(data):
+    compressor = zlib.compressobj(9, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+@pytest.mark.parametrize('encoding, compress', [
+    (None, None), ('gzip', gzip.compress), ('deflate', zlib.compress), ('deflate', _raw_deflate)])
+def test_fetch_chunked(http_server, encoding, compress):
+    data = compress(PYPI_DOCUMENT) if compress else PYPI_DOCUMENT
+    chunks = [data[i:i + 1000] for i in range(0, len(data), 1000)]
+    http_server.routes['/json'] = (200, {'Content-Encoding': encoding} if encoding else dict(), chunks)
+
+    assert _run(aionet.AsyncHTTPClient().fetch(http_server.url('/json'), compressed=True)) == PYPI_DOCUMENT
+    assert 'gzip' in http_server.requests[0][1]['accept-encoding']
+
+
+def test_download(http_server, tmpdir):
+    package_data = PYPI_DOCUMENT * 10
+    http_server.routes['/package.tar.gz'] = (200, dict(), [
+        package_data[i:i + 50000] for i in range(0, len(package_data), 50000)])
+    file_path = str(tmpdir.join('package.tar.gz'))
+    digests = {'sha256': hashlib.sha256(package_data).hexdigest()}
+
+    assert _run(aionet.AsyncHTTPClient().download(http_server.url('/package.tar.gz'), file_path, digests=digests))
+    with open(file_path, 'rb') as fh:
+        assert fh.read() == package_data
+    assert 'accept-encoding' not in http_server.requests[0][1]
+
+
+def test_download_digest_mismatch_rejects_file(http_server, tmpdir):
+    http_server.routes['/package.tar.gz'] = (200, dict(), PYPI_DOCUMENT)
+    file_path = str(tmpdir.join('package.tar.gz'))
+
+    assert not _run(aionet.AsyncHTTPClient().download(
+        http_server.url('/package.tar.gz'), file_path, digests={'sha256': '0' * 64}))
+    assert not os.path.exists(file_path)
+
+
+def test_download_errors_remove_file(http_server, tmpdir):
+    file_path = str(tmpdir.join('package.tar.gz'))
+
+    assert not _run(aionet.AsyncHTTPClient().download(http_server.url('/missing.tar.gz'), file_path))
+    assert not os.path.exists(file_path)
+
+
+def test_cancelled_download_removes_file(http_server, tmpdir, monkeypatch):
+    http_server.routes['/package.tar.gz'] = (200, dict(), [PYPI_DOCUMENT] * 10)
+    file_path = str(tmpdir.join('package.tar.gz'))
+    cancel_token = cancellation.CancellationToken()
+    written_chunks = list()
+    write_chunk = aionet._write_chunk
+
+    def _write_chunk(fh, chunk, hashers, hash_times):
+        write_chunk(fh, chunk, hashers, hash_times)
+        written_chunks.append(chunk)
+        cancel_token.cancel()
+
+    monkeypatch.setattr(aionet, '_write_chunk', _write_chunk)
+    with pytest.raises(cancellation.CancelledError):
+        _run(aionet.AsyncHTTPClient().download(
+            http_server.url('/package.tar.gz'), file_path, cancel_token=cancel_token))
+    assert len(written_chunks) == 1
+    assert not os.path.exists(file_path)
+
+
+def test_redirects_are_followed(http_server):
+    http_server.routes['/pypi/about/json'] = (301, {'Location': '/pypi/artella-plugins-about/json'}, b'')
+    http_server.routes['/pypi/artella-plugins-about/json'] = (302, {'Location': http_server.url('/files/json')}, b'')
+    http_server.routes['/files/json'] = (200, dict(), PYPI_DOCUMENT)
+
+    assert _run(aionet.AsyncHTTPClient().fetch(http_server.url('/pypi/about/json'))) == PYPI_DOCUMENT
+    assert http_server.requested_paths() == ['/pypi/about/json', '/pypi/artella-plugins-about/json', '/files/json']
+
+
+def test_redirect_loops_fail(http_server):
+    http_server.routes['/json'] = (302, {'Location': '/json'}, b'')
+
+    with pytest.raises(aionet.AsyncHTTPError):
+        _run(aionet.AsyncHTTPClient().fetch(http_server.url('/json')))
+    assert len(http_server.requests) == aionet.MAX_REDIRECTS + 1
+
+
+def test_http_errors(http_server):
+    with pytest.raises(aionet.AsyncHTTPError) as exc_info:
+        _run(aionet.AsyncHTTPClient().fetch(http_server.url('/missing')))
+
+    assert exc_info.value.code == 404
+
+
+def test_throttled_requests_are_retried(http_server):
+    throttled_responses = [(429, {'Retry-After': '0'}, b'')]
+    http_server.routes['/json'] = lambda handler: throttled_responses.pop() if throttled_responses else (
+        200, dict(), PYPI_DOCUMENT)
+
+    assert _run(aionet.AsyncHTTPClient().fetch(http_server.url('/json'))) == PYPI_DOCUMENT
+    assert len(http_server.requests) == 2
+
+
+def test_get_plugins_pypi_info(http_server, monkeypatch):
+    monkeypatch.setattr(utils, 'get_pypi_url', lambda plugin_id: http_server.url('/pypi/{}/json'.format(plugin_id)))
+    http_server.routes['/pypi/artella-plugins-about/json'] = (
+        200, {'Content-Encoding': 'gzip'}, gzip.compress(PYPI_DOCUMENT))
+
+    plugins_pypi_info = _run(aionet.AsyncHTTPClient().get_plugins_pypi_info(
+        ['artella-plugins-about', 'artella-plugins-missing']))
+
+    assert plugins_pypi_info['artella-plugins-about']['version'] == '1.0.0'
+    assert plugins_pypi_info['artella-plugins-missing'] == dict()
+
+
+def test_cancelled_requests_are_not_sent(http_server):
+    cancel_token = cancellation.CancellationToken()
+    cancel_token.cancel()
+
+    with pytest.raises(cancellation.CancelledError):
+        _run(aionet.AsyncHTTPClient().get_plugins_pypi_info(['artella-plugins-about'], cancel_token=cancel_token))
+    assert not http_server.requests
+
+
+def test_requests_wait_for_scheduler_slot(http_server, limited_scheduler):
+    http_server.routes['/json'] = (200, dict(), PYPI_DOCUMENT)
+    results = list()
+
+    limited_scheduler.acquire(scheduler.BACKGROUND)
+    fetch_thread = threading.Thread(
+        target=lambda: results.append(_run(aionet.AsyncHTTPClient().fetch(http_server.url('/json')))))
+    fetch_thread.start()
+    try:
+        fetch_thread.join(0.3)
+        assert not http_server.requests
+        assert limited_scheduler.is_interactive_busy()
+    finally:
+        limited_scheduler.release(scheduler.BACKGROUND)
+    fetch_thread.join(5)
+
+    assert results == [PYPI_DOCUMENT]
+    assert limited_scheduler.running() == 0
+
+
+def test_cancel_while_waiting_for_scheduler_slot(http_server, limited_scheduler):
+    cancel_token = cancellation.CancellationToken()
+    errors = list()
+
+    def _fetch():
+        try:
+            _run(aionet.AsyncHTTPClient().fetch(http_server.url('/json'), cancel_token=cancel_token))
+        except cancellation.CancelledError as exc:
+            errors.append(exc)
+
+    limited_scheduler.acquire()
+    fetch_thread = threading.Thread(target=_fetch)
+    fetch_thread.start()
+    try:
+        fetch_thread.join(0.2)
+        cancel_token.cancel()
+        fetch_thread.join(5)
+    finally:
+        limited_scheduler.release()
+
+    assert len(errors) == 1
+    assert not http_server.requests
+    assert not limited_scheduler.is_interactive_busy()
+
+
+def test_unverified_ssl_fallback(https_server):
+    https_server.routes['/json'] = (200, dict(), PYPI_DOCUMENT)
+    client = aionet.AsyncHTTPClient()
+
+    assert _run(client.fetch(https_server.url('/json'))) == PYPI_DOCUMENT
+    assert _run(client.fetch(https_server.url('/json'))) == PYPI_DOCUMENT
+    assert len(https_server.requests) == 2
@@ -0,0 +1,312 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains benchmarks for Artella Updater Plugin.
+
+Benchmarks are slow and their results depend on the machine, so they are skipped unless ARTELLA_UPDATER_BENCHMARK
+environment variable is set. They run against a local HTTP server that serves synthetic PyPI JSON data, Artella DCC
+plugin stable version files and generated sdist packages, so results do not depend on network or on PyPI contents.
+
+Measured times are compared against the ones stored in a baseline file and a benchmark fails if it is slower than
+its baseline multiplied by ARTELLA_UPDATER_BENCHMARK_FACTOR. If no baseline exists for a benchmark, measured time is
+stored as its baseline. Benchmarks can be configured using these environment variables:
+
+    ARTELLA_UPDATER_BENCHMARK: if set, benchmarks are run
+    ARTELLA_UPDATER_BENCHMARK_BASELINE: baseline file path (default: artella-updater-benchmarks.json file in the
+        temporary folder of the system)
+    ARTELLA_UPDATER_BENCHMARK_UPDATE: if set, baselines are overwritten with measured times
+    ARTELLA_UPDATER_BENCHMARK_FACTOR: allowed slowdown factor (default: 1.5)
+    ARTELLA_UPDATER_BENCHMARK_PLUGINS: number of synthetic plugins (default: 20)
+    ARTELLA_UPDATER_BENCHMARK_FILES: number of files of each synthetic package (default: 200)
+    ARTELLA_UPDATER_BENCHMARK_FILE_SIZE: size in bytes of each file of synthetic packages (default: 16384)
+"""
+
+import os
+import io
+import json
+import time
+import shutil
+import tarfile
+import binascii
+import hashlib
+import tempfile
+import threading
+
+import pytest
+
+pytest.importorskip('artella.core')
+
+BENCHMARK_ENV = 'ARTELLA_UPDATER_BENCHMARK'
+if not os.environ.get(BENCHMARK_ENV, None):
+    pytest.skip('Benchmarks are only run if {} is set'.format(BENCHMARK_ENV), allow_module_level=True)
+
+from artella.plugins.updater import utils, ratelimit    # noqa: E402
+
+try:
+    from http.server import HTTPServer, SimpleHTTPRequestHandler
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import HTTPServer
+    from SimpleHTTPServer import SimpleHTTPRequestHandler
+    from SocketServer import ThreadingMixIn
+
+BASELINE_PATH_ENV = 'ARTELLA_UPDATER_BENCHMARK_BASELINE'
+UPDATE_BASELINE_ENV = 'ARTELLA_UPDATER_BENCHMARK_UPDATE'
+FACTOR_ENV = 'ARTELLA_UPDATER_BENCHMARK_FACTOR'
+PLUGINS_ENV = 'ARTELLA_UPDATER_BENCHMARK_PLUGINS'
+FILES_ENV = 'ARTELLA_UPDATER_BENCHMARK_FILES'
+FILE_SIZE_ENV = 'ARTELLA_UPDATER_BENCHMARK_FILE_SIZE'
+
+DCC_NAME = 'maya'
+PLUGIN_VERSION = '1.0.0'
+REPEAT = 3
+MIN_TOLERANCE = 0.005       # Absolute tolerance (in seconds) to avoid failures caused by timer noise
+
+
+def _get_int_env(env_name, default_value):
+    try:
+        return int(os.environ.get(env_name, default_value))
+    except ValueError:
+        return default_value
+
+
+def _get_plugin_id(index):
+    return 'artella-plugins-bench{}'.format(index)
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class _FakeServerRequestHandler(SimpleHTTPRequestHandler):
+    """
+    Serves the files of the fake server root folder without logging requests
+    """
+
+    root_path = None
+
+    def translate_path(self, path):
+        path_parts = [part for part in path.split('?')[0].split('#')[0].split('/') if part and part not in ('.', '..')]
+        return os.path.join(self.root_path, *path_parts)
+
+    def log_message(self, *args):
+        pass
+
+
+def _write_file(file_path, data):
+    folder = os.path.dirname(file_path)
+    if not os.path.isdir(folder):
+        os.makedirs(folder)
+    with open(file_path, 'wb') as fh:
+        fh.write(data)
+
+
+def _create_sdist(file_path, plugin_id, file_count, file_size):
+    """
+    Creates a synthetic sdist package with the given number of files. Half of the contents of each file is random, so
+    compression ratio is similar to the one of real packages
+    """
+
+    module_parts = utils.get_plugin_module_path(plugin_id).split('.')
+    root_folder = '{}-{}'.format(plugin_id, PLUGIN_VERSION)
+    package_folder = '/'.join([root_folder] + module_parts)
+    with tarfile.open(file_path, 'w:gz') as tar:
+        for i in range(file_count):
+            member_name = '{}/module{}.py'.format(package_folder, i) if i else '{}/__init__.py'.format(package_folder)
+            data = binascii.hexlify(os.urandom(file_size // 4)) + b'#' * (file_size - file_size // 4 * 2)
+            member_info = tarfile.TarInfo(member_name)
+            member_info.size = len(data)
+            member_info.mtime = time.time()
+            tar.addfile(member_info, io.BytesIO(data))
+
+
+def _create_server_data(root_path, plugin_count, file_count, file_size):
+    _write_file(
+        os.path.join(root_path, 'plugins', DCC_NAME, 'versions', 'stable-{}.json'.format(
+            utils.get_current_platform())),
+        json.dumps({
+            'platform': utils.get_current_platform(),
+            'version': PLUGIN_VERSION,
+            'file_name': 'artella_{}.zip'.format(DCC_NAME),
+            'url': 'https://updates.artellaapp.com/artella_{}.zip'.format(DCC_NAME)}).encode('utf-8'))
+
+    for i in range(plugin_count):
+        plugin_id = _get_plugin_id(i)
+        file_name = '{}-{}.tar.gz'.format(plugin_id, PLUGIN_VERSION)
+        file_path = os.path.join(root_path, 'packages', file_name)
+        if not os.path.isdir(os.path.dirname(file_path)):
+            os.makedirs(os.path.dirname(file_path))
+        _create_sdist(file_path, plugin_id, file_count, file_size)
+        with open(file_path, 'rb') as fh:
+            file_data = fh.read()
+        release = {
+            'filename': file_name,
+            'packagetype': 'sdist',
+            'size': len(file_data),
+            'upload_time': '2021-01-01T00:00:00',
+            'url': 'https://files.pythonhosted.org/packages/{}'.format(file_name),
+            'digests': {'sha256': hashlib.sha256(file_data).hexdigest()}
+        }
+        pypi_data = {
+            'info': {
+                'author': 'Artella',
+                'author_email': 'support@artella.com',
+                'summary': 'Synthetic benchmark plugin {}'.format(i),
+                'version': PLUGIN_VERSION
+            },
+            'releases': {PLUGIN_VERSION: [release]},
+            'urls': [release]
+        }
+        _write_file(os.path.join(root_path, 'pypi', plugin_id, 'json'), json.dumps(pypi_data).encode('utf-8'))
+
+
+@pytest.fixture(scope='module')
+def fake_server():
+    """
+    Starts a local HTTP server serving synthetic PyPI and Artella update server data and points the updater to it
+    """
+
+    plugin_count = _get_int_env(PLUGINS_ENV, 20)
+    root_path = tempfile.mkdtemp(prefix='artella-updater-benchmark-')
+    _create_server_data(
+        root_path, plugin_count, _get_int_env(FILES_ENV, 200), _get_int_env(FILE_SIZE_ENV, 16384))
+
+    _FakeServerRequestHandler.root_path = root_path
+    server = _ThreadingHTTPServer(('127.0.0.1', 0), _FakeServerRequestHandler)
+    server_thread = threading.Thread(target=server.serve_forever)
+    server_thread.daemon = True
+    server_thread.start()
+
+    # Benchmarks measure updater code, so the fake server is not rate limited
+    previous_rate_limits = os.environ.get(ratelimit.RATE_LIMITS_ENV, None)
+    os.environ[ratelimit.RATE_LIMITS_ENV] = '127.0.0.1=0'
+    ratelimit.reset()
+
+    previous_mirror_url = utils.get_mirror_url()
+    utils.set_mirror_url('http://127.0.0.1:{}'.format(server.server_address[1]))
+    try:
+        yield {'root_path': root_path, 'plugin_ids': [_get_plugin_id(i) for i in range(plugin_count)]}
+    finally:
+        utils.set_mirror_url(previous_mirror_url)
+        if previous_rate_limits is None:
+            os.environ.pop(ratelimit.RATE_LIMITS_ENV, None)
+        else:
+            os.environ[ratelimit.RATE_LIMITS_ENV] = previous_rate_limits
+        ratelimit.reset()
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(root_path, ignore_errors=True)
+
+
+@pytest.fixture(scope='module')
+def baseline():
+    baseline_path = os.environ.get(BASELINE_PATH_ENV, None) or os.path.join(
+        tempfile.gettempdir(), 'artella-updater-benchmarks.json')
+    baseline_data = dict()
+    if os.path.isfile(baseline_path):
+        with open(baseline_path, 'r') as fh:
+            baseline_data = json.load(fh)
+
+    measurements = dict()
+    yield {'data': baseline_data, 'measurements': measurements}
+
+    if not measurements:
+        return
+    update = bool(os.environ.get(UPDATE_BASELINE_ENV, None))
+    for benchmark_name, benchmark_time in measurements.items():
+        if update or benchmark_name not in baseline_data:
+            baseline_data[benchmark_name] = benchmark_time
+    if not os.path.isdir(os.path.dirname(baseline_path)):
+        os.makedirs(os.path.dirname(baseline_path))
+    with open(baseline_path, 'w') as fh:
+        json.dump(baseline_data, fh, indent=4, sort_keys=True)
+
+
+def _benchmark(baseline, name, fn, repeat=REPEAT):
+    """
+    Calls given function several times and checks that its best time is not slower than the baseline one
+    """
+
+    best_time = None
+    for _ in range(repeat):
+        start_time = time.time()
+        fn()
+        elapsed_time = time.time() - start_time
+        best_time = elapsed_time if best_time is None else min(best_time, elapsed_time)
+
+    benchmark_key = '{}[{}x{}x{}]'.format(
+        name, _get_int_env(PLUGINS_ENV, 20), _get_int_env(FILES_ENV, 200), _get_int_env(FILE_SIZE_ENV, 16384))
+    baseline['measurements'][benchmark_key] = best_time
+    baseline_time = baseline['data'].get(benchmark_key, None)
+    if baseline_time is None or os.environ.get(UPDATE_BASELINE_ENV, None):
+        return best_time
+
+    factor = float(os.environ.get(FACTOR_ENV, None) or 1.5)
+    max_time = baseline_time * factor + MIN_TOLERANCE
+    assert best_time <= max_time, '{} regressed: {:.4f}s > {:.4f}s (baseline {:.4f}s x {})'.format(
+        benchmark_key, best_time, max_time, baseline_time, factor)
+
+    return best_time
+
+
+def test_get_pypi_info(fake_server, baseline):
+    plugin_id = fake_server['plugin_ids'][0]
+
+    assert utils.get_pypi_info(plugin_id).get('version') == PLUGIN_VERSION
+    _benchmark(baseline, 'get_pypi_info', lambda: utils.get_pypi_info(plugin_id))
+
+
+def test_get_latest_stable_artella_dcc_plugin_info(fake_server, baseline):
+
+    def _get_info():
+        return utils.get_latest_stable_artella_dcc_plugin_info(dcc_name=DCC_NAME)
+
+    assert _get_info().get('version') == PLUGIN_VERSION
+    _benchmark(baseline, 'get_latest_stable_artella_dcc_plugin_info', _get_info)
+
+
+def test_download_and_extract_package_from_pypi(fake_server, baseline):
+    plugin_id = fake_server['plugin_ids'][0]
+    pypi_info = utils.get_pypi_info(plugin_id)
+    module_path = utils.get_plugin_module_path(plugin_id)
+    temp_path = tempfile.mkdtemp(prefix='artella-updater-benchmark-')
+
+    def _download_and_extract():
+        install_path = tempfile.mkdtemp(dir=temp_path)
+        extracted_paths = utils.download_and_extract_package_from_pypi(
+            pypi_info['url'], os.path.join(temp_path, pypi_info['filename']), install_path,
+            package_path=module_path, digests=pypi_info['digests'])
+        assert extracted_paths
+
+    try:
+        _benchmark(baseline, 'download_and_extract_package_from_pypi', _download_and_extract)
+    finally:
+        shutil.rmtree(temp_path, ignore_errors=True)
+
+
+def test_fill_data(fake_server, baseline):
+    """
+    Headless equivalent of UpdaterWindow._fill_data: retrieves installed versions and PyPI information of all plugins
+    """
+
+    plugin_ids = fake_server['plugin_ids']
+
+    def _fill_data():
+        plugins_pypi_info = utils.get_plugins_pypi_info(plugin_ids)
+        plugins_data = list()
+        for plugin_id in plugin_ids:
+            pypi_info = plugins_pypi_info.get(plugin_id, None)
+            if not pypi_info:
+                continue
+            plugins_data.append({
+                'id': plugin_id,
+                'version': utils.get_installed_plugin_version(plugin_id, import_version=False),
+                'latest_version': pypi_info.get('version', ''),
+                'upload_date': pypi_info.get('upload_date', ''),
+                'size': pypi_info.get('size', ''),
+                'url': pypi_info.get('url', '')
+            })
+        assert len(plugins_data) == len(plugin_ids)
+
+    _benchmark(baseline, 'fill_data', _fill_data)
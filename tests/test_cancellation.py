@@ -0,0 +1,107 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for Artella Updater cooperative cancellation
+"""
+
+import os
+import threading
+
+import pytest
+
+pytest.importorskip('artella.core')
+
+from artella.plugins.updater import utils, cancellation    # noqa: E402
+
+
+class _CancelAfterChecks(cancellation.CancellationToken):
+    """
+    Token that cancels itself after being checked the given number of times
+    """
+
+    def __init__(self, checks):
+        super(_CancelAfterChecks, self).__init__()
+
+        self._checks = checks
+
+    def raise_if_cancelled(self):
+        self._checks -= 1
+        if self._checks < 0:
+            self.cancel()
+        super(_CancelAfterChecks, self).raise_if_cancelled()
+
+
+def test_token_callbacks():
+    calls = list()
+    cancel_token = cancellation.CancellationToken()
+    cancel_token.add_callback(lambda: calls.append('first'))
+    cancel_token.add_callback(lambda: 1 / 0)
+    cancel_token.add_callback(lambda: calls.append('second'))
+
+    assert not cancel_token.is_cancelled()
+    cancellation.raise_if_cancelled(None)
+    cancellation.raise_if_cancelled(cancel_token)
+
+    cancel_token.cancel()
+    cancel_token.cancel()
+    cancel_token.add_callback(lambda: calls.append('after'))
+
+    assert cancel_token.is_cancelled()
+    assert calls == ['first', 'second', 'after']
+    with pytest.raises(cancellation.CancelledError):
+        cancellation.raise_if_cancelled(cancel_token)
+
+
+def test_token_wait():
+    cancel_token = cancellation.CancellationToken()
+
+    assert not cancel_token.wait(0.01)
+
+    timer = threading.Timer(0.05, cancel_token.cancel)
+    timer.start()
+    try:
+        assert cancel_token.wait(5)
+    finally:
+        timer.cancel()
+
+
+def test_cancel_all():
+    cancel_tokens = [cancellation.CancellationToken() for _ in range(3)]
+
+    cancellation.cancel_all()
+
+    assert all(cancel_token.is_cancelled() for cancel_token in cancel_tokens)
+
+
+def test_cancelled_download_removes_partial_file(http_server, tmpdir):
+    http_server.routes['/package.tar.gz'] = (200, dict(), os.urandom(utils.DOWNLOAD_CHUNK_SIZE * 16))
+    file_path = str(tmpdir.join('package.tar.gz'))
+
+    with pytest.raises(cancellation.CancelledError):
+        utils.download_package_from_pypi(
+            http_server.url('/package.tar.gz'), file_path, cancel_token=_CancelAfterChecks(4))
+
+    assert not os.path.exists(file_path)
+
+
+def test_run_in_parallel_stops_processing_items():
+    cancel_token = cancellation.CancellationToken()
+    processed_items = list()
+
+    def _process(item):
+        processed_items.append(item)
+        if item == 2:
+            cancel_token.cancel()
+        return item
+
+    with pytest.raises(cancellation.CancelledError):
+        utils.run_in_parallel(_process, range(100), jobs=2, cancel_token=cancel_token)
+
+    assert 2 in processed_items
+    assert len(processed_items) < 100
+
+
+def test_run_in_parallel():
+    assert utils.run_in_parallel(lambda item: item * 2, range(20), jobs=4) == [item * 2 for item in range(20)]
+    assert utils.run_in_parallel(lambda item: item * 2, range(3)) == [0, 2, 4]
@@ -0,0 +1,142 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for Artella Updater command line interface
+"""
+
+import os
+import io
+import json
+import hashlib
+import tarfile
+
+import pytest
+
+pytest.importorskip('artella.core')
+
+from artella.plugins.updater import cli, utils, manifest    # noqa: E402
+
+PLUGIN_ID = 'artella-plugins-clitest'
+PLUGIN_VERSION = '1.2.0'
+
+
+@pytest.fixture()
+def mirror_path(tmpdir, monkeypatch):
+    """
+    Creates a mirror folder with the PyPI information and package of a plugin and uses a temporary manifest
+    """
+
+    mirror_path = str(tmpdir.mkdir('mirror'))
+    file_name = '{}-{}.tar.gz'.format(PLUGIN_ID, PLUGIN_VERSION)
+    file_path = os.path.join(mirror_path, 'packages', file_name)
+    os.makedirs(os.path.dirname(file_path))
+    with tarfile.open(file_path, 'w:gz') as tar:
+        data = b'VERSION = "1.2.0"\n'
+        member_info = tarfile.TarInfo('{}-{}/artella/plugins/clitest/__init__.py'.format(PLUGIN_ID, PLUGIN_VERSION))
+        member_info.size = len(data)
+        tar.addfile(member_info, io.BytesIO(data))
+    with open(file_path, 'rb') as fh:
+        file_hash = hashlib.sha256(fh.read()).hexdigest()
+    os.makedirs(os.path.join(mirror_path, 'pypi', PLUGIN_ID))
+    with open(os.path.join(mirror_path, 'pypi', PLUGIN_ID, 'json'), 'w') as fh:
+        json.dump({
+            'info': {'author': 'Artella', 'summary': 'CLI test plugin', 'version': PLUGIN_VERSION},
+            'releases': {PLUGIN_VERSION: [{
+                'filename': file_name, 'packagetype': 'sdist', 'size': 1024, 'upload_time': '2021-01-01T00:00:00',
+                'url': 'https://files.pythonhosted.org/packages/{}'.format(file_name),
+                'digests': {'sha256': file_hash}}]}}, fh)
+
+    monkeypatch.setenv(manifest.MANIFEST_PATH_ENV, str(tmpdir.join('installed-plugins.json')))
+    manifest.reload()
+    previous_mirror_url = utils.get_mirror_url()
+    yield mirror_path
+    utils.set_mirror_url(previous_mirror_url)
+    utils.clear_plugin_install_paths_cache()
+    manifest.reload()
+
+
+def _run(capsys, *args):
+    exit_code = cli.main(list(args) + ['--json'])
+    output = capsys.readouterr().out
+
+    return exit_code, json.loads(output) if output.strip() else None
+
+
+def test_download(mirror_path, tmpdir, capsys):
+    output_path = str(tmpdir.join('downloads'))
+
+    exit_code, result = _run(capsys, 'download', PLUGIN_ID, '--mirror', mirror_path, '-o', output_path)
+
+    assert exit_code == 0
+    assert result['plugins'][0]['version'] == PLUGIN_VERSION
+    assert os.path.isfile(os.path.join(output_path, '{}-{}.tar.gz'.format(PLUGIN_ID, PLUGIN_VERSION)))
+
+
+def test_install_into_custom_path(mirror_path, tmpdir, capsys):
+    install_path = str(tmpdir.join('install'))
+    install_args = ('install', PLUGIN_ID, '--mirror', mirror_path, '--install-path', install_path, '--no-compile')
+
+    exit_code, result = _run(capsys, *install_args)
+
+    assert exit_code == 0
+    assert result['plugins'][0]['status'] == 'installed'
+    assert os.path.isfile(os.path.join(install_path, 'clitest', '__init__.py'))
+    assert manifest.get_installed_plugin_version(PLUGIN_ID, install_path) == PLUGIN_VERSION
+
+    exit_code, result = _run(capsys, *install_args)
+
+    assert exit_code == 0
+    assert result['plugins'][0]['status'] == 'updated'
+
+    # Plugin is not loaded from the custom install path, so it must not be reported as installed there
+    exit_code, result = _run(capsys, 'status', PLUGIN_ID)
+
+    assert result['plugins'][0] == {'id': PLUGIN_ID, 'installed_version': None, 'install_path': None}
+
+
+def test_unknown_plugin_fails(mirror_path, tmpdir, capsys):
+    exit_code, result = _run(
+        capsys, 'download', 'artella-plugins-unknown', '--mirror', mirror_path, '-o', str(tmpdir))
+
+    assert exit_code == 1
+    assert result['plugins'][0]['error']
+
+
+@pytest.mark.parametrize('jobs', ['1', '4'])
+def test_plugin_errors_are_reported(mirror_path, tmpdir, capsys, monkeypatch, jobs):
+    get_pypi_info = utils.get_pypi_info
+
+    def _get_pypi_info(plugin_id, *args, **kwargs):
+        if plugin_id == 'artella-plugins-broken':
+            raise ValueError('Invalid PyPI information')
+        return get_pypi_info(plugin_id, *args, **kwargs)
+
+    monkeypatch.setattr(utils, 'get_pypi_info', _get_pypi_info)
+    check_args = ('check', 'artella-plugins-broken', PLUGIN_ID, '--mirror', mirror_path, '--jobs', jobs)
+
+    exit_code, result = _run(capsys, *check_args)
+
+    assert exit_code == 1
+    assert result['plugins'][0] == {'id': 'artella-plugins-broken', 'error': 'Invalid PyPI information'}
+    assert result['plugins'][1]['latest_version'] == PLUGIN_VERSION
+
+    assert cli.main(list(check_args)) == 1
+    assert 'artella-plugins-broken: ERROR Invalid PyPI information' in capsys.readouterr().out
+
+
+def test_check_without_plugin_ids(mirror_path, tmpdir, capsys, monkeypatch):
+    monkeypatch.setattr(cli.dcc, 'name', lambda: None)
+
+    exit_code, result = _run(capsys, 'check', '--mirror', mirror_path)
+
+    assert exit_code == 1
+    assert result['error']
+
+    # Plugins installed by the updater are checked if no plugin IDs are given
+    install_path = str(tmpdir.join('install'))
+    _run(capsys, 'install', PLUGIN_ID, '--mirror', mirror_path, '--install-path', install_path, '--no-compile')
+    exit_code, result = _run(capsys, 'check', '--mirror', mirror_path)
+
+    assert exit_code == 0
+    assert [plugin_result['id'] for plugin_result in result['plugins']] == [PLUGIN_ID]
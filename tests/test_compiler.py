@@ -0,0 +1,57 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for Artella Updater plugins byte-compilation
+"""
+
+import os
+import sys
+
+import pytest
+
+pytest.importorskip('artella.core')
+
+from artella.plugins.updater import compiler    # noqa: E402
+
+
+def _compiled_files(package_path):
+    compiled_files = list()
+    for root, _, file_names in os.walk(package_path):
+        compiled_files.extend(file_name for file_name in file_names if file_name.endswith('.pyc'))
+
+    return compiled_files
+
+
+def test_compile_package(tmpdir):
+    package_path = str(tmpdir.mkdir('about'))
+    for i in range(4):
+        tmpdir.join('about', 'module{}.py'.format(i)).write('value = {}\n'.format(i))
+
+    assert compiler.compile_package(package_path, jobs=2, interpreters=list())
+    assert len(_compiled_files(package_path)) == 4
+
+
+def test_compile_package_with_invalid_file(tmpdir):
+    package_path = str(tmpdir.mkdir('about'))
+    tmpdir.join('about', 'valid.py').write('value = 1\n')
+    tmpdir.join('about', 'invalid.py').write('def invalid(:\n')
+
+    assert not compiler.compile_package(package_path, jobs=1, interpreters=list())
+    assert not compiler.compile_package(str(tmpdir.join('missing')))
+
+
+def test_compile_with_other_interpreter(tmpdir):
+    package_path = str(tmpdir.mkdir('about'))
+    tmpdir.join('about', '__init__.py').write('value = 1\n')
+
+    assert compiler.compile_with_interpreter(sys.executable, package_path, jobs=2)
+    assert _compiled_files(package_path)
+    assert not compiler.compile_with_interpreter(str(tmpdir.join('missing-python')), package_path)
+
+
+def test_missing_interpreters_are_ignored(tmpdir, monkeypatch):
+    monkeypatch.setenv(compiler.INTERPRETERS_ENV, os.pathsep.join(
+        [sys.executable, str(tmpdir.join('missing-python')), sys.executable, '']))
+
+    assert compiler.get_interpreters() == [sys.executable]
@@ -0,0 +1,79 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for Artella Updater compressed metadata responses
+"""
+
+import gzip
+import json
+import zlib
+
+import pytest
+
+pytest.importorskip('artella.core')
+
+from artella.plugins.updater import utils    # noqa: E402
+
+PYPI_DOCUMENT = json.dumps({
+    'info': {'author': 'Artella', 'summary': 'About plugin', 'version': '1.0.0'},
+    'releases': {'1.0.0': [{
+        'filename': 'artella-plugins-about-1.0.0.tar.gz', 'packagetype': 'sdist', 'size': 2048,
+        'upload_time': '2021-01-01T00:00:00', 'digests': {'sha256': 'a' * 64},
+        'url': 'https://files.pythonhosted.org/artella-plugins-about-1.0.0.tar.gz'}]},
+    'description': 'Artella plugin. ' * 1000}).encode('utf-8')
+
+
+def _raw_deflate(data):
+    compressor = zlib.compressobj(9, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+@pytest.mark.parametrize('encoding, compress', [
+    ('gzip', gzip.compress if hasattr(gzip, 'compress') else None),
+    ('deflate', zlib.compress),
+    ('deflate', _raw_deflate),
+])
+def test_compressed_responses_are_decoded(http_server, encoding, compress):
+    if compress is None:
+        pytest.skip('gzip.compress is not available')
+    compressed_data = compress(PYPI_DOCUMENT)
+    http_server.routes['/json'] = (200, {'Content-Encoding': encoding}, compressed_data)
+
+    rsp = utils.open_url(http_server.url('/json'), compressed=True)
+    data = rsp.read(100) + rsp.read(1000) + rsp.read()
+
+    assert data == PYPI_DOCUMENT
+    assert rsp.wire_bytes == len(compressed_data) < len(PYPI_DOCUMENT)
+    assert 'gzip' in http_server.requests[0][1]['accept-encoding']
+
+
+@pytest.mark.parametrize('compress', [zlib.compress, _raw_deflate])
+def test_deflate_decompressor_byte_chunks(compress):
+    compressed_data = compress(PYPI_DOCUMENT)
+    decompressor = utils.create_decompressor('deflate')
+    data = b''.join(decompressor.decompress(compressed_data[i:i + 1]) for i in range(len(compressed_data)))
+
+    assert data + decompressor.flush() == PYPI_DOCUMENT
+    assert utils.create_decompressor('identity') is None
+
+
+def test_uncompressed_responses(http_server):
+    http_server.routes['/json'] = (200, dict(), PYPI_DOCUMENT)
+    http_server.routes['/package'] = (200, dict(), b'package')
+
+    assert utils.open_url(http_server.url('/json'), compressed=True).read() == PYPI_DOCUMENT
+    assert utils.open_url(http_server.url('/package')).read() == b'package'
+    assert 'gzip' not in http_server.requests[1][1].get('accept-encoding', '')
+
+
+def test_compressed_pypi_info(http_server, monkeypatch):
+    monkeypatch.setattr(utils, 'get_pypi_url', lambda plugin_id: http_server.url('/pypi/{}/json'.format(plugin_id)))
+    http_server.routes['/pypi/artella-plugins-about/json'] = (
+        200, {'Content-Encoding': 'deflate'}, zlib.compress(PYPI_DOCUMENT))
+
+    pypi_info = utils.get_pypi_info('artella-plugins-about')
+
+    assert pypi_info['version'] == '1.0.0'
+    assert pypi_info['filename'] == 'artella-plugins-about-1.0.0.tar.gz'
+    assert pypi_info['digests'] == {'sha256': 'a' * 64}
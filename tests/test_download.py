@@ -0,0 +1,54 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for Artella Updater package downloads
+"""
+
+import os
+import hashlib
+
+import pytest
+
+pytest.importorskip('artella.core')
+
+from artella.plugins.updater import utils    # noqa: E402
+
+try:
+    from urllib.request import pathname2url
+except ImportError:
+    from urllib import pathname2url
+
+PACKAGE_DATA = b'artella' * 32768
+
+
+@pytest.fixture()
+def package_url(tmpdir):
+    file_path = str(tmpdir.join('artella-plugins-about-1.0.0.tar.gz'))
+    with open(file_path, 'wb') as fh:
+        fh.write(PACKAGE_DATA)
+
+    return 'file:{}'.format(pathname2url(file_path))
+
+
+def test_download_with_valid_digests(package_url, tmpdir):
+    file_path = str(tmpdir.join('download.tar.gz'))
+    digests = {'sha256': hashlib.sha256(PACKAGE_DATA).hexdigest().upper()}
+
+    assert utils.download_package_from_pypi(package_url, file_path, digests=digests)
+    with open(file_path, 'rb') as fh:
+        assert fh.read() == PACKAGE_DATA
+
+
+def test_digest_mismatch_rejects_file(package_url, tmpdir):
+    file_path = str(tmpdir.join('download.tar.gz'))
+    digests = {'sha256': hashlib.sha256(PACKAGE_DATA).hexdigest(), 'blake2b_256': '0' * 64}
+    if 'blake2b_256' not in utils.get_digest_hashers(digests):
+        digests['sha256'] = '0' * 64
+
+    assert not utils.download_package_from_pypi(package_url, file_path, digests=digests)
+    assert not os.path.exists(file_path)
+
+
+def test_unknown_digests_are_ignored():
+    assert list(utils.get_digest_hashers({'md5': '0' * 32, 'sha256': None})) == list()
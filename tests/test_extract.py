@@ -0,0 +1,185 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for Artella Updater package extraction
+"""
+
+import os
+import io
+import sys
+import hashlib
+import tarfile
+import zipfile
+
+import pytest
+
+pytest.importorskip('artella.core')
+
+from artella.plugins.updater import utils    # noqa: E402
+
+PACKAGE_PATH = 'artella.plugins.about'
+
+
+def _create_tar(file_path, members):
+    with tarfile.open(file_path, 'w:gz') as tar:
+        for member_name, data in members.items():
+            member_info = tarfile.TarInfo(member_name)
+            member_info.size = len(data)
+            tar.addfile(member_info, io.BytesIO(data))
+
+
+def _create_zip(file_path, members):
+    with zipfile.ZipFile(file_path, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        for member_name, data in members.items():
+            zip_file.writestr(member_name, data)
+
+
+def test_members_map_sdist():
+    members_map = utils.get_package_members_map([
+        'artella-plugins-about-1.0.0/setup.py',
+        'artella-plugins-about-1.0.0/PKG-INFO',
+        'artella-plugins-about-1.0.0/tests/artella/plugins/about/test.py',
+        'artella-plugins-about-1.0.0/artella/plugins/about/__init__.py',
+        'artella-plugins-about-1.0.0/artella/plugins/about/__version__.py',
+        'artella-plugins-about-1.0.0/artella_plugins_about.egg-info/PKG-INFO',
+    ], PACKAGE_PATH)
+
+    assert members_map == {
+        'artella-plugins-about-1.0.0/PKG-INFO': 'artella_plugins_about-1.0.0.egg-info/PKG-INFO',
+        'artella-plugins-about-1.0.0/artella/plugins/about/__init__.py': 'about/__init__.py',
+        'artella-plugins-about-1.0.0/artella/plugins/about/__version__.py': 'about/__version__.py',
+    }
+
+
+def test_members_map_src_layout_and_wheel_data():
+    members_map = utils.get_package_members_map([
+        'artella_plugins_about-2.0.0rc1/src/artella/plugins/about/__init__.py',
+        'artella_plugins_about-2.0.0.data/purelib/artella/plugins/about/widget.py',
+        'artella_plugins_about-2.0.0.dist-info/METADATA',
+        'artella_plugins_about-2.0.0.dist-info/RECORD',
+        '../artella/plugins/about/evil.py',
+    ], PACKAGE_PATH)
+
+    assert members_map == {
+        'artella_plugins_about-2.0.0rc1/src/artella/plugins/about/__init__.py': 'about/__init__.py',
+        'artella_plugins_about-2.0.0.data/purelib/artella/plugins/about/widget.py': 'about/widget.py',
+        'artella_plugins_about-2.0.0.dist-info/METADATA': 'artella_plugins_about-2.0.0.dist-info/METADATA',
+    }
+
+
+def test_extract_sdist_keeps_metadata_and_removes_stale_one(tmpdir):
+    install_path = str(tmpdir.mkdir('install'))
+    stale_metadata_path = os.path.join(install_path, 'artella_plugins_about-0.9.0.egg-info')
+    os.makedirs(stale_metadata_path)
+    other_metadata_path = os.path.join(install_path, 'artella_plugins_core-1.0.0.dist-info')
+    os.makedirs(other_metadata_path)
+
+    file_path = str(tmpdir.join('artella-plugins-about-1.0.0.tar.gz'))
+    _create_tar(file_path, {
+        'artella-plugins-about-1.0.0/setup.py': b'',
+        'artella-plugins-about-1.0.0/PKG-INFO': b'Metadata-Version: 2.1\nName: artella-plugins-about\nVersion: 1.0.0\n',
+        'artella-plugins-about-1.0.0/artella/plugins/about/__init__.py': b'',
+    })
+
+    extracted_paths = utils.extract_package(file_path, install_path, package_path=PACKAGE_PATH)
+
+    pkg_info_path = os.path.join(install_path, 'artella_plugins_about-1.0.0.egg-info', 'PKG-INFO')
+    assert sorted(extracted_paths) == sorted([pkg_info_path, os.path.join(install_path, 'about', '__init__.py')])
+    assert not os.path.exists(os.path.join(install_path, 'setup.py'))
+    assert not os.path.exists(stale_metadata_path)
+    assert os.path.isdir(other_metadata_path)
+    with open(pkg_info_path, 'r') as fh:
+        assert 'Version: 1.0.0' in fh.read()
+
+
+def test_preferred_release_is_compatible_wheel():
+    python_tag = 'py{}'.format(sys.version_info[0])
+    sdist = {'filename': 'artella-plugins-about-1.0.0.tar.gz'}
+    binary_wheel = {'filename': 'artella_plugins_about-1.0.0-cp39-cp39-win_amd64.whl'}
+    pure_wheel = {'filename': 'artella_plugins_about-1.0.0-{}-none-any.whl'.format(python_tag)}
+    other_python_wheel = {'filename': 'artella_plugins_about-1.0.0-py1-none-any.whl'}
+
+    assert utils.get_preferred_release([sdist, binary_wheel, pure_wheel]) is pure_wheel
+    assert utils.get_preferred_release([sdist, binary_wheel, other_python_wheel]) is sdist
+    assert utils.get_preferred_release([binary_wheel]) is None
+
+
+def test_extract_wheel_in_parallel(tmpdir):
+    install_path = str(tmpdir.mkdir('install'))
+    file_path = str(tmpdir.join('artella_plugins_about-1.0.0-py2.py3-none-any.whl'))
+    members = dict(
+        ('artella/plugins/about/module{}.py'.format(i), 'value = {}\n'.format(i).encode('utf-8')) for i in range(20))
+    members['artella/__init__.py'] = b''
+    _create_zip(file_path, members)
+
+    file_hashes = dict()
+    extracted_paths = utils.extract_package(
+        file_path, install_path, package_path=PACKAGE_PATH, jobs=4, file_hashes=file_hashes)
+
+    assert len(extracted_paths) == 20
+    assert sorted(file_hashes.keys()) == sorted(extracted_paths)
+    assert not os.path.exists(os.path.join(install_path, '__init__.py'))
+    with open(os.path.join(install_path, 'about', 'module7.py'), 'rb') as fh:
+        assert fh.read() == b'value = 7\n'
+
+
+def test_extract_sdist_pipeline_with_big_members(tmpdir, monkeypatch):
+    monkeypatch.setattr(utils, 'PIPELINE_MAX_MEMBER_SIZE', 1024)
+    install_path = str(tmpdir.mkdir('install'))
+    file_path = str(tmpdir.join('artella-plugins-about-1.0.0.tar.gz'))
+    members = dict(
+        ('artella-plugins-about-1.0.0/artella/plugins/about/module{}.py'.format(i), os.urandom(512 * (i + 1)))
+        for i in range(8))
+    _create_tar(file_path, members)
+
+    file_hashes = dict()
+    extracted_paths = utils.extract_package(
+        file_path, install_path, package_path=PACKAGE_PATH, jobs=2, file_hashes=file_hashes)
+
+    assert len(extracted_paths) == len(members)
+    for member_name, data in members.items():
+        target_path = os.path.join(install_path, 'about', member_name.rsplit('/', 1)[-1])
+        with open(target_path, 'rb') as fh:
+            assert fh.read() == data
+        assert file_hashes[target_path] == hashlib.sha256(data).hexdigest()
+
+
+def test_extract_sdist_pipeline_memory_is_bounded(tmpdir, monkeypatch):
+    queued_sizes = list()
+    acquire = utils._ByteBudget.acquire
+
+    def _acquire(budget, size, cancel_token=None):
+        acquire(budget, size, cancel_token=cancel_token)
+        queued_sizes.append(budget._size)
+
+    monkeypatch.setattr(utils._ByteBudget, 'acquire', _acquire)
+    monkeypatch.setattr(utils, 'PIPELINE_QUEUE_MAX_SIZE', 4096)
+    install_path = str(tmpdir.mkdir('install'))
+    file_path = str(tmpdir.join('artella-plugins-about-1.0.0.tar.gz'))
+    members = dict(
+        ('artella-plugins-about-1.0.0/artella/plugins/about/module{}.py'.format(i), os.urandom(1000))
+        for i in range(50))
+    _create_tar(file_path, members)
+
+    extracted_paths = utils.extract_package(file_path, install_path, package_path=PACKAGE_PATH, jobs=2)
+
+    assert len(extracted_paths) == len(members)
+    assert len(queued_sizes) == len(members)
+    assert max(queued_sizes) <= 4096
+
+
+def test_find_extracted_folder(tmpdir):
+    install_path = str(tmpdir)
+    os.makedirs(os.path.join(install_path, 'about', 'widgets', 'about'))
+    extracted_paths = [
+        os.path.join(install_path, 'about', 'widgets', 'about', '__init__.py'),
+        os.path.join(install_path, 'about', '__init__.py'),
+        os.path.join(install_path, 'artella_plugins_about-1.0.0.egg-info', 'PKG-INFO'),
+    ]
+
+    assert utils.find_extracted_folder(install_path, extracted_paths, ['about']) == os.path.join(
+        install_path, 'about')
+    assert utils.find_extracted_folder(install_path, extracted_paths, ['widgets']) == os.path.join(
+        install_path, 'about', 'widgets')
+    assert utils.find_extracted_folder(install_path, extracted_paths, ['updater']) is None
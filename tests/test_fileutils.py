@@ -0,0 +1,69 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for Artella Updater file functions
+"""
+
+import os
+
+import pytest
+
+pytest.importorskip('artella.core')
+
+from artella.plugins.updater import fileutils    # noqa: E402
+
+
+def test_write_file_replaces_file(tmpdir):
+    file_path = str(tmpdir.join('mirror', 'stable-linux.json'))
+
+    fileutils.write_file(file_path, b'{"version": "1.0.0"}')
+    fileutils.write_file(file_path, u'{"version": "2.0.0"}')
+
+    with open(file_path, 'rb') as fh:
+        assert fh.read() == b'{"version": "2.0.0"}'
+    assert os.listdir(os.path.dirname(file_path)) == ['stable-linux.json']
+
+
+def test_failed_write_keeps_file(tmpdir, monkeypatch):
+    file_path = str(tmpdir.join('stable-linux.json'))
+    fileutils.write_file(file_path, b'{"version": "1.0.0"}')
+
+    def _replace(*args, **kwargs):
+        raise OSError('Access denied')
+
+    monkeypatch.setattr(fileutils, 'replace_file', _replace)
+    with pytest.raises(OSError):
+        fileutils.write_file(file_path, b'{"version": "2.0.0"}')
+
+    with open(file_path, 'rb') as fh:
+        assert fh.read() == b'{"version": "1.0.0"}'
+    assert os.listdir(str(tmpdir)) == ['stable-linux.json']
+
+
+def test_replace_file(tmpdir):
+    source_path = str(tmpdir.join('package.tar.gz.part'))
+    target_path = str(tmpdir.join('package.tar.gz'))
+    for file_path, data in ((source_path, b'new'), (target_path, b'old')):
+        with open(file_path, 'wb') as fh:
+            fh.write(data)
+
+    fileutils.replace_file(source_path, target_path)
+
+    assert not os.path.exists(source_path)
+    with open(target_path, 'rb') as fh:
+        assert fh.read() == b'new'
+
+
+def test_file_lock_removes_stale_lock(tmpdir):
+    file_path = str(tmpdir.join('installed-plugins.json'))
+    with open('{}.lock'.format(file_path), 'w') as fh:
+        fh.write('0')
+    stale_time = os.path.getmtime('{}.lock'.format(file_path)) - 120
+    os.utime('{}.lock'.format(file_path), (stale_time, stale_time))
+
+    with fileutils.FileLock(file_path, timeout=1.0) as lock:
+        assert os.path.isfile(lock.lock_path)
+        with pytest.raises(fileutils.FileLockTimeoutError):
+            fileutils.FileLock(file_path, timeout=0.1).acquire()
+    assert not os.path.isfile(lock.lock_path)
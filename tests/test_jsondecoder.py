@@ -0,0 +1,87 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for Artella Updater JSON decoding
+"""
+
+import json
+
+import pytest
+
+pytest.importorskip('artella.core')
+
+from artella.plugins.updater import jsondecoder    # noqa: E402
+
+
+def _get_release(version):
+    return [{
+        'filename': 'artella-plugins-about-{}.tar.gz'.format(version), 'packagetype': 'sdist',
+        'comment_text': 'Release with "info": {} and "releases": [] inside strings', 'digests': {'sha256': 'a' * 64}}]
+
+
+PYPI_DATA = {
+    'last_serial': 1,
+    'urls': _get_release('1.1.0'),
+    'info': {'author': 'Artella', 'summary': 'Plugin with "1.1.0": [ in its summary', 'version': '1.1.0'},
+    'releases': dict((version, _get_release(version)) for version in ('1.0.0', '1.1.0', '1.1.0rc1', '2.0.0.dev0')),
+    'vulnerabilities': []
+}
+
+
+@pytest.fixture(params=[None, 2])
+def pypi_document(request):
+    """
+    Returns PyPI JSON document as it is encoded by PyPI (compact) and indented
+    """
+
+    return json.dumps(PYPI_DATA, indent=request.param)
+
+
+def _expected_document(version):
+    return {'info': PYPI_DATA['info'], 'releases': {version: PYPI_DATA['releases'][version]}}
+
+
+def test_load_pypi_document(pypi_document):
+    assert jsondecoder.load_pypi_document(pypi_document) == _expected_document('1.1.0')
+    assert jsondecoder.load_pypi_document(pypi_document.encode('utf-8')) == _expected_document('1.1.0')
+
+
+def test_load_pypi_document_version(pypi_document):
+    assert jsondecoder.load_pypi_document(pypi_document, version='1.0.0') == _expected_document('1.0.0')
+    assert jsondecoder.load_pypi_document(pypi_document, version='1.1.0rc1') == _expected_document('1.1.0rc1')
+    assert jsondecoder.load_pypi_document(pypi_document, version='3.0.0') == {
+        'info': PYPI_DATA['info'], 'releases': dict()}
+
+
+def test_load_pypi_document_fallback():
+    # Documents that do not follow PyPI layout are fully decoded
+    document = json.dumps({'releases': {'1.0.0': []}, 'info': None})
+
+    assert jsondecoder.load_pypi_document(document) == {'info': None, 'releases': {'1.0.0': []}}
+    assert jsondecoder.load_pypi_document('[1, 2]') == [1, 2]
+    with pytest.raises(ValueError):
+        jsondecoder.load_pypi_document('{"info": {"version": ')
+
+
+@pytest.mark.parametrize('backend_name', jsondecoder.JSON_BACKENDS)
+def test_backends(backend_name):
+    try:
+        jsondecoder.set_backend(backend_name)
+    except ImportError:
+        pytest.skip('JSON backend {} is not available'.format(backend_name))
+    try:
+        document = json.dumps(PYPI_DATA)
+        assert jsondecoder.loads(document) == PYPI_DATA
+        assert jsondecoder.loads(document.encode('utf-8')) == PYPI_DATA
+    finally:
+        jsondecoder.set_backend(None)
+
+
+def test_forced_backend(monkeypatch):
+    monkeypatch.setenv(jsondecoder.JSON_BACKEND_ENV, 'json')
+    jsondecoder.set_backend(None)
+    try:
+        assert jsondecoder.get_backend() is json
+    finally:
+        jsondecoder.set_backend(None)
@@ -0,0 +1,39 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for Artella Updater plugin location functions
+"""
+
+import os
+import sys
+
+import pytest
+
+pytest.importorskip('artella.core')
+
+from artella.plugins.updater import utils    # noqa: E402
+
+PACKAGE_NAME = 'artella_updater_locate_test'
+
+
+@pytest.fixture()
+def package_path(tmpdir, monkeypatch):
+    package_path = str(tmpdir.mkdir(PACKAGE_NAME))
+    with open(os.path.join(package_path, '__init__.py'), 'w') as fh:
+        fh.write('raise RuntimeError("Package must not be imported")\n')
+    monkeypatch.syspath_prepend(str(tmpdir))
+    yield package_path
+    sys.modules.pop(PACKAGE_NAME, None)
+
+
+def test_find_module_locations_does_not_import(package_path):
+    locations = utils.find_module_locations(PACKAGE_NAME)
+
+    assert [os.path.realpath(location) for location in locations] == [os.path.realpath(package_path)]
+    assert PACKAGE_NAME not in sys.modules
+
+
+def test_find_missing_module_locations():
+    assert utils.find_module_locations('artella_updater_missing_package') == list()
+    assert utils.get_loaded_module_locations('artella_updater_missing_package') == list()
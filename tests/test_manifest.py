@@ -0,0 +1,144 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for Artella Updater installed plugins manifest
+"""
+
+import os
+import sys
+import json
+import types
+import subprocess
+
+import pytest
+
+pytest.importorskip('artella.core')
+
+from artella.plugins.updater import utils, manifest, fileutils    # noqa: E402
+
+PLUGIN_ID = 'artella-plugins-manifesttest'
+
+
+@pytest.fixture()
+def manifest_path(tmpdir, monkeypatch):
+    manifest_path = str(tmpdir.join('manifest', 'installed-plugins.json'))
+    monkeypatch.setenv(manifest.MANIFEST_PATH_ENV, manifest_path)
+    manifest.reload()
+    utils.clear_plugin_install_paths_cache()
+    yield manifest_path
+    manifest.reload()
+    utils.clear_plugin_install_paths_cache()
+
+
+def _install(tmpdir, folder_name, version):
+    install_path = str(tmpdir.mkdir(folder_name))
+    package_path = os.path.join(install_path, 'manifesttest')
+    os.makedirs(package_path)
+    file_path = os.path.join(package_path, '__init__.py')
+    assert manifest.register_installed_plugin(
+        PLUGIN_ID, version, install_path, package_path, file_hashes={file_path: '0' * 64})
+
+    return install_path
+
+
+def test_manifest_round_trip(manifest_path, tmpdir):
+    maya_path = _install(tmpdir, 'maya', '1.0.0')
+    custom_path = _install(tmpdir, 'custom', '2.0.0')
+    _install(tmpdir.join('maya'), 'unused', '0.1.0')
+    assert manifest.register_installed_plugin(
+        PLUGIN_ID, '1.1.0', maya_path, os.path.join(maya_path, 'manifesttest'))
+    manifest.reload()
+
+    plugin_data = manifest.get_installed_plugin(PLUGIN_ID, maya_path)
+    assert plugin_data['version'] == '1.1.0'
+    assert plugin_data['interpreter'] == manifest.get_interpreter_key()
+    assert manifest.get_installed_plugin_version(PLUGIN_ID, custom_path) == '2.0.0'
+    assert manifest.get_installed_plugin_version(PLUGIN_ID, str(tmpdir.join('other'))) is None
+    assert manifest.get_installed_plugin_version(PLUGIN_ID, None) is None
+    with open(manifest_path, 'r') as fh:
+        assert len(json.load(fh)['plugins'][PLUGIN_ID]) == 3
+    assert not [file_name for file_name in os.listdir(os.path.dirname(manifest_path)) if file_name.endswith('.tmp')]
+
+
+def test_manifest_entries_belong_to_interpreter(manifest_path, tmpdir, monkeypatch):
+    install_path = _install(tmpdir, 'maya', '1.0.0')
+
+    monkeypatch.setattr(manifest, 'get_interpreter_key', lambda: 'cpython-2.7@/opt/maya')
+
+    assert manifest.get_installed_plugin_version(PLUGIN_ID, install_path) is None
+
+
+def test_manifest_ignores_legacy_entries(manifest_path, tmpdir):
+    install_path = str(tmpdir.mkdir('maya'))
+    os.makedirs(os.path.dirname(manifest_path))
+    with open(manifest_path, 'w') as fh:
+        json.dump({'plugins': {PLUGIN_ID: {
+            'id': PLUGIN_ID, 'version': '1.0.0', 'install_path': install_path, 'package_path': install_path}}}, fh)
+
+    assert manifest.get_installed_plugin_version(PLUGIN_ID, install_path) is None
+
+
+def test_failed_write_keeps_manifest(manifest_path, tmpdir, monkeypatch):
+    install_path = _install(tmpdir, 'maya', '1.0.0')
+
+    def _fsync(*args, **kwargs):
+        raise IOError('Disk full')
+
+    fsync = fileutils.os.fsync
+    monkeypatch.setattr(fileutils.os, 'fsync', _fsync)
+    assert not manifest.register_installed_plugin(
+        PLUGIN_ID, '2.0.0', install_path, os.path.join(install_path, 'manifesttest'))
+    monkeypatch.setattr(fileutils.os, 'fsync', fsync)
+
+    manifest.reload()
+    assert manifest.get_installed_plugin_version(PLUGIN_ID, install_path) == '1.0.0'
+    assert os.listdir(os.path.dirname(manifest_path)) == [os.path.basename(manifest_path)]
+
+
+def test_installed_version_uses_loaded_location(manifest_path, tmpdir, monkeypatch):
+    loaded_path = _install(tmpdir, 'maya', '1.0.0')
+    _install(tmpdir, 'custom', '2.0.0')
+    module_path = utils.get_plugin_module_path(PLUGIN_ID)
+    plugin_module = types.ModuleType(module_path)
+    plugin_module.__path__ = [os.path.join(loaded_path, 'manifesttest')]
+    monkeypatch.setitem(sys.modules, module_path, plugin_module)
+
+    assert utils.get_plugin_install_path(PLUGIN_ID) == loaded_path
+    assert utils.get_installed_plugin_version(PLUGIN_ID, import_version=False) == '1.0.0'
+
+
+def test_concurrent_processes_keep_all_entries(manifest_path, tmpdir):
+    script = '\n'.join((
+        'import os, sys',
+        'from artella.plugins.updater import manifest',
+        'install_path = sys.argv[1]',
+        'for index in range(10):',
+        '    plugin_id = "{}-{}-{}".format(sys.argv[2], os.path.basename(install_path), index)',
+        '    assert manifest.register_installed_plugin(plugin_id, "1.0.0", install_path, install_path)',
+    ))
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(path for path in sys.path if path)
+    processes = [
+        subprocess.Popen(
+            [sys.executable, '-c', script, str(tmpdir.mkdir('process{}'.format(index))), PLUGIN_ID], env=env)
+        for index in range(4)]
+    assert [process.wait() for process in processes] == [0] * 4
+
+    manifest.reload()
+    assert len(manifest.installed_plugins()) == 40
+    assert os.listdir(os.path.dirname(manifest_path)) == [os.path.basename(manifest_path)]
+
+
+def test_locked_manifest_is_not_written(manifest_path, tmpdir, monkeypatch):
+    install_path = _install(tmpdir, 'maya', '1.0.0')
+    monkeypatch.setattr(manifest, 'LOCK_TIMEOUT', 0.1)
+
+    lock = fileutils.FileLock(manifest_path, timeout=0.1)
+    with lock:
+        assert not manifest.register_installed_plugin(
+            PLUGIN_ID, '2.0.0', install_path, os.path.join(install_path, 'manifesttest'))
+    assert not os.path.isfile(lock.lock_path)
+
+    manifest.reload()
+    assert manifest.get_installed_plugin_version(PLUGIN_ID, install_path) == '1.0.0'
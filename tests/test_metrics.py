@@ -0,0 +1,77 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for Artella Updater metrics export
+"""
+
+import socket
+
+import pytest
+
+pytest.importorskip('artella.core')
+
+from artella.plugins.updater import metrics, tracing    # noqa: E402
+
+
+@pytest.fixture()
+def prometheus_sink(tmpdir, monkeypatch):
+    """
+    Sets a Prometheus textfile sink during a test and restores previous metrics and tracing state afterwards
+    """
+
+    monkeypatch.setattr(tracing, '_ENABLED', tracing.is_enabled())
+    previous_sink = metrics._SINK
+    sink = metrics.PrometheusTextfileSink(str(tmpdir.join('metrics', 'updater.prom')))
+    metrics.set_sink(sink)
+    yield sink
+    metrics.set_sink(previous_sink)
+
+
+def _read_metrics(sink):
+    with open(sink._file_path, 'r') as fh:
+        return fh.read().splitlines()
+
+
+def test_prometheus_counters_and_histograms(prometheus_sink):
+    metrics.record_cache_access('install_paths', hit=True)
+    metrics.record_cache_access('install_paths', hit=True)
+    metrics.record_cache_access('install_paths', hit=False)
+    metrics.observe('download_seconds', 0.2, host='pypi.org')
+
+    lines = _read_metrics(prometheus_sink)
+    assert 'artella_updater_cache_requests_total{cache="install_paths",result="hit"} 2' in lines
+    assert 'artella_updater_cache_requests_total{cache="install_paths",result="miss"} 1' in lines
+    assert 'artella_updater_download_seconds_bucket{host="pypi.org",le="0.1"} 0' in lines
+    assert 'artella_updater_download_seconds_bucket{host="pypi.org",le="0.25"} 1' in lines
+    assert 'artella_updater_download_seconds_bucket{host="pypi.org",le="+Inf"} 1' in lines
+    assert 'artella_updater_download_seconds_count{host="pypi.org"} 1' in lines
+
+
+def test_spans_are_converted_into_metrics(prometheus_sink):
+    assert tracing.is_enabled()
+
+    tracing.record_span(
+        'download', 2.0, url='https://files.pythonhosted.org/packages/about.tar.gz', bytes=2048,
+        plugin_id='artella-plugins-about')
+
+    lines = _read_metrics(prometheus_sink)
+    tags = 'host="files.pythonhosted.org",plugin_id="artella-plugins-about"'
+    assert 'artella_updater_downloaded_bytes_total{{{}}} 2048'.format(tags) in lines
+    assert 'artella_updater_download_seconds_sum{{{}}} 2.0'.format(tags) in lines
+    assert 'artella_updater_download_throughput_bytes_per_second_sum{{{}}} 1024.0'.format(tags) in lines
+
+
+def test_statsd_sink():
+    server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    server.bind(('127.0.0.1', 0))
+    server.settimeout(5)
+    try:
+        sink = metrics.StatsdSink(port=server.getsockname()[1])
+        sink.increment('installs_total', tags={'status': 'ok', 'plugin_id': 'about'})
+        sink.observe('check_latency_seconds', 0.5)
+
+        assert server.recv(1024) == b'artella.updater.installs_total:1|c|#plugin_id:about,status:ok'
+        assert server.recv(1024) == b'artella.updater.check_latency_seconds:0.5|h'
+    finally:
+        server.close()
@@ -0,0 +1,118 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for Artella Updater offline mirror
+"""
+
+import os
+import io
+import json
+import hashlib
+import tarfile
+
+import pytest
+
+pytest.importorskip('artella.core')
+
+from artella.plugins.updater import utils, mirror    # noqa: E402
+
+try:
+    from urllib.request import pathname2url
+except ImportError:
+    from urllib import pathname2url
+
+DCC_NAME = 'maya'
+PLUGIN_ID = 'artella-plugins-about'
+INSTALLER_ID = 'artella-installer-{}'.format(DCC_NAME)
+
+
+def _get_file_url(file_path):
+    return 'file:{}'.format(pathname2url(file_path))
+
+
+def _write_file(file_path, data):
+    if not os.path.isdir(os.path.dirname(file_path)):
+        os.makedirs(os.path.dirname(file_path))
+    with open(file_path, 'wb') as fh:
+        fh.write(data)
+
+
+def _create_sdist(file_path, members):
+    if not os.path.isdir(os.path.dirname(file_path)):
+        os.makedirs(os.path.dirname(file_path))
+    with tarfile.open(file_path, 'w:gz') as tar:
+        for member_name, data in members.items():
+            member_info = tarfile.TarInfo(member_name)
+            member_info.size = len(data)
+            tar.addfile(member_info, io.BytesIO(data))
+
+
+def _add_pypi_project(server_path, plugin_id, members):
+    file_name = '{}-1.0.0.tar.gz'.format(plugin_id)
+    file_path = os.path.join(server_path, 'files', file_name)
+    _create_sdist(file_path, members)
+    with open(file_path, 'rb') as fh:
+        file_hash = hashlib.sha256(fh.read()).hexdigest()
+    release = {
+        'filename': file_name, 'packagetype': 'sdist', 'size': 1024, 'upload_time': '2021-01-01T00:00:00',
+        'url': _get_file_url(file_path), 'digests': {'sha256': file_hash}}
+    _write_file(os.path.join(server_path, 'pypi', plugin_id, 'json'), json.dumps({
+        'info': {'author': 'Artella', 'summary': plugin_id, 'version': '1.0.0'},
+        'releases': {'0.9.0': [], '1.0.0': [release]}}).encode('utf-8'))
+
+
+@pytest.fixture()
+def fake_servers(tmpdir, monkeypatch):
+    """
+    Creates PyPI and Artella update server folders and points the updater to them
+    """
+
+    server_path = str(tmpdir.mkdir('server'))
+    for platform in mirror.PLATFORMS:
+        _write_file(
+            os.path.join(server_path, 'plugins', DCC_NAME, 'versions', 'stable-{}.json'.format(platform)),
+            json.dumps({'platform': platform, 'version': '5.0.0', 'url': ''}).encode('utf-8'))
+    installer_config = json.dumps({'plugins': [{'repo': 'https://github.com/artella/{}'.format(PLUGIN_ID)}]})
+    _add_pypi_project(server_path, INSTALLER_ID, {
+        '{}-1.0.0/artella-installer.json'.format(INSTALLER_ID): installer_config.encode('utf-8')})
+    _add_pypi_project(server_path, PLUGIN_ID, {
+        '{}-1.0.0/artella/plugins/about/__init__.py'.format(PLUGIN_ID): b''})
+
+    monkeypatch.setattr(utils, 'PYPI_URL', _get_file_url(os.path.join(server_path, 'pypi')))
+    monkeypatch.setattr(utils, 'ARTELLA_UPDATES_URL', _get_file_url(os.path.join(server_path, 'plugins')))
+
+    return server_path
+
+
+def test_sync_mirror_is_incremental(fake_servers, tmpdir):
+    mirror_path = str(tmpdir.join('mirror'))
+
+    stats = mirror.sync_mirror(mirror_path, [DCC_NAME], platforms=['linux'], jobs=2)
+
+    assert not stats['failed']
+    assert len(stats['downloaded']) == 5
+    assert os.path.isfile(os.path.join(mirror_path, 'plugins', DCC_NAME, 'versions', 'stable-linux.json'))
+    assert os.path.isfile(os.path.join(mirror_path, 'packages', '{}-1.0.0.tar.gz'.format(PLUGIN_ID)))
+
+    stats = mirror.sync_mirror(mirror_path, [DCC_NAME], platforms=['linux'], jobs=2)
+
+    assert not stats['failed'] and not stats['downloaded']
+    assert len(stats['skipped']) == 5
+
+
+def test_mirror_is_used_as_base_url(fake_servers, tmpdir):
+    mirror_path = str(tmpdir.join('mirror'))
+    mirror.sync_mirror(mirror_path, [DCC_NAME], platforms=['linux'])
+
+    previous_mirror_url = utils.get_mirror_url()
+    utils.set_mirror_url(mirror_path)
+    try:
+        pypi_info = utils.get_pypi_info(PLUGIN_ID)
+        dcc_plugin_info = utils.get_latest_stable_artella_dcc_plugin_info(dcc_name=DCC_NAME, platform='linux')
+    finally:
+        utils.set_mirror_url(previous_mirror_url)
+
+    assert pypi_info['version'] == '1.0.0'
+    assert pypi_info['url'] == '{}/packages/{}-1.0.0.tar.gz'.format(_get_file_url(mirror_path), PLUGIN_ID)
+    assert dcc_plugin_info['version'] == '5.0.0'
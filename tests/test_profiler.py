@@ -0,0 +1,55 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for Artella Updater profiler
+"""
+
+import os
+import pstats
+
+import pytest
+
+pytest.importorskip('artella.core')
+
+from artella.plugins.updater import profiler    # noqa: E402
+
+
+@profiler.profile()
+def _inner(value):
+    return value * 2
+
+
+@profiler.profile(name='check')
+def _outer(value):
+    return _inner(value) + 1
+
+
+@pytest.mark.parametrize('profiler_value, profiler_name', [
+    ('', None), ('off', None), ('1', 'cprofile'), ('PyInstrument', 'pyinstrument'), ('unknown', None)])
+def test_profiler_name(profiler_value, profiler_name, monkeypatch):
+    monkeypatch.setenv(profiler.PROFILE_ENV, profiler_value)
+
+    assert profiler.get_profiler_name() == profiler_name
+
+
+def test_profiling_disabled(tmpdir, monkeypatch):
+    monkeypatch.delenv(profiler.PROFILE_ENV, raising=False)
+    monkeypatch.setenv(profiler.PROFILE_DIR_ENV, str(tmpdir.join('profiles')))
+
+    assert _outer(2) == 5
+    assert not tmpdir.join('profiles').check()
+
+
+def test_only_outermost_call_is_profiled(tmpdir, monkeypatch):
+    profiles_path = str(tmpdir.join('profiles'))
+    monkeypatch.setenv(profiler.PROFILE_ENV, 'cprofile')
+    monkeypatch.setenv(profiler.PROFILE_DIR_ENV, profiles_path)
+
+    assert _outer(2) == 5
+
+    profile_files = os.listdir(profiles_path)
+    assert len(profile_files) == 1
+    assert profile_files[0].startswith('check_') and profile_files[0].endswith('.prof')
+    stats = pstats.Stats(os.path.join(profiles_path, profile_files[0]))
+    assert any(function_name == '_inner' for _, _, function_name in stats.stats)
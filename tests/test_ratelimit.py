@@ -0,0 +1,102 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for Artella Updater client-side rate limiting
+"""
+
+import time
+from email.utils import formatdate
+
+import pytest
+
+pytest.importorskip('artella.core')
+
+from artella.plugins.updater import utils, ratelimit    # noqa: E402
+
+try:
+    from urllib.error import HTTPError
+except ImportError:
+    from urllib2 import HTTPError
+
+
+def test_token_bucket_reserve():
+    bucket = ratelimit.TokenBucket(10, burst=2)
+
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert 0.05 < bucket.reserve() <= 0.1
+    assert 0.15 < bucket.reserve() <= 0.2
+
+
+def test_token_bucket_slow_down_and_recover():
+    bucket = ratelimit.TokenBucket(10)
+
+    bucket.slow_down(retry_after=5)
+
+    assert bucket.rate == 5
+    assert 4.5 < bucket.reserve() <= 5
+
+    for _ in range(100):
+        bucket.slow_down()
+    assert bucket.rate == ratelimit.MIN_RATE
+
+    for _ in range(100):
+        bucket.recover()
+    assert bucket.rate == bucket.max_rate == 10
+
+
+@pytest.mark.parametrize('value, retry_after', [
+    (None, None), ('', None), ('soon', None), ('5', 5), ('0.5', 0.5), ('-3', 0), ('3600', ratelimit.MAX_RETRY_AFTER)])
+def test_parse_retry_after(value, retry_after):
+    assert ratelimit.parse_retry_after(value) == retry_after
+
+
+def test_parse_retry_after_http_date():
+    assert 25 < ratelimit.parse_retry_after(formatdate(time.time() + 30, usegmt=True)) <= 30
+    assert ratelimit.parse_retry_after(formatdate(time.time() - 30, usegmt=True)) == 0
+
+
+def test_get_bucket(monkeypatch):
+    monkeypatch.setenv(ratelimit.RATE_LIMIT_ENV, '4')
+    monkeypatch.setenv(ratelimit.RATE_LIMITS_ENV, 'PyPI.org=20/40, invalid ,updates.artellaapp.com=0')
+    ratelimit.reset()
+    try:
+        assert ratelimit.get_bucket('pypi.org').max_rate == 20
+        assert ratelimit.get_bucket('pypi.org') is ratelimit.get_bucket('PYPI.ORG')
+        assert ratelimit.get_bucket('files.pythonhosted.org').max_rate == 4
+        assert ratelimit.get_bucket('updates.artellaapp.com') is None
+        assert ratelimit.get_bucket('') is None
+    finally:
+        ratelimit.reset()
+
+
+def _throttled_route(throttled_responses):
+    def _route(handler):
+        if throttled_responses:
+            return throttled_responses.pop(0)
+        return 200, {'Content-Type': 'application/json'}, b'{}'
+
+    return _route
+
+
+def test_throttled_requests_are_retried(http_server):
+    http_server.routes['/pypi/json'] = _throttled_route([
+        (429, {'Retry-After': '0'}, b''), (503, dict(), b'')])
+
+    rsp = utils.open_url(http_server.url('/pypi/json'))
+
+    assert rsp.read() == b'{}'
+    assert http_server.requested_paths() == ['/pypi/json'] * 3
+    assert ratelimit.get_bucket('127.0.0.1').rate < ratelimit.get_bucket('127.0.0.1').max_rate
+
+
+def test_throttled_requests_are_not_retried_forever(http_server, monkeypatch):
+    monkeypatch.setattr(utils, 'THROTTLE_RETRIES', 1)
+    http_server.routes['/pypi/json'] = _throttled_route([(429, dict(), b'')] * 3)
+
+    with pytest.raises(HTTPError) as exc_info:
+        utils.open_url(http_server.url('/pypi/json'))
+
+    assert exc_info.value.code == 429
+    assert len(http_server.requests) == 2
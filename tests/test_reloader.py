@@ -0,0 +1,73 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for Artella Updater plugin reloader
+"""
+
+import sys
+import types
+
+import pytest
+
+pytest.importorskip('artella.core')
+
+from artella.plugins.updater import reloader    # noqa: E402
+
+MODULE_PATH = 'artella.plugins.reloadtest'
+
+
+@pytest.fixture()
+def plugin_modules(monkeypatch):
+    """
+    Registers the modules of a fake plugin: core <- utils <- widgets <- reloadtest, with a cycle between a and b
+    """
+
+    modules = dict()
+    for module_name in ('', '.core', '.utils', '.widgets', '.a', '.b'):
+        module = types.ModuleType(MODULE_PATH + module_name)
+        modules[module_name] = module
+        monkeypatch.setitem(sys.modules, module.__name__, module)
+
+    class Widget(object):
+        pass
+
+    Widget.__module__ = modules['.widgets'].__name__
+    modules['.utils'].core = modules['.core']
+    modules['.widgets'].utils = modules['.utils']
+    modules[''].Widget = Widget
+    modules['.a'].b = modules['.b']
+    modules['.b'].a = modules['.a']
+
+    return modules
+
+
+def test_get_plugin_module_names(plugin_modules):
+    assert reloader.get_plugin_module_names('artella-plugins-reloadtest') == sorted(
+        module.__name__ for module in plugin_modules.values())
+
+
+def test_module_dependencies(plugin_modules):
+    module_names = set(module.__name__ for module in plugin_modules.values())
+
+    assert reloader.get_module_dependencies(plugin_modules[''], module_names) == {MODULE_PATH + '.widgets'}
+    assert reloader.get_module_dependencies(plugin_modules['.core'], module_names) == set()
+
+
+def test_sort_modules_by_dependencies(plugin_modules):
+    sorted_names = reloader.sort_modules_by_dependencies(
+        [MODULE_PATH, MODULE_PATH + '.widgets', MODULE_PATH + '.utils', MODULE_PATH + '.core'])
+
+    assert sorted_names == [MODULE_PATH + '.core', MODULE_PATH + '.utils', MODULE_PATH + '.widgets', MODULE_PATH]
+
+
+def test_sort_modules_with_circular_dependencies(plugin_modules):
+    sorted_names = reloader.sort_modules_by_dependencies(
+        [MODULE_PATH + '.b', MODULE_PATH + '.a', 'artella_updater_not_loaded'])
+
+    assert sorted_names == [MODULE_PATH + '.a', MODULE_PATH + '.b']
+
+
+def test_needs_full_reload():
+    assert reloader.needs_full_reload(['artella-plugins-about', 'artella-plugins-core'])
+    assert not reloader.needs_full_reload(['artella-plugins-about'])
@@ -0,0 +1,132 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for Artella Updater staged rollouts
+"""
+
+import os
+import json
+
+import pytest
+
+pytest.importorskip('artella.core')
+
+from artella.plugins.updater import rollout, utils, updater, manifest    # noqa: E402
+
+ROLLOUT_START = '2021-01-01T10:00:00Z'
+ROLLOUT_START_TIME = 1609495200.0
+HOUR = 60 * 60
+
+
+@pytest.fixture()
+def staged_rollout(monkeypatch, tmpdir):
+    """
+    Enables staged rollouts opening releases to 10% of the seats each hour. Rollout state is stored in a temporary
+    folder
+    """
+
+    monkeypatch.setenv(rollout.ROLLOUT_STEP_ENV, '10')
+    monkeypatch.setenv(rollout.ROLLOUT_INTERVAL_ENV, '60')
+    monkeypatch.delenv(rollout.ROLLOUT_COHORT_ENV, raising=False)
+    monkeypatch.setenv(manifest.MANIFEST_PATH_ENV, str(tmpdir.join('updater', 'installed-plugins.json')))
+    monkeypatch.setattr(rollout, '_FIRST_SEEN_TIMES', dict())
+
+
+@pytest.mark.parametrize('rollout_start', [
+    ROLLOUT_START, '2021-01-01T10:00:00', '2021-01-01T10:00:00.123456Z', '2021-01-01T12:00:00+02:00',
+    '2021-01-01T07:30:00-02:30', ROLLOUT_START_TIME, str(int(ROLLOUT_START_TIME))])
+def test_rollout_start_time(rollout_start):
+    assert int(rollout.get_rollout_start_time(rollout_start)) == int(ROLLOUT_START_TIME)
+
+
+def test_invalid_rollout_start_time():
+    assert rollout.get_rollout_start_time(None) is None
+    assert rollout.get_rollout_start_time('') is None
+    assert rollout.get_rollout_start_time('yesterday') is None
+    assert rollout.get_rollout_start_time('2021-01-01') == ROLLOUT_START_TIME - 10 * HOUR
+
+
+def test_cohort_is_deterministic(monkeypatch):
+    monkeypatch.delenv(rollout.ROLLOUT_COHORT_ENV, raising=False)
+    cohorts = set(rollout.get_cohort(version) for version in ('5.0.0', '5.0.1', '5.1.0', '6.0.0', '6.0.1'))
+
+    assert rollout.get_cohort('5.0.0') == rollout.get_cohort('5.0.0')
+    assert all(0 <= cohort < 100 for cohort in cohorts)
+    assert len(cohorts) > 1
+
+    monkeypatch.setenv(rollout.ROLLOUT_COHORT_ENV, '150')
+    assert rollout.get_cohort('5.0.0') == 99
+
+
+def test_rollout_is_disabled_by_default(monkeypatch):
+    monkeypatch.delenv(rollout.ROLLOUT_STEP_ENV, raising=False)
+    monkeypatch.setenv(rollout.ROLLOUT_COHORT_ENV, '99')
+
+    assert rollout.get_rollout_percentage(ROLLOUT_START_TIME, current_time=ROLLOUT_START_TIME) == 100
+    assert rollout.is_release_available('5.0.0', ROLLOUT_START, current_time=ROLLOUT_START_TIME)
+
+
+@pytest.mark.parametrize('rollout_step', ['0', '-10', '100'])
+def test_rollout_step_limits_disable_rollout(staged_rollout, monkeypatch, rollout_step):
+    monkeypatch.setenv(rollout.ROLLOUT_STEP_ENV, rollout_step)
+    monkeypatch.setenv(rollout.ROLLOUT_COHORT_ENV, '99')
+
+    assert not rollout.is_rollout_enabled()
+    assert rollout.is_release_available('5.0.0', ROLLOUT_START, current_time=ROLLOUT_START_TIME)
+    assert rollout.is_release_available('5.0.0', None, current_time=ROLLOUT_START_TIME)
+    assert not os.path.isfile(rollout.get_state_path())
+
+
+def test_release_is_opened_progressively(staged_rollout, monkeypatch):
+    monkeypatch.setenv(rollout.ROLLOUT_COHORT_ENV, '35')
+
+    assert rollout.get_rollout_percentage(ROLLOUT_START_TIME, current_time=ROLLOUT_START_TIME - HOUR) == 10
+    assert rollout.get_rollout_percentage(ROLLOUT_START_TIME, current_time=ROLLOUT_START_TIME + 20 * HOUR) == 100
+    assert not rollout.is_release_available('5.0.0', ROLLOUT_START, current_time=ROLLOUT_START_TIME + 3 * HOUR - 1)
+    assert rollout.is_release_available('5.0.0', ROLLOUT_START, current_time=ROLLOUT_START_TIME + 3 * HOUR)
+
+
+def test_rollout_starts_when_release_is_first_seen(staged_rollout, monkeypatch):
+    monkeypatch.setenv(rollout.ROLLOUT_COHORT_ENV, '35')
+
+    assert not rollout.is_release_available('5.0.0', None, current_time=ROLLOUT_START_TIME)
+    assert not rollout.is_release_available('5.0.0', None, current_time=ROLLOUT_START_TIME + 3 * HOUR - 1)
+
+    # First seen time is read from the state file, so the schedule survives restarts
+    monkeypatch.setattr(rollout, '_FIRST_SEEN_TIMES', dict())
+    assert rollout.is_release_available('5.0.0', None, current_time=ROLLOUT_START_TIME + 3 * HOUR)
+    assert not rollout.is_release_available('5.0.1', None, current_time=ROLLOUT_START_TIME + 3 * HOUR)
+
+    with open(rollout.get_state_path(), 'r') as fh:
+        state_data = json.load(fh)
+    assert state_data == {rollout.get_seat_key(): {
+        '5.0.0': ROLLOUT_START_TIME, '5.0.1': ROLLOUT_START_TIME + 3 * HOUR}}
+    assert os.path.dirname(rollout.get_state_path()) == os.path.dirname(manifest.get_manifest_path())
+
+
+class _DccPlugin(object):
+    def get_version(self):
+        return '4.0.0'
+
+
+def test_explicit_checks_skip_rollout(staged_rollout, monkeypatch):
+    monkeypatch.setenv(rollout.ROLLOUT_COHORT_ENV, '99')
+    monkeypatch.setattr(updater.dccplugin, 'DccPlugin', _DccPlugin)
+    monkeypatch.setattr(utils, 'get_latest_stable_artella_dcc_plugin_info', lambda show_dialogs=False: {
+        'version': '5.0.0', 'rollout_start': rollout.time.time()})
+    updater_plugin = updater.UpdaterPlugin()
+
+    assert not updater_plugin.update_is_available(show_dialogs=False)
+    assert updater_plugin.update_is_available(show_dialogs=True)
+
+
+def test_release_without_start_time_is_staged(staged_rollout, monkeypatch):
+    monkeypatch.setenv(rollout.ROLLOUT_COHORT_ENV, '99')
+    monkeypatch.setattr(updater.dccplugin, 'DccPlugin', _DccPlugin)
+    monkeypatch.setattr(utils, 'get_latest_stable_artella_dcc_plugin_info', lambda show_dialogs=False: {
+        'version': '5.0.0', 'rollout_start': None})
+    updater_plugin = updater.UpdaterPlugin()
+
+    assert not updater_plugin.update_is_available(show_dialogs=False)
+    assert rollout.get_first_seen_time('5.0.0') <= rollout.time.time()
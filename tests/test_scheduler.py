@@ -0,0 +1,198 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for Artella Updater request scheduler
+"""
+
+import json
+import threading
+
+import pytest
+
+pytest.importorskip('artella.core')
+
+from artella.plugins.updater import utils, scheduler, cancellation    # noqa: E402
+
+try:
+    from artella.plugins.updater import aionet
+except (ImportError, SyntaxError):
+    # asyncio network client is only available in Python 3
+    aionet = None
+
+
+@pytest.fixture()
+def request_scheduler(monkeypatch):
+    """
+    Uses a request scheduler with 2 request slots and 1 background slot while interactive work is running
+    """
+
+    monkeypatch.setenv(scheduler.MAX_REQUESTS_ENV, '2')
+    monkeypatch.setenv(scheduler.BACKGROUND_LIMIT_ENV, '1')
+    scheduler.reset()
+    yield scheduler.get_scheduler()
+    scheduler.reset()
+
+
+@pytest.fixture()
+def unlimited_scheduler(monkeypatch):
+    """
+    Uses a request scheduler without request limit and 1 background slot while interactive work is running, so
+    background requests can only wait because of interactive work
+    """
+
+    monkeypatch.setenv(scheduler.MAX_REQUESTS_ENV, '0')
+    monkeypatch.setenv(scheduler.BACKGROUND_LIMIT_ENV, '1')
+    scheduler.reset()
+    yield scheduler.get_scheduler()
+    scheduler.reset()
+
+
+def _start_thread(fn, *args):
+    thread = threading.Thread(target=fn, args=args)
+    thread.daemon = True
+    thread.start()
+
+    return thread
+
+
+def _acquire_background(request_scheduler, acquired, cancel_token):
+    try:
+        request_scheduler.acquire(scheduler.BACKGROUND, cancel_token=cancel_token)
+    except cancellation.CancelledError:
+        return
+    acquired.set()
+
+
+def test_priority_context():
+    assert scheduler.get_priority() == scheduler.INTERACTIVE
+    with scheduler.priority(scheduler.BACKGROUND):
+        assert scheduler.get_priority() == scheduler.BACKGROUND
+        with scheduler.priority(scheduler.INTERACTIVE):
+            assert scheduler.get_priority() == scheduler.INTERACTIVE
+        assert scheduler.get_priority() == scheduler.BACKGROUND
+    assert scheduler.get_priority() == scheduler.INTERACTIVE
+
+    with pytest.raises(ValueError):
+        scheduler.priority(5)
+
+
+def test_nested_requests_share_slot(request_scheduler):
+    with scheduler.request(request_priority=scheduler.BACKGROUND):
+        with scheduler.request():
+            assert request_scheduler.running() == 1
+        assert request_scheduler.running(scheduler.BACKGROUND) == 1
+
+    assert request_scheduler.running() == 0
+
+
+def test_background_is_capped_during_interactive_work(request_scheduler):
+    acquired = threading.Event()
+    cancel_token = cancellation.CancellationToken()
+    request_scheduler.acquire(scheduler.BACKGROUND)
+
+    with scheduler.priority(scheduler.INTERACTIVE):
+        assert request_scheduler.is_interactive_busy()
+        thread = _start_thread(_acquire_background, request_scheduler, acquired, cancel_token)
+        assert not acquired.wait(0.3)
+
+    assert acquired.wait(5)
+    assert request_scheduler.running(scheduler.BACKGROUND) == 2
+    thread.join(5)
+
+
+def test_interactive_requests_go_first(request_scheduler):
+    order = list()
+
+    def _request(request_priority):
+        with scheduler.request(request_priority=request_priority):
+            order.append(request_priority)
+
+    request_scheduler.acquire(scheduler.BACKGROUND)
+    request_scheduler.acquire(scheduler.BACKGROUND)
+    background_thread = _start_thread(_request, scheduler.BACKGROUND)
+    while not request_scheduler._waiting:
+        pass
+    interactive_thread = _start_thread(_request, scheduler.INTERACTIVE)
+    while not request_scheduler.is_interactive_busy():
+        pass
+    request_scheduler.release(scheduler.BACKGROUND)
+    request_scheduler.release(scheduler.BACKGROUND)
+    interactive_thread.join(5)
+    background_thread.join(5)
+
+    assert order == [scheduler.INTERACTIVE, scheduler.BACKGROUND]
+
+
+def test_background_request_yields_slot(request_scheduler):
+    interactive_done = threading.Event()
+    request_scheduler.acquire(scheduler.INTERACTIVE)
+
+    with scheduler.request(request_priority=scheduler.BACKGROUND) as request_slot:
+        assert not request_scheduler.should_yield(scheduler.BACKGROUND)
+
+        def _interactive_request():
+            with scheduler.request(request_priority=scheduler.INTERACTIVE):
+                interactive_done.set()
+
+        thread = _start_thread(_interactive_request)
+        while not request_scheduler.should_yield(scheduler.BACKGROUND):
+            pass
+        request_scheduler.release(scheduler.INTERACTIVE)
+
+        # Background request gives its slot to the waiting interactive one and continues once it is done
+        request_slot.checkpoint()
+        assert interactive_done.is_set()
+        assert request_scheduler.running(scheduler.BACKGROUND) == 1
+
+    thread.join(5)
+    assert request_scheduler.running() == 0
+
+
+def test_cancel_while_waiting(request_scheduler):
+    cancel_token = cancellation.CancellationToken()
+    request_scheduler.acquire()
+    request_scheduler.acquire()
+
+    timer = threading.Timer(0.1, cancel_token.cancel)
+    timer.start()
+    with pytest.raises(cancellation.CancelledError):
+        with scheduler.request(cancel_token=cancel_token):
+            pass
+
+    assert not request_scheduler._waiting
+    request_scheduler.release()
+    request_scheduler.release()
+    assert not request_scheduler.is_interactive_busy()
+
+
+@pytest.mark.skipif(aionet is None, reason='asyncio network client requires Python 3')
+def test_background_is_capped_while_window_fetch_runs(unlimited_scheduler, http_server, monkeypatch):
+    request_started = threading.Event()
+    send_response = threading.Event()
+
+    def _pypi_route(handler):
+        request_started.set()
+        send_response.wait(5)
+        return 200, dict(), json.dumps({'info': {'version': '1.0.0'}, 'releases': {}}).encode('utf-8')
+
+    monkeypatch.setattr(utils, 'get_pypi_url', lambda plugin_id: http_server.url('/pypi/{}/json'.format(plugin_id)))
+    http_server.routes['/pypi/artella-plugins-about/json'] = _pypi_route
+    acquired = threading.Event()
+    cancel_token = cancellation.CancellationToken()
+    unlimited_scheduler.acquire(scheduler.BACKGROUND)
+
+    # Same call the updater window does to fetch the information of the plugins of a package tab
+    future = aionet.get_background_loop().submit(aionet.get_client().get_plugins_pypi_info(
+        ['artella-plugins-about'], request_priority=scheduler.INTERACTIVE))
+    try:
+        assert request_started.wait(5)
+        thread = _start_thread(_acquire_background, unlimited_scheduler, acquired, cancel_token)
+        assert not acquired.wait(0.3)
+    finally:
+        send_response.set()
+    plugins_pypi_info = future.result(5)
+
+    assert plugins_pypi_info['artella-plugins-about']['version'] == '1.0.0'
+    assert acquired.wait(5)
+    thread.join(5)
@@ -0,0 +1,86 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for Artella Updater tracing
+"""
+
+import pytest
+
+pytest.importorskip('artella.core')
+
+from artella.plugins.updater import tracing    # noqa: E402
+
+
+@pytest.fixture()
+def enabled_tracing(monkeypatch):
+    """
+    Enables tracing during a test and restores previous tracing state afterwards
+    """
+
+    monkeypatch.setattr(tracing, '_ENABLED', True)
+    monkeypatch.setattr(tracing, '_LOG', False)
+    tracing.clear()
+    yield
+    tracing.clear()
+
+
+def test_disabled_tracing_records_nothing(monkeypatch):
+    monkeypatch.setattr(tracing, '_ENABLED', False)
+    tracing.clear()
+
+    with tracing.attributes(plugin_id='artella-plugins-about'):
+        with tracing.span('download', bytes=10) as download_span:
+            download_span.set(url='https://pypi.org')
+    tracing.record_span('ttfb', 0.5)
+
+    assert not tracing.spans()
+
+
+def test_span_attributes(enabled_tracing):
+    with tracing.attributes(plugin_id='artella-plugins-about'):
+        with tracing.span('download', url='https://pypi.org') as download_span:
+            download_span.set(bytes=10)
+    with tracing.span('extract'):
+        pass
+
+    download_span, extract_span = tracing.spans()
+    assert download_span.name == 'download'
+    assert download_span.attributes == {'plugin_id': 'artella-plugins-about', 'url': 'https://pypi.org', 'bytes': 10}
+    assert download_span.duration >= 0 and download_span.end_time >= download_span.start_time
+    assert extract_span.attributes == dict()
+    assert tracing.spans('extract') == [extract_span]
+
+
+def test_span_error_and_record_span(enabled_tracing):
+    with pytest.raises(ValueError):
+        with tracing.span('update'):
+            raise ValueError('invalid package')
+    tracing.record_span('ttfb', 0.25, url='https://pypi.org')
+
+    update_span, ttfb_span = tracing.spans()
+    assert update_span.error == 'ValueError: invalid package'
+    assert ttfb_span.duration == 0.25
+    assert ttfb_span.to_dict()['attributes'] == {'url': 'https://pypi.org'}
+
+
+def test_listeners(enabled_tracing):
+    finished_spans = list()
+
+    def _failing_listener(finished_span):
+        raise RuntimeError('listener errors must not break the updater')
+
+    tracing.add_listener(_failing_listener)
+    tracing.add_listener(finished_spans.append)
+    tracing.add_listener(finished_spans.append)
+    try:
+        with tracing.span('check'):
+            pass
+    finally:
+        tracing.remove_listener(_failing_listener)
+        tracing.remove_listener(finished_spans.append)
+    with tracing.span('check'):
+        pass
+
+    assert [finished_span.name for finished_span in finished_spans] == ['check']
+    assert len(tracing.spans('check')) == 2